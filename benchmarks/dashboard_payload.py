@@ -0,0 +1,118 @@
+"""
+Perbandingan payload tab Visualisasi: lima figure terpisah vs satu figure
+gabungan (mode hemat data, create_dashboard_chart).
+
+Fragment charts_view dan results_view dijalankan headless lewat AppTest.
+Byte dihitung dari proto PlotlyChart yang dikirim Streamlit ke browser
+(mentah dan bila kompresi websocket deflate diaktifkan). Time-to-interactive
+diestimasi sebagai waktu rerun fragment di server ditambah waktu transfer
+payload pada beberapa kecepatan link; waktu render Plotly.js di browser
+tidak termasuk.
+
+Pemakaian:
+    python benchmarks/dashboard_payload.py
+    python benchmarks/dashboard_payload.py --links 128,512,2048 -o payload.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import suite  # noqa: E402
+
+# Kecepatan link default (kbit/s) untuk estimasi waktu transfer
+DEFAULT_LINKS = (128, 256, 1024)
+
+
+def _chart_payload(at):
+    """(jumlah figure, byte mentah, byte deflate) dari proto plotly_chart"""
+    blobs = [element.proto.SerializeToString() for element in at.get("plotly_chart")]
+    raw = b"".join(blobs)
+    return len(blobs), len(raw), len(zlib.compress(raw, 6))
+
+
+def _rerun_ms(at, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def measure(repeat=20):
+    """
+    Payload dan waktu rerun untuk kedua mode.
+
+    Mode terpisah menghitung empat figure di tab Visualisasi ditambah
+    figure probabilitas di tab Hasil, agar isinya setara dengan dashboard
+    gabungan.
+    """
+    charts = suite._fragment_test("charts_view")
+    separate = _chart_payload(charts)
+    separate_ms = _rerun_ms(charts, repeat)
+
+    results = suite._fragment_test("results_view")
+    probability = _chart_payload(results)
+
+    charts.toggle(key="compact_dashboard").set_value(True)
+    charts.run()
+    compact = _chart_payload(charts)
+    compact_ms = _rerun_ms(charts, repeat)
+
+    return {
+        "separate": {
+            "figures": separate[0] + probability[0],
+            "bytes": separate[1] + probability[1],
+            "bytes_deflate": separate[2] + probability[2],
+            "server_ms": separate_ms,
+        },
+        "compact": {
+            "figures": compact[0],
+            "bytes": compact[1],
+            "bytes_deflate": compact[2],
+            "server_ms": compact_ms,
+        },
+    }
+
+
+def time_to_interactive(mode, kbps):
+    """Estimasi (ms): rerun server + transfer payload mentah pada `kbps`"""
+    return mode["server_ms"] + mode["bytes"] * 8 / kbps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Jumlah rerun per mode (median)")
+    parser.add_argument("--links", default=",".join(map(str, DEFAULT_LINKS)),
+                        help="Kecepatan link dalam kbit/s, dipisah koma")
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+    links = [int(v) for v in args.links.split(",")]
+
+    result = measure(args.repeat)
+    result["time_to_interactive_ms"] = {
+        f"{kbps}kbps": {name: time_to_interactive(result[name], kbps) for name in ("separate", "compact")}
+        for kbps in links
+    }
+
+    print(f"{'':<22}{'terpisah':>12}{'gabungan':>12}")
+    for key, label in [("figures", "Figure"), ("bytes", "Byte"), ("bytes_deflate", "Byte (deflate)")]:
+        print(f"{label:<22}{result['separate'][key]:>12,}{result['compact'][key]:>12,}")
+    print(f"{'Rerun server (ms)':<22}{result['separate']['server_ms']:>12.1f}{result['compact']['server_ms']:>12.1f}")
+    for kbps, tti in result["time_to_interactive_ms"].items():
+        print(f"{'TTI @ ' + kbps + ' (ms)':<22}{tti['separate']:>12.1f}{tti['compact']:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
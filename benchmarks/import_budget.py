@@ -0,0 +1,81 @@
+"""
+Anggaran waktu impor (cold start) paket tat_predictor.
+
+Setiap percobaan menjalankan interpreter baru, mengimpor modul inti, lalu
+mencatat durasi impor dan modul berat yang ikut termuat. Script keluar
+dengan kode 1 bila anggaran terlampaui atau ada dependensi berat yang
+dimuat saat impor, sehingga regresi langsung terlihat di CI.
+
+    python benchmarks/import_budget.py --budget-ms 50
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modul yang harus dapat diimpor tanpa dependensi pihak ketiga
+CORE_MODULES = [
+    "tat_predictor",
+    "tat_predictor.scoring",
+    "tat_predictor.rule_engine",
+    "tat_predictor.decision_table",
+    "tat_predictor.store",
+    "tat_predictor.reports",
+    "tat_predictor.charts",
+    "tat_predictor.metrics",
+    "tat_predictor.cli",
+]
+
+# Dependensi berat yang hanya boleh dimuat saat benar-benar dipakai
+HEAVY_MODULES = ["streamlit", "pandas", "numpy", "plotly", "reportlab"]
+
+DEFAULT_BUDGET_MS = 50.0
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - t0) * 1000
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed, "heavy": heavy}}))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(repeat=5):
+    """Waktu impor terbaik (ms) dari beberapa proses baru dan modul berat yang termuat"""
+    code = _PROBE.format(modules=CORE_MODULES, heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout))
+    return min(r["ms"] for r in runs), sorted({m for r in runs for m in r["heavy"]})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    best_ms, heavy = measure_import(args.repeat)
+    print(f"Impor inti: {best_ms:.1f} ms (anggaran {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print(f"GAGAL: modul berat termuat saat impor: {', '.join(heavy)}")
+        ok = False
+    if best_ms > args.budget_ms:
+        print("GAGAL: waktu impor melebihi anggaran")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Speedup skoring batch paralel (tat_predictor.parallel) terhadap jumlah
+worker, ujung ke ujung.
+
+Kasus ditulis sekali sebagai CSV di memori (zat_positif sebagai teks,
+seperti input CLI). Untuk tiap jumlah worker diukur pd.read_csv lalu
+ShardedScorer.score_batch sampai DataFrame hasil (pool sudah hangat; waktu
+start pool tidak dihitung). Waktu skoring termasuk encode_cases di worker,
+kirim irisan kolom, dan salin hasil keluar dari shared memory. Dilaporkan
+baris/detik, speedup terhadap 1 worker (skoring langsung di proses induk)
+dan efisiensi (speedup / jumlah worker); kolom "Baca CSV" adalah bagian
+serial yang tidak ikut terbagi.
+
+Pemakaian:
+    python benchmarks/parallel_speedup.py
+    python benchmarks/parallel_speedup.py --rows 2000000 --workers 1,2,4,8 -o speedup.json
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import suite  # noqa: E402
+from tat_predictor.batch import ZAT_SEPARATOR  # noqa: E402
+from tat_predictor.parallel import ShardedScorer  # noqa: E402
+
+DEFAULT_ROWS = 1_000_000
+
+
+def _default_workers():
+    cores = os.cpu_count() or 1
+    levels, workers = [], 1
+    while workers < cores:
+        levels.append(workers)
+        workers *= 2
+    return levels + [cores]
+
+
+def cases_csv(rows, distinct=100_000):
+    """CSV (bytes) berisi `rows` kasus (kasus acak diulang)"""
+    import pandas as pd
+    frame = pd.DataFrame(suite.sample_cases(min(rows, distinct)))
+    frame["zat_positif"] = frame["zat_positif"].map(ZAT_SEPARATOR.join)
+    reps = -(-rows // len(frame))
+    frame = pd.concat([frame] * reps, ignore_index=True).iloc[:rows]
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+def measure(csv, workers, repeat):
+    """(median detik total, median detik baca CSV)"""
+    import pandas as pd
+    with ShardedScorer(workers) as scorer:
+        scorer.score_batch(pd.read_csv(io.BytesIO(csv), nrows=1000))  # pool dan worker hangat
+        totals, reads = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            frame = pd.read_csv(io.BytesIO(csv))
+            read = time.perf_counter()
+            scorer.score_batch(frame)
+            totals.append(time.perf_counter() - started)
+            reads.append(read - started)
+    return statistics.median(totals), statistics.median(reads)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Jumlah kasus")
+    parser.add_argument("--workers", default=",".join(map(str, _default_workers())),
+                        help="Jumlah worker yang diukur, dipisah koma")
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per jumlah worker (median)")
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    csv = cases_csv(args.rows)
+    results = []
+    for workers in (int(v) for v in args.workers.split(",")):
+        seconds, read_seconds = measure(csv, workers, args.repeat)
+        results.append({"workers": workers, "seconds": seconds, "read_seconds": read_seconds,
+                        "rows_per_second": args.rows / seconds})
+    # Relatif terhadap jumlah worker pertama yang diukur (default 1)
+    base = results[0]
+    for row in results:
+        row["speedup"] = base["seconds"] / row["seconds"]
+        row["efficiency"] = row["speedup"] * base["workers"] / row["workers"]
+
+    print(f"{args.rows:,} kasus, {os.cpu_count()} core")
+    print(f"{'Worker':>7}{'Detik':>9}{'Baca CSV':>10}{'Baris/dtk':>14}{'Speedup':>9}{'Efisiensi':>11}")
+    for row in results:
+        print(f"{row['workers']:>7}{row['seconds']:>9.3f}{row['read_seconds']:>10.3f}"
+              f"{row['rows_per_second']:>14,.0f}{row['speedup']:>9.2f}{row['efficiency']:>10.0%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"rows": args.rows, "cpu_count": os.cpu_count(), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
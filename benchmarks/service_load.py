@@ -0,0 +1,183 @@
+"""
+Uji beban layanan HTTP skoring (tat_predictor.service).
+
+Tiap worker klien memakai satu koneksi keep-alive dan mengirim request
+berurutan selama `--duration` detik; jumlah worker = tingkat konkurensi.
+Dilaporkan latensi p50/p99 dan request/detik per tingkat konkurensi untuk
+endpoint tunggal, serta kasus/detik untuk endpoint batch NDJSON.
+
+Tanpa --url, server dijalankan sebagai subprocess
+(`python -m tat_predictor serve`) pada port bebas dan dihentikan setelah
+pengukuran.
+
+Pemakaian:
+    python benchmarks/service_load.py
+    python benchmarks/service_load.py --concurrency 1,8,32 --duration 10 -o load.json
+    python benchmarks/service_load.py --url http://10.0.0.5:8080
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import suite  # noqa: E402
+
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+DEFAULT_DURATION = 5.0
+DEFAULT_BATCH_CASES = 1000
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _request(host, path, body):
+    return (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("ascii") + body
+
+
+async def _read_response(reader):
+    """(status, body) satu response; mendukung Content-Length dan chunked"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split(b" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get(b"transfer-encoding") == b"chunked":
+        parts = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+            data = await reader.readexactly(size + 2)
+            if not size:
+                return status, b"".join(parts)
+            parts.append(data[:-2])
+    return status, await reader.readexactly(int(headers.get(b"content-length", 0)))
+
+
+async def _worker(host, port, requests, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def _run_level(host, port, requests, concurrency, duration):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_worker(host, port, requests[k::concurrency] or requests, deadline, latencies, errors)
+                           for k in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def measure(host, port, concurrency_levels, duration, batch_cases):
+    """Hasil uji beban per tingkat konkurensi (single) dan satu run batch"""
+    cases = suite.sample_cases(1000)
+    single = [_request(host, "/v1/score", json.dumps(case, ensure_ascii=False).encode("utf-8"))
+              for case in cases]
+    ndjson = "".join(json.dumps(case, ensure_ascii=False) + "\n"
+                     for case in (cases * (batch_cases // len(cases) + 1))[:batch_cases]).encode("utf-8")
+    batch = [_request(host, "/v1/score/batch?detail=0", ndjson)]
+
+    single_results = [asyncio.run(_run_level(host, port, single, level, duration))
+                      for level in concurrency_levels]
+    batch_result = asyncio.run(_run_level(host, port, batch, 1, duration))
+    batch_result["cases_per_second"] = batch_result["rps"] * batch_cases
+    batch_result["batch_cases"] = batch_cases
+    return {"single": single_results, "batch": batch_result}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port, timeout=30.0):
+    env = dict(os.environ, PYTHONPATH=suite.ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    process = subprocess.Popen([sys.executable, "-m", "tat_predictor", "serve", "--port", str(port)],
+                               env=env, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("Server skoring tidak siap dalam batas waktu")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Server yang sudah berjalan (default: jalankan subprocess lokal)")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+                        help="Tingkat konkurensi, dipisah koma")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="Durasi per tingkat konkurensi (detik)")
+    parser.add_argument("--batch-cases", type=int, default=DEFAULT_BATCH_CASES,
+                        help="Jumlah kasus per request batch")
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+    levels = [int(v) for v in args.concurrency.split(",")]
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        process = _start_server(port)
+    try:
+        result = measure(host, port, levels, args.duration, args.batch_cases)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{'Konkurensi':>10}{'Request':>10}{'Error':>7}{'Req/dtk':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for row in result["single"]:
+        print(f"{row['concurrency']:>10}{row['requests']:>10,}{row['errors']:>7}{row['rps']:>10,.0f}"
+              f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+    batch = result["batch"]
+    print(f"\nBatch NDJSON ({batch['batch_cases']:,} kasus/request): {batch['cases_per_second']:,.0f} kasus/dtk, "
+          f"p50 {batch['p50_ms']:.1f} ms, p99 {batch['p99_ms']:.1f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,630 @@
+"""
+Benchmark suite Sistem Prediksi TAT BNN.
+
+Mengukur skoring (per kasus dan batch), decision rules, laporan TXT/PDF,
+pembuat grafik Plotly dan satu rerun penuh script Streamlit (headless via
+AppTest). Hasil disimpan sebagai JSON; perintah `compare` menandai
+benchmark yang melambat melebihi ambang batas di antara dua run.
+
+    python benchmarks/suite.py run -o bench.json
+    python benchmarks/suite.py compare base.json bench.json --threshold 10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tat_predictor import scoring  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "tat_predictor_bnn_app.py")
+
+# Jumlah kasus untuk benchmark batch
+BATCH_SIZE = 10_000
+
+# Durasi minimum satu pengulangan; jumlah loop dikalibrasi sampai tercapai
+MIN_REPEAT_SECONDS = 0.2
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0
+
+# nama -> fungsi setup yang mengembalikan (callable tanpa argumen, jumlah item per panggilan)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+# =============================================================================
+# DATA UJI
+# =============================================================================
+
+def sample_cases(n, seed=0):
+    """Kasus acak deterministik yang mencakup seluruh opsi input aplikasi"""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(n):
+        cases.append(dict(
+            zat_positif=rng.sample(scoring.JENIS_NARKOTIKA, rng.randint(0, 4)),
+            dsm5_count=rng.randint(0, len(scoring.DSM5_CRITERIA)),
+            durasi_bulan=rng.randint(0, 240),
+            fungsi_sosial=rng.choice(scoring.FUNGSI_SOSIAL_OPTIONS),
+            ada_komorbid=rng.random() < 0.5,
+            tingkat_komorbid=rng.choice(scoring.TINGKAT_KOMORBID_OPTIONS),
+            peran=rng.choice(list(scoring.ROLE_MAPPING)),
+            barang_bukti=round(rng.uniform(0, 100), 1),
+            jenis_narkotika=rng.choice(list(scoring.GRAMATUR_LIMITS)),
+            status_tangkap=rng.choice(list(scoring.ARREST_MAPPING)),
+            riwayat_pidana=rng.choice(list(scoring.HISTORY_MAPPING)),
+        ))
+    return cases
+
+
+def _medical_args(case):
+    return (case["zat_positif"], case["dsm5_count"], case["durasi_bulan"],
+            case["fungsi_sosial"], case["ada_komorbid"], case["tingkat_komorbid"])
+
+
+def _legal_args(case):
+    return (case["peran"], case["barang_bukti"], case["jenis_narkotika"],
+            case["status_tangkap"], case["riwayat_pidana"])
+
+
+def _scored(case):
+    skor_medis, breakdown_medis = scoring.calculate_medical_score(*_medical_args(case))
+    skor_hukum, breakdown_hukum = scoring.calculate_legal_score(*_legal_args(case))
+    return skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+
+
+def sample_export_data(case=None):
+    """export_data seperti yang dibuat tab Hasil Analisis"""
+    case = case or sample_cases(1)[0]
+    skor_medis, skor_hukum, breakdown_medis, breakdown_hukum = _scored(case)
+    probabilities, reasoning, primary, final_score = scoring.apply_decision_rules(
+        skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+    )
+    return {
+        "timestamp": "2025-12-01 09:00:00",
+        "input_data": dict(case, nama_inisial="A.B.", usia=30, jenis_kelamin="Laki-laki"),
+        "skor_medis": skor_medis,
+        "skor_hukum": skor_hukum,
+        "final_score": final_score,
+        "rekomendasi_utama": primary,
+        "confidence": probabilities[primary],
+        "breakdown_medis": breakdown_medis,
+        "breakdown_hukum": breakdown_hukum,
+        "probabilities": probabilities,
+        "reasoning": reasoning,
+    }
+
+# =============================================================================
+# SKORING
+# =============================================================================
+
+@benchmark("scoring.calculate_medical_score.single")
+def _():
+    args = _medical_args(sample_cases(1)[0])
+    return lambda: scoring.calculate_medical_score(*args), 1
+
+
+@benchmark("scoring.calculate_legal_score.single")
+def _():
+    args = _legal_args(sample_cases(1)[0])
+    return lambda: scoring.calculate_legal_score(*args), 1
+
+
+@benchmark("scoring.apply_decision_rules.single")
+def _():
+    scored = _scored(sample_cases(1)[0])
+    return lambda: scoring.apply_decision_rules(*scored), 1
+
+
+@benchmark("decision_table.lookup_decision.single")
+def _():
+    from tat_predictor.decision_table import lookup_decision
+    scored = _scored(sample_cases(1)[0])
+    lookup_decision(*scored)  # bangun tabel di luar pengukuran
+    return lambda: lookup_decision(*scored), 1
+
+
+@benchmark("scoring.calculate_medical_score.loop")
+def _():
+    args = [_medical_args(c) for c in sample_cases(BATCH_SIZE)]
+    fn = scoring.calculate_medical_score
+    return lambda: [fn(*a) for a in args], BATCH_SIZE
+
+
+@benchmark("scoring.calculate_legal_score.loop")
+def _():
+    args = [_legal_args(c) for c in sample_cases(BATCH_SIZE)]
+    fn = scoring.calculate_legal_score
+    return lambda: [fn(*a) for a in args], BATCH_SIZE
+
+
+@benchmark("scoring.apply_decision_rules.loop")
+def _():
+    scored = [_scored(c) for c in sample_cases(BATCH_SIZE)]
+    fn = scoring.apply_decision_rules
+    return lambda: [fn(*s) for s in scored], BATCH_SIZE
+
+
+@benchmark("service.score_case.loop")
+def _():
+    from tat_predictor.service import score_case, validate_case
+    cases = [validate_case(c) for c in sample_cases(BATCH_SIZE)]
+    return lambda: [score_case(c) for c in cases], BATCH_SIZE
+
+
+@benchmark("service.score_case.codes.loop")
+def _():
+    # Tanpa detail: kode alasan/detail saja, tanpa memformat teks
+    from tat_predictor.service import score_case, validate_case
+    cases = [validate_case(c) for c in sample_cases(BATCH_SIZE)]
+    return lambda: [score_case(c, detail=False) for c in cases], BATCH_SIZE
+
+
+@benchmark("batch.score_components.batch")
+def _():
+    from tat_predictor.batch import encode_cases, score_components
+    enc = encode_cases(_case_columns(sample_cases(BATCH_SIZE)))
+    return lambda: score_components(enc), BATCH_SIZE
+
+
+@benchmark("batch.score_encoded.batch")
+def _():
+    from tat_predictor.batch import encode_cases, score_encoded
+    enc = encode_cases(_case_columns(sample_cases(BATCH_SIZE)))
+    score_encoded(enc)
+    return lambda: score_encoded(enc), BATCH_SIZE
+
+
+@benchmark("batch.score_batch.dataframe")
+def _():
+    import pandas as pd
+    from tat_predictor.batch import score_batch
+    df = pd.DataFrame(sample_cases(BATCH_SIZE))
+    return lambda: score_batch(df), BATCH_SIZE
+
+
+@benchmark("compact.CompactCase.score.loop")
+def _():
+    from tat_predictor.compact import CompactCase
+    cases = [CompactCase.from_input_data(c) for c in sample_cases(BATCH_SIZE)]
+    cases[0].score()  # bangun tabel di luar pengukuran
+    return lambda: [c.score() for c in cases], BATCH_SIZE
+
+
+@benchmark("compact.score_array.batch")
+def _():
+    from tat_predictor.compact import score_array, to_array
+    array = to_array(sample_cases(BATCH_SIZE))
+    score_array(array)
+    return lambda: score_array(array), BATCH_SIZE
+
+
+@benchmark("uncertainty.simulate.single")
+def _():
+    # 10^5 sampel Monte Carlo untuk satu kasus (target < 100 ms)
+    from tat_predictor.uncertainty import simulate
+    case = sample_cases(1)[0]
+    simulate(case, samples=1)  # bangun tabel di luar pengukuran
+    return lambda: simulate(case), 1
+
+
+def _case_columns(cases):
+    return {key: [c[key] for c in cases] for key in cases[0]}
+
+# =============================================================================
+# LAPORAN & GRAFIK
+# =============================================================================
+
+@benchmark("reports.generate_txt_report")
+def _():
+    from tat_predictor.reports import generate_txt_report
+    export_data = sample_export_data()
+    return lambda: generate_txt_report(export_data), 1
+
+
+@benchmark("reports.generate_pdf_report")
+def _():
+    from tat_predictor.reports import generate_pdf_report
+    export_data = sample_export_data()
+    generate_pdf_report(export_data)  # impor reportlab dan style di luar pengukuran
+    return lambda: generate_pdf_report(export_data), 1
+
+
+@benchmark("pdf_fast.generate_pdf_report_fast")
+def _():
+    from tat_predictor.pdf_fast import generate_pdf_report_fast
+    export_data = sample_export_data()
+    generate_pdf_report_fast(export_data)  # latar statis dibangun di luar pengukuran
+    # Nilai isian berubah tiap iterasi agar cache teks tidak membuat hasil terlalu optimis
+    variants = [{**export_data, "final_score": i / 10, "confidence": i / 7} for i in range(1000)]
+    cases = itertools.cycle(variants)
+    return lambda: generate_pdf_report_fast(next(cases)), 1
+
+
+@benchmark("result_cache.report.pdf")
+def _():
+    # Laporan dengan isi sama dari sesi lain: hanya timestamp yang ditambal
+    from tat_predictor.reports import generate_pdf_report
+    from tat_predictor.result_cache import ResultCache
+    cache = ResultCache()
+    export_data = sample_export_data()
+    cache.report("pdf", export_data, generate_pdf_report)
+    other = {**export_data, "timestamp": "2025-01-02 03:04:05"}
+    return lambda: cache.report("pdf", other, generate_pdf_report), 1
+
+
+@benchmark("charts.create_gauge_chart")
+def _():
+    from tat_predictor.charts import create_gauge_chart
+    create_gauge_chart(50, "warmup")
+    return lambda: create_gauge_chart(73, "Skor Asesmen Medis"), 1
+
+
+@benchmark("charts.create_breakdown_chart")
+def _():
+    from tat_predictor.charts import create_breakdown_chart
+    breakdown = sample_export_data()["breakdown_medis"]
+    create_breakdown_chart(breakdown, "warmup")
+    return lambda: create_breakdown_chart(breakdown, "Breakdown Skor Asesmen Medis"), 1
+
+
+@benchmark("charts.create_probability_chart")
+def _():
+    from tat_predictor.charts import create_probability_chart
+    probabilities = sample_export_data()["probabilities"]
+    create_probability_chart(probabilities)
+    return lambda: create_probability_chart(probabilities), 1
+
+
+@benchmark("charts.create_dashboard_chart")
+def _():
+    from tat_predictor.charts import create_dashboard_chart
+    results = sample_export_data()
+    create_dashboard_chart(results)
+    return lambda: create_dashboard_chart(results), 1
+
+
+@benchmark("charts.create_gauge_chart.cold")
+def _():
+    # Tanpa cache figure: setiap panggilan membangun figure baru
+    from tat_predictor import charts
+
+    def build():
+        charts._gauge_figure.cache_clear()
+        charts.create_gauge_chart(73, "Skor Asesmen Medis")
+    build()
+    return build, 1
+
+
+@benchmark("charts.create_breakdown_chart.cold")
+def _():
+    from tat_predictor import charts
+    breakdown = sample_export_data()["breakdown_medis"]
+
+    def build():
+        charts._breakdown_figure.cache_clear()
+        charts.create_breakdown_chart(breakdown, "Breakdown Skor Asesmen Medis")
+    build()
+    return build, 1
+
+
+@benchmark("charts.create_probability_chart.cold")
+def _():
+    from tat_predictor import charts
+    probabilities = sample_export_data()["probabilities"]
+
+    def build():
+        charts._probability_figure.cache_clear()
+        charts.create_probability_chart(probabilities)
+    build()
+    return build, 1
+
+# =============================================================================
+# ANALITIK KOHORT
+# =============================================================================
+
+def _cohort_store(n=20_000):
+    from tat_predictor.store import CaseStore
+    store = CaseStore(os.path.join(tempfile.mkdtemp(), "cohort.db"))
+    records = []
+    for i, case in enumerate(sample_cases(n)):
+        export_data = sample_export_data(case)
+        export_data["timestamp"] = f"2025-{i % 12 + 1:02d}-01 09:00:00"
+        records.append(export_data)
+    store.add_many(records)
+    return store
+
+
+@benchmark("store.cohort.rollup")
+def _():
+    # Dibaca dari tabel rollup: biaya tidak bergantung pada jumlah kasus
+    store = _cohort_store()
+    return lambda: (store.cohort("jenis_narkotika"), store.score_histogram()), 1
+
+
+@benchmark("store.cohort.groupby")
+def _():
+    # Pembanding: GROUP BY langsung atas tabel kasus setiap kali halaman dibuka
+    store = _cohort_store()
+    sql = ("SELECT jenis_narkotika, primary_rec, rule_id, COUNT(*), AVG(skor_medis), AVG(skor_hukum),"
+           " AVG(final_score) FROM cases GROUP BY 1, 2, 3")
+    return lambda: store._conn().execute(sql).fetchall(), 1
+
+
+@benchmark("archive.cohort.mmap")
+def _():
+    # Kohort dari arsip Arrow: hanya 6 kolom yang dibaca lewat memory map
+    from tat_predictor import archive
+    path = os.path.join(tempfile.mkdtemp(), "arsip")
+    archive.append_store(_cohort_store(), path)
+    return lambda: archive.cohort(path, "jenis_narkotika"), 1
+
+
+# =============================================================================
+# RERUN STREAMLIT
+# =============================================================================
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    # Riwayat kasus ditulis ke database sementara, bukan tat_cases.db
+    os.environ.setdefault("TAT_DB_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Aplikasi gagal dijalankan: {at.exception}")
+    return at
+
+
+@benchmark("app.rerun.idle")
+def _():
+    at = _app_test()
+    return at.run, 1
+
+
+@benchmark("app.rerun.analyze")
+def _():
+    at = _app_test()
+    button = next(b for b in at.button if "ANALISIS" in b.label)
+
+    def analyze():
+        button.click()
+        at.run()
+
+    analyze()
+    return analyze, 1
+
+@benchmark("app.rerun.toggle_checkbox")
+def _():
+    # Satu checkbox DSM-5 diubah setelah ada hasil analisis (tab hasil dan
+    # grafik ikut dirender pada rerun penuh)
+    at = _app_test()
+    next(b for b in at.button if "ANALISIS" in b.label).click()
+    at.run()
+
+    def toggle():
+        checkbox = at.checkbox(key="dsm5_1")
+        checkbox.set_value(not checkbox.value)
+        at.run()
+
+    toggle()
+    return toggle, 1
+
+def _fragment_script(fragment):
+    import tat_predictor_bnn_app as app
+    getattr(app, fragment)()
+
+
+def _fragment_test(fragment):
+    """
+    AppTest yang hanya menjalankan satu fragment (seperti rerun fragment di
+    Streamlit), dengan session state berisi hasil analisis. AppTest selalu
+    menjalankan script penuh, jadi fragment dijalankan sebagai script
+    tersendiri.
+    """
+    from streamlit.testing.v1 import AppTest
+    full = _app_test()
+    next(b for b in full.button if "ANALISIS" in b.label).click()
+    full.run()
+
+    at = AppTest.from_function(_fragment_script, args=(fragment,), default_timeout=120)
+    at.session_state["results"] = full.session_state["results"]
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Fragment {fragment} gagal dijalankan: {at.exception}")
+    return at
+
+
+@benchmark("app.fragment.input_form.toggle_checkbox")
+def _():
+    at = _fragment_test("input_form")
+
+    def toggle():
+        checkbox = at.checkbox(key="dsm5_1")
+        checkbox.set_value(not checkbox.value)
+        at.run()
+
+    toggle()
+    return toggle, 1
+
+
+@benchmark("app.fragment.charts_view.redraw")
+def _():
+    at = _fragment_test("charts_view")
+    return at.run, 1
+
+
+@benchmark("app.fragment.charts_view.compact")
+def _():
+    # Mode hemat data: satu figure gabungan (lihat dashboard_payload.py)
+    at = _fragment_test("charts_view")
+    at.toggle(key="compact_dashboard").set_value(True)
+    at.run()
+    return at.run, 1
+
+
+# =============================================================================
+# PENGUKURAN
+# =============================================================================
+
+def measure(fn, repeat=DEFAULT_REPEAT, min_seconds=MIN_REPEAT_SECONDS):
+    """
+    Waktu per panggilan (detik) untuk `repeat` pengulangan. Jumlah loop
+    per pengulangan dikalibrasi agar tiap pengulangan >= min_seconds.
+    """
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_seconds / 10 else 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - started) / loops)
+    return timings, loops
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pattern=None, repeat=DEFAULT_REPEAT, min_seconds=MIN_REPEAT_SECONDS):
+    """Jalankan benchmark yang namanya cocok dengan regex `pattern`"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        fn, items = setup()
+        timings, loops = measure(fn, repeat, min_seconds)
+        best = min(timings)
+        results[name] = {
+            "best": best,
+            "median": statistics.median(timings),
+            "items": items,
+            "per_item": best / items,
+            "loops": loops,
+            "repeat": repeat,
+        }
+        print(f"{name:45s} {_format_seconds(best):>10s}"
+              + (f"  ({_format_seconds(best / items)}/kasus)" if items > 1 else ""),
+              file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(base, new, threshold=DEFAULT_THRESHOLD):
+    """
+    Bandingkan dua hasil run (waktu terbaik per panggilan).
+
+    Returns:
+        list (nama, detik base, detik new, perubahan %, regresi?) untuk
+        benchmark yang ada di kedua run.
+    """
+    rows = []
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        before, after = base["results"][name]["best"], result["best"]
+        change = (after / before - 1) * 100 if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Jalankan benchmark dan simpan hasil JSON")
+    run_parser.add_argument("-o", "--output", default="-",
+                            help="File JSON hasil (default: stdout)")
+    run_parser.add_argument("-k", "--filter", metavar="REGEX",
+                            help="Hanya benchmark yang namanya cocok, mis. -k '^scoring'")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument("--min-seconds", type=float, default=MIN_REPEAT_SECONDS,
+                            help="Durasi minimum satu pengulangan")
+    run_parser.add_argument("--list", action="store_true", help="Tampilkan nama benchmark saja")
+
+    compare_parser = sub.add_parser("compare", help="Bandingkan dua file hasil")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Ambang regresi dalam persen (default: 10)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.list:
+            print("\n".join(name for name in BENCHMARKS
+                            if not args.filter or re.search(args.filter, name)))
+            return 0
+        result = run(args.filter, args.repeat, args.min_seconds)
+        text = json.dumps(result, indent=2)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+        return 0
+
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.new, encoding="utf-8") as fh:
+        new = json.load(fh)
+
+    regressions = 0
+    for name, before, after, change, regressed in compare(base, new, args.threshold):
+        flag = "REGRESI" if regressed else ""
+        print(f"{name:45s} {_format_seconds(before):>10s} -> {_format_seconds(after):>10s}"
+              f"  {change:+6.1f}%  {flag}")
+        regressions += regressed
+    print(f"{regressions} regresi di atas {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Paket inti Sistem Prediksi TAT BNN.
+
+- scoring : skor asesmen medis/hukum dan decision rules (per kasus)
+- messages : katalog pesan detail breakdown (kode + parameter -> teks saat dirender)
+- rule_engine : decision rules deklaratif dari file JSON (kompilasi + hot reload)
+- decision_table : tabel keputusan hasil enumerasi ruang input (lookup O(1))
+- preview : pratinjau skor langsung, memo terpisah per sisi medis/hukum
+- batch   : skoring tervektorisasi untuk tabel kasus (butuh NumPy)
+- compact : kasus ringkas berkode integer (enum, bitmask zat, dtype terstruktur)
+- parallel : skoring batch paralel multi-core, kolom lewat shared memory
+- uncertainty : estimasi ketidakpastian rekomendasi (Monte Carlo tervektorisasi)
+- replay  : replay arsip kasus pada dua versi aturan (matriks transisi)
+- store   : riwayat kasus persisten (SQLite, WAL, keyset pagination, rollup kohort)
+- archive : arsip kolumnar Arrow IPC per bulan, dibaca lewat memory map (butuh pyarrow)
+- result_cache : cache hasil/laporan berbasis hash isi (LRU, batas byte, tier disk)
+- reports : laporan TXT dan PDF (reportlab dimuat saat PDF dibuat)
+- pdf_fast : PDF jalur cepat, layout tetap di atas latar statis yang sudah dirender
+- report_jobs : antrian render laporan latar belakang, adil antar-sesi
+- bulk    : render PDF massal paralel ke ZIP / PDF gabungan
+- charts  : grafik Plotly (plotly dimuat saat grafik dibuat)
+- metrics : timing per tahap dan ekspor metrik Prometheus (opsional)
+- service : layanan HTTP skoring asyncio (single + batch NDJSON)
+- cli     : mode headless, `python -m tat_predictor`
+"""
+
+from tat_predictor.scoring import (
+    GRAMATUR_LIMITS,
+    JENIS_NARKOTIKA,
+    DSM5_CRITERIA,
+    FUNGSI_SOSIAL_OPTIONS,
+    TINGKAT_KOMORBID_OPTIONS,
+    ROLE_MAPPING,
+    ARREST_MAPPING,
+    HISTORY_MAPPING,
+    REKOMENDASI,
+    calculate_medical_score,
+    calculate_legal_score,
+    apply_decision_rules,
+)
@@ -0,0 +1,5 @@
+import sys
+
+from tat_predictor.cli import main
+
+sys.exit(main())
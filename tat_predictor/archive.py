@@ -0,0 +1,344 @@
+"""
+Arsip kolumnar hasil analisis (Arrow IPC, dipartisi per bulan).
+
+Hasil analisis ditambahkan ke direktori arsip sebagai file Arrow IPC
+tanpa kompresi, satu file per batch per partisi bulan:
+
+    arsip/month=2025-12/part-<waktu>-<pid>.arrow
+
+Kolom kategori (jenis narkotika, peran, rekomendasi, aturan, ...) disimpan
+dictionary-encoded dengan indeks int8, angka dengan tipe sekecil mungkin.
+File dibaca lewat memory map: hanya kolom yang diminta yang disentuh
+(zero-copy), sehingga I/O dan RAM sebanding dengan kolom dan bulan yang
+dibaca, bukan dengan ukuran arsip. Partisi bulan yang tidak diminta tidak
+dibuka sama sekali.
+
+Direktori arsip juga dapat dibaca pyarrow.dataset
+(format="ipc", partitioning="hive"). Reasoning dan detail breakdown tidak
+diarsipkan; keduanya dapat diturunkan ulang dari input lewat replay.
+
+Butuh pyarrow (opsional, tidak termasuk requirements.txt).
+"""
+
+import glob
+import os
+import threading
+import time
+
+from tat_predictor.batch import INPUT_COLUMNS, PROB_COLUMNS, ZAT_SEPARATOR
+from tat_predictor.scoring import REKOMENDASI
+
+# Jumlah kasus per file part (per partisi bulan)
+DEFAULT_BATCH_SIZE = 100_000
+
+# Kolom arsip -> tipe: "dict8"/"dict16" = dictionary<int8/int16, string>
+COLUMNS = {
+    "case_id": "int64",
+    "timestamp": "string",
+    "nama_inisial": "string",
+    "usia": "int16",
+    "jenis_kelamin": "dict8",
+    "zat_positif": "dict16",   # teks dipisah ZAT_SEPARATOR
+    "num_zat": "int8",
+    "dsm5_count": "int8",
+    "durasi_bulan": "float64",  # boleh pecahan, seperti di batch/compact
+    "fungsi_sosial": "dict8",
+    "ada_komorbid": "bool",
+    "tingkat_komorbid": "dict8",
+    "peran": "dict8",
+    "barang_bukti": "float64",
+    "jenis_narkotika": "dict8",
+    "status_tangkap": "dict8",
+    "riwayat_pidana": "dict8",
+    "skor_medis": "int16",
+    "skor_hukum": "int16",
+    "final_score": "float64",
+    "primary_rec": "dict8",
+    "rule_id": "dict8",
+    **{column: "float64" for column in PROB_COLUMNS},
+}
+
+# Kolom yang dibutuhkan replay (num_zat menggantikan zat_positif)
+REPLAY_COLUMNS = ["case_id", "timestamp", "num_zat"] + [c for c in INPUT_COLUMNS if c != "zat_positif"]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:  # pragma: no cover - tergantung environment
+        raise ImportError("Arsip kolumnar membutuhkan pyarrow: pip install pyarrow") from exc
+    return pa
+
+
+def schema():
+    """Skema Arrow arsip (dibangun dari COLUMNS)"""
+    pa = _require_pyarrow()
+    types = {
+        "dict8": pa.dictionary(pa.int8(), pa.string()),
+        "dict16": pa.dictionary(pa.int16(), pa.string()),
+    }
+    return pa.schema([(name, types.get(kind) or pa.type_for_alias(kind)) for name, kind in COLUMNS.items()])
+
+# =============================================================================
+# PENULISAN
+# =============================================================================
+
+def _row(record):
+    """
+    Satu baris arsip dari hasil analisis: dict session_state['results'],
+    export_data atau record CaseStore.records().
+    """
+    from tat_predictor.store import _rule_id
+
+    input_data = record.get("input_data") or {}
+    zat_positif = input_data.get("zat_positif") or []
+    if isinstance(zat_positif, str):
+        zat_positif = [zat.strip() for zat in zat_positif.split(ZAT_SEPARATOR) if zat.strip()]
+    probabilities = record.get("probabilities") or {}
+
+    row = {
+        "case_id": record.get("case_id"),
+        "timestamp": record["timestamp"],
+        "nama_inisial": input_data.get("nama_inisial"),
+        "usia": input_data.get("usia"),
+        "jenis_kelamin": input_data.get("jenis_kelamin"),
+        "zat_positif": ZAT_SEPARATOR.join(zat_positif),
+        "num_zat": len(zat_positif),
+        "skor_medis": record.get("skor_medis"),
+        "skor_hukum": record.get("skor_hukum"),
+        "final_score": record.get("final_score"),
+        "primary_rec": record.get("primary_rec") or record.get("rekomendasi_utama"),
+        "rule_id": _rule_id(record),
+    }
+    for column in INPUT_COLUMNS:
+        if column != "zat_positif":
+            row[column] = input_data.get(column)
+    for column, rec in zip(PROB_COLUMNS, REKOMENDASI):
+        row[column] = probabilities.get(rec)
+    return row
+
+
+class ArchiveWriter:
+    """
+    Penambah hasil ke arsip. Baris ditampung per bulan dan ditulis sebagai
+    satu file part baru setiap `batch_size` kasus, saat flush() atau
+    close(). File part ditulis ke file sementara lalu di-rename, sehingga
+    pembaca tidak pernah melihat file setengah jadi.
+
+    Args:
+        path: direktori arsip (dibuat bila belum ada)
+        batch_size: jumlah kasus per file part
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._schema = schema()
+        self._pending = {}  # bulan -> list baris
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, record):
+        """Tambah satu hasil analisis"""
+        row = _row(record)
+        month = row["timestamp"][:7]
+        with self._lock:
+            rows = self._pending.setdefault(month, [])
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                self._write(month, self._pending.pop(month))
+
+    def append_many(self, records):
+        """Tambah banyak hasil; mengembalikan jumlah kasus"""
+        count = 0
+        for record in records:
+            self.append(record)
+            count += 1
+        return count
+
+    def flush(self):
+        """Tulis semua baris yang masih ditampung"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for month, rows in pending.items():
+                self._write(month, rows)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, month, rows):
+        pa = _require_pyarrow()
+
+        columns = {name: [row[name] for row in rows] for name in COLUMNS}
+        table = pa.table({name: pa.array(values, type=self._schema.field(name).type)
+                          for name, values in columns.items()}, schema=self._schema)
+
+        partition = os.path.join(self.path, f"month={month}")
+        os.makedirs(partition, exist_ok=True)
+        name = f"part-{time.time_ns():020d}-{os.getpid()}.arrow"
+        tmp = os.path.join(partition, f".{name}.tmp")
+        # Tanpa kompresi: buffer file dapat dipakai langsung lewat memory map
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, self._schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, os.path.join(partition, name))
+
+# =============================================================================
+# PEMBACAAN (MEMORY MAP)
+# =============================================================================
+
+def list_months(path):
+    """Daftar partisi bulan yang ada di arsip (terurut)"""
+    return sorted(entry[len("month="):] for entry in os.listdir(path)
+                  if entry.startswith("month=") and os.path.isdir(os.path.join(path, entry)))
+
+
+def _part_files(path, month_filter=None):
+    available = list_months(path)
+    selected = available if month_filter is None else sorted(set(available) & set(month_filter))
+    for month in selected:
+        yield from sorted(glob.glob(os.path.join(path, f"month={month}", "part-*.arrow")))
+
+
+def scan(path, columns=None, months=None):
+    """
+    Yield RecordBatch arsip berisi kolom `columns` saja, dibaca lewat
+    memory map tanpa menyalin data.
+
+    Args:
+        path: direktori arsip
+        columns: nama kolom (default: semua kolom)
+        months: list bulan "YYYY-MM" yang dibaca (default: semua)
+    """
+    pa = _require_pyarrow()
+    columns = list(columns) if columns is not None else list(COLUMNS)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Kolom arsip tidak dikenal: {unknown}")
+    target = schema()
+    target = pa.schema([target.field(name) for name in columns])
+
+    for part in _part_files(path, months):
+        with pa.memory_map(part, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                if batch.schema != target:
+                    # Part lama (durasi_bulan int16) di-cast ke skema sekarang
+                    # (salinan, hanya untuk part tersebut)
+                    batch = pa.record_batch([column.cast(field.type) for column, field
+                                             in zip(batch.columns, target)], schema=target)
+                yield batch
+
+
+def read_table(path, columns=None, months=None):
+    """pyarrow.Table dari scan(); chunk tetap menunjuk ke file yang di-map"""
+    pa = _require_pyarrow()
+    batches = list(scan(path, columns, months))
+    if not batches:
+        return schema().empty_table().select(list(columns) if columns is not None else list(COLUMNS))
+    return pa.Table.from_batches(batches)
+
+
+def read_cases(path, chunk_size=100_000, months=None):
+    """
+    Baca arsip per potongan untuk replay: yield DataFrame kolom
+    REPLAY_COLUMNS. Kolom kategori menjadi pandas Categorical, sehingga
+    encode_cases cukup memetakan kamusnya, bukan setiap baris.
+    """
+    pa = _require_pyarrow()
+    pending, rows = [], 0
+    for batch in scan(path, REPLAY_COLUMNS, months):
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def last_case_id(path):
+    """case_id terbesar di arsip (hanya kolom case_id yang dibaca), atau 0"""
+    import pyarrow.compute as pc
+
+    last = 0
+    for batch in scan(path, ["case_id"]):
+        value = pc.max(batch.column(0)).as_py()
+        if value is not None and value > last:
+            last = value
+    return last
+
+
+def append_store(store, path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Tambahkan kasus CaseStore yang belum ada di arsip (case_id lebih besar
+    dari case_id terakhir yang diarsipkan). Mengembalikan jumlah kasus.
+    """
+    with ArchiveWriter(path, batch_size) as writer:
+        return writer.append_many(store.records(after_id=last_case_id(path)))
+
+# =============================================================================
+# ANALITIK
+# =============================================================================
+
+def cohort(path, by, months=None):
+    """
+    Ringkasan kohort langsung dari arsip, format sama dengan
+    CaseStore.cohort(). Hanya kolom `by`, rekomendasi, aturan dan skor yang
+    dibaca; dimensi "month" diambil dari nama partisi.
+    """
+    from tat_predictor.store import COHORT_DIMENSIONS
+
+    if by not in COHORT_DIMENSIONS:
+        raise ValueError(f"Dimensi kohort tidak dikenal: {by!r}")
+    pa = _require_pyarrow()
+    import pyarrow.compute as pc
+
+    columns = ["primary_rec", "rule_id", "skor_medis", "skor_hukum", "final_score"]
+
+    tables = []
+    for month in list_months(path) if months is None else sorted(set(list_months(path)) & set(months)):
+        table = read_table(path, columns if by == "month" else [by] + columns, [month])
+        if by == "month":
+            table = table.append_column("month", pa.array([month] * table.num_rows, pa.string()))
+        else:
+            # Nilai kosong dikelompokkan sebagai "", sama dengan rollup CaseStore
+            table = table.set_column(0, by, pc.fill_null(table.column(by).cast(pa.string()), ""))
+        tables.append(table.select([by] + columns))
+    if not tables:
+        return []
+
+    table = pa.concat_tables(tables).combine_chunks()
+    for name in ("primary_rec", "rule_id"):
+        table = table.set_column(table.schema.get_field_index(name), name,
+                                 pc.fill_null(table.column(name).cast(pa.string()), ""))
+    grouped = table.group_by([by, "primary_rec", "rule_id"]).aggregate(
+        [([], "count_all"), ("skor_medis", "sum"), ("skor_hukum", "sum"), ("final_score", "sum")]
+    )
+
+    groups = {}
+    for row in grouped.sort_by(by).to_pylist():
+        group = groups.get(row[by])
+        if group is None:
+            group = groups[row[by]] = {"value": row[by], "n": 0, "mean_medis": 0.0, "mean_hukum": 0.0,
+                                       "mean_final": 0.0, "rekomendasi": {}, "rules": {}}
+        n = row["count_all"]
+        group["n"] += n
+        group["mean_medis"] += row["skor_medis_sum"]
+        group["mean_hukum"] += row["skor_hukum_sum"]
+        group["mean_final"] += row["final_score_sum"]
+        group["rekomendasi"][row["primary_rec"]] = group["rekomendasi"].get(row["primary_rec"], 0) + n
+        group["rules"][row["rule_id"]] = group["rules"].get(row["rule_id"], 0) + n
+
+    for group in groups.values():
+        for key in ("mean_medis", "mean_hukum", "mean_final"):
+            group[key] /= group["n"]
+    return list(groups.values())
@@ -0,0 +1,306 @@
+"""
+Skoring batch tervektorisasi untuk tabel kasus.
+
+Menghasilkan skor dan rekomendasi yang identik dengan
+calculate_medical_score, calculate_legal_score dan apply_decision_rules,
+tetapi dihitung per kolom dengan NumPy sehingga jutaan kasus arsip dapat
+diproses sekaligus.
+"""
+
+import functools
+
+import numpy as np
+
+from tat_predictor.decision_table import get_decision_table
+from tat_predictor.scoring import (
+    GRAMATUR_LIMITS,
+    FUNGSI_SOSIAL_OPTIONS,
+    TINGKAT_KOMORBID_OPTIONS,
+    ROLE_MAPPING,
+    ARREST_MAPPING,
+    HISTORY_MAPPING,
+    REKOMENDASI,
+)
+
+# =============================================================================
+# KONSTANTA
+# =============================================================================
+
+# Kolom input (sama dengan parameter fungsi skor skalar)
+INPUT_COLUMNS = [
+    "zat_positif",
+    "dsm5_count",
+    "durasi_bulan",
+    "fungsi_sosial",
+    "ada_komorbid",
+    "tingkat_komorbid",
+    "peran",
+    "barang_bukti",
+    "jenis_narkotika",
+    "status_tangkap",
+    "riwayat_pidana",
+]
+
+# Kolom probabilitas, urutannya mengikuti REKOMENDASI
+PROB_COLUMNS = [
+    "prob_rawat_jalan",
+    "prob_rawat_inap",
+    "prob_proses_hukum",
+    "prob_hukum_rehab",
+]
+
+OUTPUT_COLUMNS = ["skor_medis", "skor_hukum", "final_score", "primary_rec"] + PROB_COLUMNS
+
+# Pemisah daftar zat positif bila disimpan sebagai teks (mis. di CSV)
+ZAT_SEPARATOR = ";"
+
+# Kategori breakdown -> nama array komponen pada hasil score_components()
+COMPONENT_KEYS = {
+    "Tes Urine": "urine",
+    "Tingkat Kecanduan": "addiction",
+    "Durasi Penggunaan": "duration",
+    "Fungsi Sosial": "social",
+    "Komorbid": "comorbid",
+    "Keterlibatan Jaringan": "network",
+    "Barang Bukti": "evidence",
+    "Status Penangkapan": "arrest",
+    "Riwayat Pidana": "history",
+}
+
+_REKOMENDASI_LABELS = np.array(REKOMENDASI, dtype=object)
+
+# =============================================================================
+# ENCODING INPUT
+# =============================================================================
+
+def _encode_labels(values, labels, name, strict):
+    """
+    Mengubah kolom label menjadi kode integer (indeks pada `labels`).
+
+    Label yang tidak dikenal diberi kode -1; jika `strict`, KeyError
+    dilempar seperti lookup dict pada fungsi skalar.
+    """
+    lookup = {label: i for i, label in enumerate(labels)}
+    categorical = getattr(values, "cat", None)
+    if categorical is not None:
+        # Kolom kategori (mis. dari arsip kolumnar): cukup petakan kamusnya;
+        # kode -1 (nilai kosong) jatuh ke elemen terakhir (-1)
+        mapping = np.array([lookup.get(v, -1) for v in categorical.categories] + [-1], dtype=np.int8)
+        codes = mapping[categorical.codes.to_numpy()]
+    else:
+        codes = np.fromiter((lookup.get(v, -1) for v in values),
+                            dtype=np.int8, count=len(values))
+    if strict and (codes < 0).any():
+        unknown = next(v for v in values if v not in lookup)
+        raise KeyError(f"{name}: {unknown!r}")
+    return codes
+
+
+def _count_zat(value):
+    """Jumlah zat positif dari list/tuple atau teks dipisah ZAT_SEPARATOR"""
+    if isinstance(value, str):
+        return sum(1 for zat in value.split(ZAT_SEPARATOR) if zat.strip())
+    if value is None or value != value:  # None / NaN dari sel kosong
+        return 0
+    return len(value)
+
+
+def _numeric(values):
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "iuf":
+        arr = arr.astype(np.float64)
+    return arr
+
+
+def encode_cases(cases):
+    """
+    Mengubah tabel kasus (DataFrame atau dict kolom) menjadi kolom NumPy
+    berkode integer yang siap diproses score_encoded().
+
+    Kolom `zat_positif` boleh diganti dengan kolom `num_zat` (jumlah zat).
+    """
+    if "num_zat" in cases:
+        num_zat = np.asarray(cases["num_zat"], dtype=np.int64)
+    else:
+        num_zat = np.fromiter((_count_zat(v) for v in cases["zat_positif"]),
+                              dtype=np.int64, count=len(cases["zat_positif"]))
+
+    ada_komorbid = np.asarray(cases["ada_komorbid"]).astype(bool)
+    komorbid_berat = _encode_labels(cases["tingkat_komorbid"], TINGKAT_KOMORBID_OPTIONS,
+                                    "tingkat_komorbid", strict=False) != 0
+    # 0 = tidak ada, 1 = ringan, 2 = berat (selain "Ringan" dianggap berat)
+    komorbid = np.where(ada_komorbid, np.where(komorbid_berat, 2, 1), 0).astype(np.int8)
+
+    return {
+        "num_zat": num_zat,
+        "dsm5_count": _numeric(cases["dsm5_count"]),
+        "durasi_bulan": _numeric(cases["durasi_bulan"]),
+        "fungsi_sosial": _encode_labels(cases["fungsi_sosial"], FUNGSI_SOSIAL_OPTIONS,
+                                        "fungsi_sosial", strict=False),
+        "komorbid": komorbid,
+        "peran": _encode_labels(cases["peran"], list(ROLE_MAPPING),
+                                "peran", strict=True),
+        "barang_bukti": _numeric(cases["barang_bukti"]),
+        "jenis_narkotika": _encode_labels(cases["jenis_narkotika"], list(GRAMATUR_LIMITS),
+                                          "jenis_narkotika", strict=False),
+        "status_tangkap": _encode_labels(cases["status_tangkap"], list(ARREST_MAPPING),
+                                         "status_tangkap", strict=True),
+        "riwayat_pidana": _encode_labels(cases["riwayat_pidana"], list(HISTORY_MAPPING),
+                                         "riwayat_pidana", strict=True),
+    }
+
+# =============================================================================
+# SKORING TERVEKTORISASI
+# =============================================================================
+
+@functools.lru_cache(maxsize=1)
+def _table_arrays(table):
+    """Tampilan NumPy dari tabel keputusan (dibuat ulang bila tabel diganti)"""
+    offsets = []
+    for _, offset in table.offsets:
+        lut = np.full(max(offset) + 1, -len(table), dtype=np.int64)
+        for skor, value in offset.items():
+            lut[skor] = value
+        offsets.append(lut)
+
+    return {
+        "offsets": offsets,
+        "states": np.frombuffer(table.states, dtype=np.uint16),
+        "final_scores": np.frombuffer(table.final_scores, dtype=np.float64),
+        "primary": np.frombuffer(table.outcome_primary, dtype=np.uint8),
+        "rule": np.frombuffer(table.outcome_rule, dtype=np.uint8),
+        "probabilities": np.array([[p for _, p in o[0]] for o in table.outcomes], dtype=np.float64),
+    }
+
+
+def score_components(enc, gramatur_limits=None):
+    """
+    Skor komponen medis dan hukum untuk kolom hasil encode_cases().
+
+    Returns:
+        dict berisi array per komponen skor (lihat COMPONENT_KEYS),
+        skor_medis dan skor_hukum.
+    """
+    if gramatur_limits is None:
+        gramatur_limits = GRAMATUR_LIMITS
+
+    # --- Asesmen medis ---
+    num_zat = enc["num_zat"]
+    urine = np.where(num_zat == 0, 0,
+             np.where(num_zat == 1, 10,
+             np.where(num_zat <= 3, 15, 25)))
+
+    dsm5 = enc["dsm5_count"]
+    addiction = np.where(dsm5 <= 1, 0,
+                np.where(dsm5 <= 3, 10,
+                np.where(dsm5 <= 5, 20, 30)))
+
+    durasi = enc["durasi_bulan"]
+    duration = np.where(durasi < 6, 5, np.where(durasi <= 12, 10, 15))
+
+    # Kode -1 (label tak dikenal) jatuh ke elemen terakhir = cabang `else`
+    social = np.array([0, 8, 15])[enc["fungsi_sosial"]]
+    comorbid = np.array([0, 8, 15])[enc["komorbid"]]
+
+    skor_medis = urine + addiction + duration + social + comorbid
+
+    # --- Asesmen hukum ---
+    network = np.array(list(ROLE_MAPPING.values()))[enc["peran"]]
+
+    # Kode -1 (jenis tak dikenal) memakai batas default 1.0g
+    limit_table = np.array([gramatur_limits.get(j, 1.0) for j in GRAMATUR_LIMITS] + [1.0])
+    limit = limit_table[enc["jenis_narkotika"]]
+    bb = enc["barang_bukti"]
+    evidence = np.where(bb < limit, 0,
+               np.where(bb <= limit * 5, 10,
+               np.where(bb <= limit * 20, 18, 25)))
+
+    arrest = np.array(list(ARREST_MAPPING.values()))[enc["status_tangkap"]]
+    history = np.array(list(HISTORY_MAPPING.values()))[enc["riwayat_pidana"]]
+
+    skor_hukum = network + evidence + arrest + history
+
+    return {
+        "urine": urine,
+        "addiction": addiction,
+        "duration": duration,
+        "social": social,
+        "comorbid": comorbid,
+        "network": network,
+        "evidence": evidence,
+        "arrest": arrest,
+        "history": history,
+        "skor_medis": skor_medis,
+        "skor_hukum": skor_hukum,
+    }
+
+
+def score_encoded(enc, gramatur_limits=None, table=None):
+    """
+    Menghitung skor medis, skor hukum dan decision rules untuk kolom hasil
+    encode_cases().
+
+    Args:
+        table: array tabel keputusan dari _table_arrays() (default: tabel
+            aturan aktif; worker paralel memakai tabel milik proses induk)
+
+    Returns:
+        dict hasil score_components() ditambah final_score, outcome (nomor
+        outcome tabel keputusan), primary_code (indeks REKOMENDASI), rule
+        (indeks aturan pada rule set aktif) dan matriks probabilities (n x 4).
+    """
+    result = score_components(enc, gramatur_limits)
+
+    # --- Decision rules (lookup pada tabel keputusan) ---
+    if table is None:
+        table = _table_arrays(get_decision_table())
+    components = [result[key] for key in COMPONENT_KEYS.values()]
+    state = table["offsets"][0][components[0]]
+    for offset, values in zip(table["offsets"][1:], components[1:]):
+        state = state + offset[values]
+    if (state < 0).any():
+        raise ValueError("Kombinasi skor di luar tabel keputusan")
+    outcome = table["states"][state]
+
+    result.update({
+        "final_score": table["final_scores"][state],
+        "outcome": outcome,
+        "primary_code": table["primary"][outcome],
+        "rule": table["rule"][outcome],
+        "probabilities": table["probabilities"][outcome],
+    })
+    return result
+
+
+def score_batch(cases, gramatur_limits=None):
+    """
+    Skoring batch untuk seluruh tabel kasus.
+
+    Args:
+        cases: pandas DataFrame atau dict berisi kolom INPUT_COLUMNS
+        gramatur_limits: override GRAMATUR_LIMITS (opsional)
+
+    Returns:
+        DataFrame (jika input DataFrame) atau dict array dengan kolom
+        OUTPUT_COLUMNS.
+    """
+    return _batch_output(cases, score_encoded(encode_cases(cases), gramatur_limits))
+
+
+def _batch_output(cases, result):
+    """Kolom OUTPUT_COLUMNS dari hasil score_encoded(), format mengikuti input"""
+    columns = {
+        "skor_medis": result["skor_medis"],
+        "skor_hukum": result["skor_hukum"],
+        "final_score": result["final_score"],
+        "primary_rec": _REKOMENDASI_LABELS[result["primary_code"]],
+    }
+    for i, col in enumerate(PROB_COLUMNS):
+        columns[col] = result["probabilities"][:, i]
+
+    if hasattr(cases, "columns") and hasattr(cases, "index"):
+        import pandas as pd
+        columns["primary_rec"] = pd.Categorical.from_codes(result["primary_code"],
+                                                           categories=REKOMENDASI)
+        return pd.DataFrame(columns, index=cases.index)
+    return columns
@@ -0,0 +1,140 @@
+"""
+Render laporan PDF massal untuk banyak kasus sekaligus.
+
+Laporan dirender paralel di process pool; setiap worker memanaskan
+stylesheet dan TableStyle sekali saat start (_pdf_styles di-cache per
+proses). Hasil ditulis bertahap (streaming) ke satu file ZIP sesuai urutan
+input, sehingga memori tetap terbatas berapa pun jumlah kasusnya. PDF
+gabungan (render_pdf_merged) memakai jalur paralel yang sama, lalu
+halamannya digabung dengan pypdf.
+
+Dengan fast=True laporan ZIP dirender lewat jalur cepat pdf_fast (layout
+tetap di atas latar statis), jauh lebih murah per laporan daripada
+layout platypus.
+"""
+
+import io
+import itertools
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from tat_predictor.pdf_fast import _skeleton, generate_pdf_report_fast
+from tat_predictor.reports import _pdf_styles, generate_pdf_report
+
+
+def _init_worker():
+    # Impor reportlab dan bangun style sekali per worker
+    _pdf_styles()
+
+
+def _init_fast_worker():
+    # Latar statis jalur cepat dibangun sekali per worker
+    _init_worker()
+    _skeleton(True)
+
+
+def default_pdf_name(index, export_data):
+    """Nama file PDF di dalam ZIP: nomor urut + case_id/timestamp"""
+    label = export_data.get("case_id") or export_data.get("timestamp", "-")
+    label = str(label).replace(":", "-").replace(" ", "_").replace("/", "-")
+    return f"{index + 1:05d}_TAT_Analysis_{label}.pdf"
+
+
+def _render_many(batch, fast):
+    """Render satu tugas worker: daftar bytes PDF sesuai urutan batch"""
+    render = generate_pdf_report_fast if fast else generate_pdf_report
+    return [render(export_data) for export_data in batch]
+
+
+def _render_chunks(records, workers, chunksize, fast=False):
+    """
+    Yield (export_data, bytes PDF) sesuai urutan input, dengan jumlah
+    tugas in-flight terbatas.
+
+    Setiap tugas berisi `chunksize` laporan. Begitu tugas terdepan selesai
+    dan hasilnya di-yield, satu tugas baru langsung dikirim, sehingga
+    worker tidak menganggur menunggu satu jendela penuh selesai.
+    """
+    initializer = _init_fast_worker if fast else _init_worker
+    if workers == 1:
+        initializer()
+        render = generate_pdf_report_fast if fast else generate_pdf_report
+        for export_data in records:
+            yield export_data, render(export_data)
+        return
+
+    max_in_flight = workers * 4
+    records = iter(records)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        def submit():
+            batch = list(itertools.islice(records, chunksize))
+            if batch:
+                pending.append((batch, pool.submit(_render_many, batch, fast)))
+            return bool(batch)
+
+        while len(pending) < max_in_flight and submit():
+            pass
+        while pending:
+            batch, future = pending.popleft()
+            pdfs = future.result()
+            submit()
+            yield from zip(batch, pdfs)
+
+
+def render_pdf_zip(records, output, workers=None, chunksize=4, name_func=default_pdf_name, fast=False):
+    """
+    Render satu PDF per kasus ke dalam satu arsip ZIP.
+
+    Args:
+        records: iterable export_data (dict seperti di tab Hasil Analisis)
+        output: path atau file object biner tujuan ZIP
+        workers: jumlah proses (default: jumlah core CPU)
+        chunksize: jumlah laporan per tugas yang dikirim ke worker
+        name_func: fungsi (index, export_data) -> nama file di ZIP
+        fast: render lewat jalur cepat generate_pdf_report_fast
+
+    Returns:
+        Jumlah laporan yang ditulis.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    count = 0
+    # PDF sudah terkompresi, jadi disimpan tanpa deflate agar proses utama
+    # tidak menjadi bottleneck
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as zf:
+        for index, (export_data, pdf_bytes) in enumerate(
+                _render_chunks(records, workers, chunksize, fast)):
+            zf.writestr(name_func(index, export_data), pdf_bytes)
+            count += 1
+    return count
+
+
+def render_pdf_merged(records, output, workers=None, chunksize=4, fast=False):
+    """
+    Render semua kasus ke satu PDF multi-halaman (satu kasus per halaman baru).
+
+    PDF per kasus dirender paralel seperti render_pdf_zip (jumlah tugas
+    in-flight terbatas) lalu halamannya digabung berurutan dengan pypdf.
+    Memori sebanding dengan ukuran PDF hasil (objek halaman terkompresi),
+    bukan dengan flowables seluruh kasus.
+
+    Args:
+        records, workers, chunksize, fast: lihat render_pdf_zip
+        output: path atau file object biner tujuan PDF
+
+    Returns:
+        Jumlah kasus yang ditulis.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    workers = workers or os.cpu_count() or 1
+    writer = PdfWriter()
+    count = 0
+    for _, pdf_bytes in _render_chunks(records, workers, chunksize, fast):
+        writer.append(PdfReader(io.BytesIO(pdf_bytes)))
+        count += 1
+    writer.write(output)
+    return count
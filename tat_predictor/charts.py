@@ -0,0 +1,308 @@
+"""
+Grafik Plotly untuk visualisasi hasil analisis TAT.
+
+Plotly baru diimpor saat grafik pertama dibuat.
+
+Bagian statis grafik (mode/axis/steps/threshold gauge, style bar dan
+layout) disusun sekali sebagai template dict. Figure hasil di-memoize per
+isi input (skor, breakdown, probabilitas), sehingga rerun dengan hasil
+yang sama memakai figure yang sudah ada tanpa membangun ulang. Figure dari
+cache dipakai bersama; salin dengan go.Figure(fig) sebelum dimodifikasi.
+
+create_dashboard_chart() menggabungkan kelima grafik ke satu figure
+make_subplots untuk koneksi lambat: satu layout dan satu template
+(dipangkas ke jenis trace yang dipakai) dikirim sekali, bukan lima kali.
+
+Grafik analitik kohort menerima data yang sudah diagregasi dan di-bin di
+server (rollup CaseStore), sehingga ukuran figure hanya bergantung pada
+jumlah kelompok/bin, bukan jumlah kasus.
+"""
+
+import functools
+
+# Jumlah figure per jenis grafik yang disimpan di cache
+CHART_CACHE_SIZE = 256
+
+# =============================================================================
+# TEMPLATE STATIS
+# =============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _gauge_template(max_score):
+    """Atribut Indicator yang tidak bergantung pada skor, per max_score"""
+    return {
+        'mode': "gauge+number+delta",
+        'domain': {'x': [0, 1], 'y': [0, 1]},
+        'delta': {'reference': max_score / 2},
+        'gauge': {
+            'axis': {'range': [None, max_score], 'tickwidth': 1},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, max_score / 3], 'color': "lightgreen"},
+                {'range': [max_score / 3, 2 * max_score / 3], 'color': "yellow"},
+                {'range': [2 * max_score / 3, max_score], 'color': "salmon"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': max_score * 0.8
+            }
+        },
+    }
+
+
+_GAUGE_LAYOUT = {'height': 300}
+
+_BREAKDOWN_ACTUAL = {'name': 'Skor Aktual', 'orientation': 'h', 'marker': {'color': '#1f77b4'},
+                     'textposition': 'auto'}
+_BREAKDOWN_REST = {'name': 'Sisa Skor', 'orientation': 'h', 'marker': {'color': '#d3d3d3'},
+                   'showlegend': False}
+_BREAKDOWN_LAYOUT = {
+    'barmode': 'stack',
+    'height': 400,
+    'xaxis_title': "Poin",
+    'yaxis_title': "Kategori",
+    'showlegend': True,
+}
+
+_PROBABILITY_LAYOUT = {
+    'title': "Distribusi Probabilitas Rekomendasi",
+    'xaxis_title': "Jenis Rekomendasi",
+    'yaxis_title': "Probabilitas (%)",
+    'yaxis': {'range': [0, 100]},
+    'height': 400,
+}
+
+_COHORT_DISTRIBUTION_LAYOUT = {
+    'barmode': 'stack',
+    'height': 400,
+    'yaxis_title': "Jumlah Kasus",
+    'legend': {'orientation': 'h', 'y': -0.25},
+}
+
+_SCORE_HISTOGRAM_LAYOUT = {
+    'title': "Distribusi Composite Score",
+    'xaxis_title': "Composite Score",
+    'yaxis_title': "Jumlah Kasus",
+    'bargap': 0.05,
+    'height': 350,
+}
+
+_DASHBOARD_LAYOUT = {
+    'barmode': 'stack',
+    'height': 1500,
+    'margin': {'t': 40, 'b': 40},
+    'legend': {'orientation': 'h', 'y': 1.02, 'yanchor': 'bottom', 'x': 1, 'xanchor': 'right'},
+}
+
+# Jenis trace yang dipakai dashboard; default template untuk jenis lain dibuang
+_DASHBOARD_TRACE_TYPES = ('bar', 'indicator')
+
+# Atribut layout template yang hanya berlaku untuk trace berskala warna
+_COLORSCALE_LAYOUT_KEYS = ('coloraxis', 'colorscale')
+
+
+def _minimal_template():
+    """
+    Template default aktif (mis. tema 'streamlit') tanpa bagian yang tidak
+    dipakai dashboard: default trace selain bar/indicator dan colorscale.
+    """
+    import plotly.io as pio
+
+    template = pio.templates[pio.templates.default].to_plotly_json()
+    return {
+        'data': {t: v for t, v in template.get('data', {}).items() if t in _DASHBOARD_TRACE_TYPES},
+        'layout': {k: v for k, v in template.get('layout', {}).items()
+                   if k not in _COLORSCALE_LAYOUT_KEYS},
+    }
+
+# =============================================================================
+# FUNGSI VISUALISASI
+# =============================================================================
+
+def create_gauge_chart(score, title, max_score=100):
+    """Membuat gauge chart untuk visualisasi skor (di-cache, jangan dimodifikasi)"""
+    return _gauge_figure(score, title, max_score)
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _gauge_figure(score, title, max_score):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        value=score,
+        title={'text': title, 'font': {'size': 20}},
+        **_gauge_template(max_score)
+    ))
+    fig.update_layout(**_GAUGE_LAYOUT)
+    return fig
+
+
+def create_breakdown_chart(breakdown, title):
+    """Membuat horizontal bar chart untuk breakdown skor (di-cache, jangan dimodifikasi)"""
+    items = tuple((cat, data['skor'], data['max']) for cat, data in breakdown.items())
+    return _breakdown_figure(items, title)
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _breakdown_figure(items, title):
+    import plotly.graph_objects as go
+
+    categories = [cat for cat, _, _ in items]
+    scores = [skor for _, skor, _ in items]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(y=categories, x=scores, text=scores, **_BREAKDOWN_ACTUAL))
+    fig.add_trace(go.Bar(y=categories, x=[max_score - skor for _, skor, max_score in items],
+                         **_BREAKDOWN_REST))
+    fig.update_layout(title=title, **_BREAKDOWN_LAYOUT)
+    return fig
+
+
+def create_probability_chart(probabilities):
+    """Membuat bar chart untuk probabilitas rekomendasi (di-cache, jangan dimodifikasi)"""
+    return _probability_figure(tuple(probabilities.items()))
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _probability_figure(items):
+    import plotly.graph_objects as go
+
+    categories = [cat for cat, _ in items]
+    values = [v for _, v in items]
+
+    colors_list = ['#28a745' if v == max(values) else '#17a2b8' for v in values]
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=categories,
+            y=values,
+            marker_color=colors_list,
+            text=[f"{v:.1f}%" for v in values],
+            textposition='auto',
+        )
+    ])
+    fig.update_layout(**_PROBABILITY_LAYOUT)
+    return fig
+
+
+def create_dashboard_chart(results):
+    """
+    Gauge medis/hukum, kedua breakdown dan probabilitas dalam satu figure
+    make_subplots (di-cache, jangan dimodifikasi).
+
+    Args:
+        results: dict hasil analisis (skor_medis, skor_hukum,
+            breakdown_medis, breakdown_hukum, probabilities)
+    """
+    def breakdown_items(breakdown):
+        return tuple((cat, data['skor'], data['max']) for cat, data in breakdown.items())
+
+    return _dashboard_figure(
+        results['skor_medis'],
+        results['skor_hukum'],
+        breakdown_items(results['breakdown_medis']),
+        breakdown_items(results['breakdown_hukum']),
+        tuple(results['probabilities'].items()),
+    )
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _dashboard_figure(skor_medis, skor_hukum, medis_items, hukum_items, prob_items):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=4, cols=2,
+        specs=[[{'type': 'domain'}, {'type': 'domain'}],
+               [{'colspan': 2}, None],
+               [{'colspan': 2}, None],
+               [{'colspan': 2}, None]],
+        row_heights=[0.2, 0.27, 0.27, 0.26],
+        vertical_spacing=0.06,
+        subplot_titles=("", "", "Breakdown Skor Asesmen Medis", "Breakdown Skor Asesmen Hukum",
+                        _PROBABILITY_LAYOUT['title']),
+    )
+
+    for col, (score, title) in enumerate([(skor_medis, "Skor Asesmen Medis"),
+                                          (skor_hukum, "Skor Asesmen Hukum")], start=1):
+        fig.add_trace(go.Indicator(value=score, title={'text': title, 'font': {'size': 20}},
+                                   **_gauge_template(100)), row=1, col=col)
+
+    # Legend Skor Aktual / Sisa Skor cukup sekali untuk kedua breakdown
+    for row, items in [(2, medis_items), (3, hukum_items)]:
+        categories = [cat for cat, _, _ in items]
+        scores = [skor for _, skor, _ in items]
+        fig.add_trace(go.Bar(y=categories, x=scores, text=scores, legendgroup='actual',
+                             showlegend=row == 2, **_BREAKDOWN_ACTUAL), row=row, col=1)
+        fig.add_trace(go.Bar(y=categories, x=[max_score - skor for _, skor, max_score in items],
+                             legendgroup='rest', **_BREAKDOWN_REST), row=row, col=1)
+        fig.update_xaxes(title_text=_BREAKDOWN_LAYOUT['xaxis_title'], row=row, col=1)
+        fig.update_yaxes(title_text=_BREAKDOWN_LAYOUT['yaxis_title'], row=row, col=1)
+
+    categories = [cat for cat, _ in prob_items]
+    values = [v for _, v in prob_items]
+    fig.add_trace(go.Bar(
+        x=categories,
+        y=values,
+        marker_color=['#28a745' if v == max(values) else '#17a2b8' for v in values],
+        text=[f"{v:.1f}%" for v in values],
+        textposition='auto',
+        showlegend=False,
+    ), row=4, col=1)
+    fig.update_xaxes(title_text=_PROBABILITY_LAYOUT['xaxis_title'], row=4, col=1)
+    fig.update_yaxes(title_text=_PROBABILITY_LAYOUT['yaxis_title'], range=[0, 100], row=4, col=1)
+
+    fig.update_layout(**_DASHBOARD_LAYOUT)
+    # Diganti utuh (bukan update) agar template default tidak ikut di-merge
+    fig.layout.template = _minimal_template()
+    return fig
+
+
+def create_cohort_distribution_chart(summary, title):
+    """
+    Stacked bar distribusi rekomendasi per kelompok kohort (di-cache,
+    jangan dimodifikasi).
+
+    Args:
+        summary: hasil CaseStore.cohort (list dict value, rekomendasi)
+        title: judul grafik
+    """
+    items = tuple((group['value'], tuple(group['rekomendasi'].items())) for group in summary)
+    return _cohort_distribution_figure(items, title)
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _cohort_distribution_figure(items, title):
+    import plotly.graph_objects as go
+
+    from tat_predictor.scoring import REKOMENDASI
+
+    groups = [value for value, _ in items]
+    counts = [dict(rekomendasi) for _, rekomendasi in items]
+    fig = go.Figure([
+        go.Bar(name=rec, x=groups, y=[c.get(rec, 0) for c in counts])
+        for rec in REKOMENDASI
+    ])
+    fig.update_layout(title=title, **_COHORT_DISTRIBUTION_LAYOUT)
+    return fig
+
+
+def create_score_histogram_chart(histogram, bin_width):
+    """Histogram composite score dari bin server-side (di-cache, jangan dimodifikasi)"""
+    return _score_histogram_figure(tuple(histogram), bin_width)
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _score_histogram_figure(histogram, bin_width):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(
+        x=[start + bin_width / 2 for start, _ in histogram],
+        y=[n for _, n in histogram],
+        width=bin_width,
+        marker_color='#1f77b4',
+    ))
+    fig.update_layout(**_SCORE_HISTOGRAM_LAYOUT)
+    fig.update_xaxes(range=[0, 100], dtick=bin_width)
+    return fig
@@ -0,0 +1,360 @@
+"""
+Antarmuka baris perintah (headless) Sistem Prediksi TAT BNN.
+
+Contoh:
+    python -m tat_predictor score cases.csv -o results.csv
+    python -m tat_predictor reports export.jsonl -o laporan.zip
+    python -m tat_predictor replay arsip.jsonl --new-rules rules_v2.json -o berubah.csv
+    python -m tat_predictor import-store export.jsonl --db tat_cases.db
+    python -m tat_predictor archive --db tat_cases.db -o arsip/
+    python -m tat_predictor replay arsip/ --new-rules rules_v2.json
+    python -m tat_predictor serve --port 8080
+    python -m tat_predictor uncertainty kasus.json --samples 100000 --seed 0
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Nilai teks yang dianggap True untuk kolom boolean di CSV
+_TRUE_VALUES = {"true", "1", "ya", "y", "yes"}
+
+
+def _parse_bool(column):
+    if column.dtype == bool:
+        return column
+    return column.astype(str).str.strip().str.lower().isin(_TRUE_VALUES)
+
+
+def _report_progress(rows, started, final=False):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    end = "\n" if final else ""
+    print(f"\r{rows:,} baris | {elapsed:.1f} dtk | {rows / elapsed:,.0f} baris/dtk",
+          end=end, file=sys.stderr, flush=True)
+
+
+def _read_cases_csv(source, chunk_size):
+    """Potongan DataFrame kasus dari CSV, dengan kolom input tervalidasi"""
+    import pandas as pd
+    from tat_predictor.batch import INPUT_COLUMNS
+
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        missing = [c for c in INPUT_COLUMNS if c not in chunk.columns
+                   and not (c == "zat_positif" and "num_zat" in chunk.columns)]
+        if missing:
+            raise SystemExit(f"Kolom input tidak ditemukan: {', '.join(missing)}")
+
+        chunk["ada_komorbid"] = _parse_bool(chunk["ada_komorbid"])
+        yield chunk
+
+
+def cmd_score(args):
+    """Skoring CSV per potongan (chunk) dan tulis hasil secara bertahap"""
+    import pandas as pd
+    from tat_predictor.batch import OUTPUT_COLUMNS, score_batch
+
+    if args.rules:
+        from tat_predictor.rule_engine import reload_ruleset
+        reload_ruleset(args.rules)
+
+    source = sys.stdin if args.input == "-" else args.input
+
+    scorer = None
+    if args.workers != 1:
+        # Skoring tiap potongan dibagi ke process pool lewat shared memory
+        from tat_predictor.parallel import ShardedScorer
+        scorer = ShardedScorer(args.workers)
+    score = scorer.score_batch if scorer is not None else score_batch
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    started = time.perf_counter()
+    rows = 0
+    try:
+        for i, chunk in enumerate(_read_cases_csv(source, args.chunk_size)):
+            result = score(chunk)
+            if args.keep:
+                result = pd.concat([chunk[args.keep], result], axis=1)
+
+            result.to_csv(out, header=(i == 0), index=False,
+                          columns=list(args.keep) + OUTPUT_COLUMNS)
+            rows += len(chunk)
+            if not args.quiet:
+                _report_progress(rows, started)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if scorer is not None:
+            scorer.close()
+
+    if not args.quiet:
+        _report_progress(rows, started, final=True)
+    return 0
+
+
+def _read_jsonl(source):
+    for line in source:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def cmd_reports(args):
+    """Render PDF massal dari file JSONL berisi export_data"""
+    from tat_predictor.bulk import render_pdf_merged, render_pdf_zip
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        if args.merged:
+            count = render_pdf_merged(_read_jsonl(source), args.output,
+                                      workers=args.workers, chunksize=args.chunk_size, fast=args.fast)
+        else:
+            count = render_pdf_zip(_read_jsonl(source), args.output,
+                                   workers=args.workers, chunksize=args.chunk_size, fast=args.fast)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if not args.quiet:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(f"{count:,} laporan | {elapsed:.1f} dtk | {count / elapsed:,.1f} laporan/dtk",
+              file=sys.stderr)
+    return 0
+
+
+def cmd_replay(args):
+    """Bandingkan rekomendasi arsip kasus pada dua versi aturan/konstanta"""
+    from tat_predictor.replay import format_summary, load_version, read_archive, replay_chunks
+
+    old = load_version(args.old_rules, args.old_gramatur)
+    new = load_version(args.new_rules, args.new_gramatur)
+
+    started = time.perf_counter()
+    if os.path.isdir(args.input):
+        from tat_predictor.archive import read_cases
+        result = replay_chunks(read_cases(args.input, args.chunk_size), old, new)
+    elif args.input.lower().endswith(".csv"):
+        result = replay_chunks(_read_cases_csv(args.input, args.chunk_size), old, new)
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        try:
+            result = replay_chunks(read_archive(source, args.chunk_size), old, new)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+    if args.output:
+        result["flipped"].to_csv(args.output, index=False)
+    print(format_summary(result))
+    if not args.quiet:
+        _report_progress(result["n_cases"], started, final=True)
+    return 0
+
+
+def cmd_import_store(args):
+    """Impor JSONL export_data ke database kasus (insert per batch)"""
+    from tat_predictor.store import CaseStore
+
+    store = CaseStore(args.db)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        count = store.add_many(_read_jsonl(source), batch_size=args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        store.close()
+
+    if not args.quiet:
+        _report_progress(count, started, final=True)
+    return 0
+
+
+def cmd_archive(args):
+    """Tambahkan hasil analisis ke arsip kolumnar (Arrow IPC per bulan)"""
+    from tat_predictor.archive import ArchiveWriter, append_store
+
+    started = time.perf_counter()
+    if args.input is None:
+        from tat_predictor.store import CaseStore
+
+        store = CaseStore(args.db)
+        try:
+            count = append_store(store, args.output, batch_size=args.batch_size)
+        finally:
+            store.close()
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        try:
+            with ArchiveWriter(args.output, batch_size=args.batch_size) as writer:
+                count = writer.append_many(_read_jsonl(source))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+    if not args.quiet:
+        _report_progress(count, started, final=True)
+    return 0
+
+
+def cmd_serve(args):
+    """Layanan HTTP skoring (single + batch NDJSON) sampai dihentikan"""
+    from tat_predictor import metrics
+    from tat_predictor.service import run
+
+    if args.rules:
+        from tat_predictor.rule_engine import reload_ruleset
+        reload_ruleset(args.rules)
+
+    metrics.start_http_server()
+    print(f"Layanan skoring di http://{args.host}:{args.port} (Ctrl+C untuk berhenti)", file=sys.stderr)
+    run(args.host, args.port)
+    return 0
+
+
+def cmd_uncertainty(args):
+    """Frekuensi rekomendasi satu kasus di bawah gangguan input (Monte Carlo)"""
+    from tat_predictor.decision_table import get_decision_table
+    from tat_predictor.service import validate_case
+    from tat_predictor.uncertainty import format_summary, simulate
+
+    if args.rules:
+        from tat_predictor.rule_engine import reload_ruleset
+        reload_ruleset(args.rules)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        record = json.load(source)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    # Terima export_data (berisi input_data) maupun input_data langsung
+    case = record.get("input_data", record) if isinstance(record, dict) else record
+    try:
+        validate_case(case)
+    except ValueError as exc:
+        raise SystemExit(f"Input tidak valid: {exc}")
+
+    get_decision_table()  # bangun tabel keputusan di luar pengukuran waktu
+    started = time.perf_counter()
+    result = simulate(case, samples=args.samples, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_summary(result))
+    if not args.quiet:
+        print(f"{args.samples:,} sampel dalam {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m tat_predictor",
+        description="Sistem Prediksi TAT BNN - mode headless"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    score = sub.add_parser("score", help="Skoring batch file CSV kasus")
+    score.add_argument("input", help="File CSV input ('-' untuk stdin)")
+    score.add_argument("-o", "--output", default="-",
+                       help="File CSV hasil (default: stdout)")
+    score.add_argument("--chunk-size", type=int, default=100_000,
+                       help="Jumlah baris per potongan (default: 100000)")
+    score.add_argument("-j", "--workers", type=int, default=1,
+                       help="Jumlah proses skoring (0 = jumlah core; default: 1)")
+    score.add_argument("--keep", action="append", default=[], metavar="KOLOM",
+                       help="Salin kolom input ke hasil, mis. --keep case_id")
+    score.add_argument("--rules", metavar="JSON",
+                       help="File decision rules (default: rules_v1.json bawaan)")
+    score.add_argument("-q", "--quiet", action="store_true",
+                       help="Jangan tampilkan progres di stderr")
+    score.set_defaults(func=cmd_score)
+
+    reports = sub.add_parser("reports", help="Render PDF massal dari JSONL export_data")
+    reports.add_argument("input", help="File JSONL, satu export_data per baris ('-' untuk stdin)")
+    reports.add_argument("-o", "--output", required=True,
+                         help="File ZIP tujuan (atau PDF bila --merged)")
+    reports.add_argument("--merged", action="store_true",
+                         help="Gabungkan semua kasus ke satu PDF multi-halaman")
+    reports.add_argument("--fast", action="store_true",
+                         help="Render lewat jalur cepat (layout tetap, tanpa platypus)")
+    reports.add_argument("-j", "--workers", type=int, default=None,
+                         help="Jumlah proses render (default: jumlah core)")
+    reports.add_argument("--chunk-size", type=int, default=4,
+                         help="Laporan per tugas worker (default: 4)")
+    reports.add_argument("-q", "--quiet", action="store_true",
+                         help="Jangan tampilkan ringkasan di stderr")
+    reports.set_defaults(func=cmd_reports)
+
+    replay = sub.add_parser("replay", help="Replay arsip kasus pada dua versi decision rules")
+    replay.add_argument("input", help="Arsip JSONL (export_data / input_data), CSV, atau direktori arsip "
+                                      "kolumnar ('-' untuk stdin JSONL)")
+    replay.add_argument("--old-rules", metavar="JSON",
+                        help="File aturan versi lama (default: versi aktif)")
+    replay.add_argument("--new-rules", metavar="JSON",
+                        help="File aturan versi baru (default: versi aktif)")
+    replay.add_argument("--old-gramatur", metavar="JSON",
+                        help="File JSON override GRAMATUR_LIMITS versi lama, mis. berisi {\"Metamfetamin/Sabu\": 0.5}")
+    replay.add_argument("--new-gramatur", metavar="JSON",
+                        help="File JSON override GRAMATUR_LIMITS versi baru")
+    replay.add_argument("-o", "--output",
+                        help="File CSV daftar kasus yang berubah rekomendasi")
+    replay.add_argument("--chunk-size", type=int, default=100_000,
+                        help="Jumlah kasus per potongan (default: 100000)")
+    replay.add_argument("-q", "--quiet", action="store_true",
+                        help="Jangan tampilkan waktu proses di stderr")
+    replay.set_defaults(func=cmd_replay)
+
+    import_store = sub.add_parser("import-store", help="Impor JSONL export_data ke database riwayat kasus")
+    import_store.add_argument("input", help="File JSONL, satu export_data per baris ('-' untuk stdin)")
+    import_store.add_argument("--db", default=None,
+                              help="File database SQLite (default: $TAT_DB_PATH atau tat_cases.db)")
+    import_store.add_argument("--batch-size", type=int, default=10_000,
+                              help="Jumlah kasus per transaksi (default: 10000)")
+    import_store.add_argument("-q", "--quiet", action="store_true",
+                              help="Jangan tampilkan ringkasan di stderr")
+    import_store.set_defaults(func=cmd_import_store)
+
+    archive = sub.add_parser("archive", help="Tambahkan hasil ke arsip kolumnar Arrow (butuh pyarrow)")
+    archive.add_argument("input", nargs="?", default=None,
+                         help="File JSONL export_data ('-' untuk stdin); tanpa input: kasus baru dari database")
+    archive.add_argument("-o", "--output", required=True, help="Direktori arsip")
+    archive.add_argument("--db", default=None,
+                         help="File database SQLite (default: $TAT_DB_PATH atau tat_cases.db)")
+    archive.add_argument("--batch-size", type=int, default=100_000,
+                         help="Jumlah kasus per file part (default: 100000)")
+    archive.add_argument("-q", "--quiet", action="store_true",
+                         help="Jangan tampilkan ringkasan di stderr")
+    archive.set_defaults(func=cmd_archive)
+
+    serve = sub.add_parser("serve", help="Layanan HTTP skoring: /v1/score dan /v1/score/batch (NDJSON)")
+    serve.add_argument("--host", default="127.0.0.1", help="Alamat bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    serve.add_argument("--rules", metavar="JSON",
+                       help="File decision rules (default: rules_v1.json bawaan)")
+    serve.set_defaults(func=cmd_serve)
+
+    uncertainty = sub.add_parser("uncertainty",
+                                 help="Estimasi ketidakpastian rekomendasi satu kasus (Monte Carlo)")
+    uncertainty.add_argument("input", help="File JSON export_data atau input_data ('-' untuk stdin)")
+    uncertainty.add_argument("--samples", type=int, default=100_000,
+                             help="Jumlah sampel (default: 100000)")
+    uncertainty.add_argument("--seed", type=int, default=0,
+                             help="Seed generator acak; seed sama = hasil sama (default: 0)")
+    uncertainty.add_argument("--rules", metavar="JSON",
+                             help="File decision rules (default: rules_v1.json bawaan)")
+    uncertainty.add_argument("--json", action="store_true",
+                             help="Cetak hasil sebagai JSON")
+    uncertainty.add_argument("-q", "--quiet", action="store_true",
+                             help="Jangan tampilkan waktu proses di stderr")
+    uncertainty.set_defaults(func=cmd_uncertainty)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
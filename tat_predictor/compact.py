@@ -0,0 +1,428 @@
+"""
+Representasi kasus ringkas berkode integer.
+
+input_data aplikasi berupa dict berisi label teks panjang (mis.
+"Pengguna murni (untuk diri sendiri)") dan breakdown berupa dict of dict
+dengan teks `detail` yang dibangun saat skoring. Untuk arsip besar,
+modul ini menyimpan kasus sebagai kode:
+
+- enum IntEnum per field pilihan (Peran, StatusTangkap, RiwayatPidana,
+  FungsiSosial, JenisNarkotika, Komorbid) dan bitmask IntFlag Zat untuk
+  zat_positif; kode = indeks label pada konstanta scoring
+- CompactCase: dataclass frozen dengan __slots__ (hashable, tanpa
+  __dict__); CompactResult: dataclass __slots__ berisi skor angka dan
+  nomor outcome tabel keputusan
+- CASE_DTYPE: dtype NumPy terstruktur 24 byte per kasus, dapat diskor
+  langsung oleh batch.score_encoded
+
+Label, probabilitas, reasoning dan teks detail breakdown baru dibentuk
+saat diminta (tampilan/ekspor), dengan hasil identik fungsi skor skalar.
+"""
+
+import enum
+import functools
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from tat_predictor import scoring
+from tat_predictor.scoring import (
+    ARREST_MAPPING,
+    FUNGSI_SOSIAL_OPTIONS,
+    GRAMATUR_LIMITS,
+    HISTORY_MAPPING,
+    JENIS_NARKOTIKA,
+    REKOMENDASI,
+    ROLE_MAPPING,
+    TINGKAT_KOMORBID_OPTIONS,
+    calculate_legal_score,
+    calculate_medical_score,
+)
+
+# =============================================================================
+# KODE ENUM
+# =============================================================================
+
+# Kelas enum -> label per kode (urutan konstanta scoring)
+_LABELS = {}
+_CODES = {}
+
+
+class _Labeled(enum.IntEnum):
+    """IntEnum dengan label teks aplikasi (dibentuk saat diminta)"""
+
+    @property
+    def label(self):
+        return _LABELS[type(self)][self]
+
+    @classmethod
+    def from_label(cls, label):
+        """Kode untuk label teks; KeyError bila label tidak dikenal"""
+        return cls(_CODES[cls][label])
+
+
+class FungsiSosial(_Labeled):
+    PRODUKTIF = 0
+    MULAI_TERGANGGU = 1
+    TIDAK_BERFUNGSI = 2
+
+
+class Komorbid(_Labeled):
+    """ada_komorbid dan tingkat_komorbid digabung (label None = tidak ada)"""
+    TIDAK_ADA = 0
+    RINGAN = 1
+    BERAT = 2
+
+
+class Peran(_Labeled):
+    PENGGUNA_MURNI = 0
+    BERBAGI = 1
+    KURIR = 2
+    BANDAR = 3
+
+
+class JenisNarkotika(_Labeled):
+    GANJA = 0
+    METAMFETAMIN = 1
+    HEROIN = 2
+    KOKAIN = 3
+    EKSTASI = 4
+    MORFIN = 5
+    KODEIN = 6
+    LAINNYA = 7
+
+
+class StatusTangkap(_Labeled):
+    SUKARELA = 0
+    OPERASI_TARGETED = 1
+    TERTANGKAP_TANGAN = 2
+
+
+class RiwayatPidana(_Labeled):
+    FIRST_OFFENDER = 0
+    RELAPSE = 1
+    RESIDIVIS = 2
+
+
+class Rekomendasi(_Labeled):
+    RAWAT_JALAN = 0
+    RAWAT_INAP = 1
+    PROSES_HUKUM = 2
+    HUKUM_REHAB = 3
+
+
+class Zat(enum.IntFlag):
+    """Bitmask zat positif; bit ke-i = JENIS_NARKOTIKA[i]"""
+    MET = 1
+    MOP = 2
+    COC = 4
+    AMP = 8
+    BZO = 16
+    THC = 32
+    MDMA = 64
+    LAINNYA = 128
+
+    @property
+    def labels(self):
+        return [label for i, label in enumerate(JENIS_NARKOTIKA) if self & (1 << i)]
+
+    @classmethod
+    def from_labels(cls, labels):
+        """Bitmask dari list label zat; KeyError bila label tidak dikenal"""
+        mask = 0
+        for label in labels:
+            mask |= 1 << _ZAT_BITS[label]
+        return cls(mask)
+
+
+def _register(cls, labels):
+    labels = list(labels)
+    if len(labels) != len(cls):
+        raise RuntimeError(f"{cls.__name__}: jumlah kode tidak sama dengan jumlah label")
+    _LABELS[cls] = labels
+    _CODES[cls] = {label: code for code, label in enumerate(labels)}
+
+
+_register(FungsiSosial, FUNGSI_SOSIAL_OPTIONS)
+_register(Komorbid, [None] + TINGKAT_KOMORBID_OPTIONS)
+_register(Peran, ROLE_MAPPING)
+_register(JenisNarkotika, GRAMATUR_LIMITS)
+_register(StatusTangkap, ARREST_MAPPING)
+_register(RiwayatPidana, HISTORY_MAPPING)
+_register(Rekomendasi, REKOMENDASI)
+
+if len(JENIS_NARKOTIKA) != len(Zat):
+    raise RuntimeError("Zat: jumlah bit tidak sama dengan JENIS_NARKOTIKA")
+_ZAT_BITS = {label: i for i, label in enumerate(JENIS_NARKOTIKA)}
+
+# Field pilihan CompactCase -> kelas enum
+CHOICE_FIELDS = {
+    "fungsi_sosial": FungsiSosial,
+    "peran": Peran,
+    "jenis_narkotika": JenisNarkotika,
+    "status_tangkap": StatusTangkap,
+    "riwayat_pidana": RiwayatPidana,
+}
+
+# =============================================================================
+# SKOR KOMPONEN DARI KODE
+# =============================================================================
+
+_SOCIAL = (0, 8, 15)
+_COMORBID = (0, 8, 15)
+
+
+def _mapping_values():
+    """
+    Nilai ROLE/ARREST/HISTORY_MAPPING dan GRAMATUR_LIMITS per kode, dibaca
+    dari scoring saat dipanggil (konstanta dapat diubah saat runtime)
+    """
+    return (tuple(scoring.ROLE_MAPPING[label] for label in _LABELS[Peran]),
+            tuple(scoring.ARREST_MAPPING[label] for label in _LABELS[StatusTangkap]),
+            tuple(scoring.HISTORY_MAPPING[label] for label in _LABELS[RiwayatPidana]),
+            tuple(scoring.GRAMATUR_LIMITS.get(label, 1.0) for label in _LABELS[JenisNarkotika]))
+
+
+def _components(case, values):
+    """
+    Sembilan skor komponen (urutan batch.COMPONENT_KEYS), tanpa teks.
+    `values` hasil _mapping_values().
+    """
+    network, arrest, history, limits = values
+    num_zat = case.zat.bit_count()
+    urine = 0 if num_zat == 0 else 10 if num_zat == 1 else 15 if num_zat <= 3 else 25
+    dsm5 = case.dsm5_count
+    addiction = 0 if dsm5 <= 1 else 10 if dsm5 <= 3 else 20 if dsm5 <= 5 else 30
+    durasi = case.durasi_bulan
+    duration = 5 if durasi < 6 else 10 if durasi <= 12 else 15
+
+    limit = limits[case.jenis_narkotika]
+    bb = case.barang_bukti
+    evidence = 0 if bb < limit else 10 if bb <= limit * 5 else 18 if bb <= limit * 20 else 25
+
+    return (urine, addiction, duration, _SOCIAL[case.fungsi_sosial], _COMORBID[case.komorbid],
+            network[case.peran], evidence, arrest[case.status_tangkap], history[case.riwayat_pidana])
+
+# =============================================================================
+# KASUS DAN HASIL
+# =============================================================================
+
+def _months(value):
+    """Durasi bulan: int bila bulat (teks detail "12 bulan"), float bila pecahan"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+@dataclass(frozen=True, slots=True)
+class CompactCase:
+    """Input skoring satu kasus dalam bentuk kode (tanpa field identitas)"""
+    zat: Zat
+    dsm5_count: int
+    durasi_bulan: float  # int bila input bulat; pecahan dipertahankan seperti fungsi skor
+    fungsi_sosial: FungsiSosial
+    komorbid: Komorbid
+    peran: Peran
+    barang_bukti: float
+    jenis_narkotika: JenisNarkotika
+    status_tangkap: StatusTangkap
+    riwayat_pidana: RiwayatPidana
+
+    @classmethod
+    def from_input_data(cls, input_data):
+        """
+        Dari dict input_data aplikasi. KeyError berisi nama field bila ada
+        label yang tidak dikenal (termasuk jenis_narkotika di luar
+        GRAMATUR_LIMITS); ValueError bila dsm5_count bukan bilangan bulat.
+        """
+        try:
+            zat = Zat.from_labels(input_data["zat_positif"])
+        except KeyError as exc:
+            raise KeyError(f"zat_positif: {exc.args[0]!r}") from None
+        komorbid = Komorbid.TIDAK_ADA
+        if input_data["ada_komorbid"]:
+            # Selain "Ringan" dianggap berat, sama dengan calculate_medical_score
+            komorbid = (Komorbid.RINGAN if input_data.get("tingkat_komorbid") == "Ringan"
+                        else Komorbid.BERAT)
+
+        codes = {}
+        for name, enum_cls in CHOICE_FIELDS.items():
+            try:
+                codes[name] = enum_cls.from_label(input_data[name])
+            except KeyError:
+                raise KeyError(f"{name}: {input_data.get(name)!r}") from None
+        dsm5_count = input_data["dsm5_count"]
+        if dsm5_count != int(dsm5_count):
+            raise ValueError(f"dsm5_count: harus bilangan bulat, bukan {dsm5_count!r}")
+        return cls(zat=zat, dsm5_count=int(dsm5_count),
+                   durasi_bulan=_months(input_data["durasi_bulan"]), komorbid=komorbid,
+                   barang_bukti=float(input_data["barang_bukti"]), **codes)
+
+    def to_input_data(self):
+        """dict input_data berlabel teks (zat_positif urut JENIS_NARKOTIKA)"""
+        return {
+            "zat_positif": self.zat.labels,
+            "dsm5_count": self.dsm5_count,
+            "durasi_bulan": self.durasi_bulan,
+            "fungsi_sosial": self.fungsi_sosial.label,
+            "ada_komorbid": self.komorbid != Komorbid.TIDAK_ADA,
+            "tingkat_komorbid": self.komorbid.label,
+            "peran": self.peran.label,
+            "barang_bukti": self.barang_bukti,
+            "jenis_narkotika": self.jenis_narkotika.label,
+            "status_tangkap": self.status_tangkap.label,
+            "riwayat_pidana": self.riwayat_pidana.label,
+        }
+
+    def score(self):
+        """
+        Skor dan keputusan lewat tabel keputusan aktif, tanpa membangun
+        breakdown/teks (hasil identik fungsi skor skalar).
+        """
+        from tat_predictor.decision_table import get_decision_table
+
+        table = get_decision_table()
+        offsets, values = _table_codes(table)
+        components = _components(self, values)
+        u, a, d, s, c, n, e, t, h = offsets
+        try:
+            index = (u[components[0]] + a[components[1]] + d[components[2]] + s[components[3]]
+                     + c[components[4]] + n[components[5]] + e[components[6]] + t[components[7]]
+                     + h[components[8]])
+        except KeyError:
+            raise ValueError("Kombinasi skor di luar tabel keputusan") from None
+        return CompactResult(
+            case=self,
+            components=components,
+            skor_medis=table.skor_medis[index],
+            skor_hukum=table.skor_hukum[index],
+            final_score=table.final_scores[index],
+            outcome=table.states[index],
+            table=table,
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def _table_codes(table):
+    """
+    Dict kontribusi indeks state per komponen dan _mapping_values(), untuk
+    satu tabel keputusan. get_decision_table() membangun tabel baru bila
+    konstanta scoring berubah, sehingga cache ini ikut dibuat ulang.
+    """
+    return tuple(offset for _, offset in table.offsets), _mapping_values()
+
+
+@dataclass(slots=True)
+class CompactResult:
+    """
+    Hasil skoring ringkas: skor angka dan nomor outcome tabel keputusan.
+    Probabilitas, reasoning, label dan breakdown dibentuk saat diminta.
+    """
+    case: CompactCase
+    components: tuple  # sembilan skor komponen, urutan batch.COMPONENT_KEYS
+    skor_medis: int
+    skor_hukum: int
+    final_score: float
+    outcome: int
+    table: object = field(repr=False, compare=False)
+
+    @property
+    def primary(self):
+        return Rekomendasi(self.table.outcome_primary[self.outcome])
+
+    @property
+    def primary_rec(self):
+        return self.primary.label
+
+    @property
+    def probabilities(self):
+        return dict(self.table.outcomes[self.outcome][0])
+
+    @property
+    def reasoning(self):
+        return list(self.table.outcomes[self.outcome][1])
+
+    @property
+    def reason_codes(self):
+        """Kode alasan (id aturan lalu id catatan aktif); lihat RuleSet.render_reasoning"""
+        return self.table.outcomes[self.outcome][4]
+
+    def breakdowns(self):
+        """(breakdown_medis, breakdown_hukum) lengkap dengan teks detail"""
+        data = self.case.to_input_data()
+        _, breakdown_medis = calculate_medical_score(
+            data["zat_positif"], data["dsm5_count"], data["durasi_bulan"],
+            data["fungsi_sosial"], data["ada_komorbid"], data["tingkat_komorbid"],
+        )
+        _, breakdown_hukum = calculate_legal_score(
+            data["peran"], data["barang_bukti"], data["jenis_narkotika"],
+            data["status_tangkap"], data["riwayat_pidana"],
+        )
+        return breakdown_medis, breakdown_hukum
+
+    def to_dict(self):
+        """dict hasil seperti ScorePreview.update() (untuk tampilan/ekspor)"""
+        breakdown_medis, breakdown_hukum = self.breakdowns()
+        return {
+            'skor_medis': self.skor_medis,
+            'skor_hukum': self.skor_hukum,
+            'breakdown_medis': breakdown_medis,
+            'breakdown_hukum': breakdown_hukum,
+            'probabilities': self.probabilities,
+            'reasoning': self.reasoning,
+            'primary_rec': self.primary_rec,
+            'final_score': self.final_score,
+        }
+
+# =============================================================================
+# ARRAY TERSTRUKTUR
+# =============================================================================
+
+# Satu kasus = 24 byte (tanpa padding)
+CASE_DTYPE = np.dtype([
+    ("zat", np.uint8),
+    ("dsm5_count", np.uint8),
+    ("durasi_bulan", np.float64),  # float64 seperti kolom batch; pecahan bulan tidak dibulatkan
+    ("fungsi_sosial", np.int8),
+    ("komorbid", np.int8),
+    ("peran", np.int8),
+    ("barang_bukti", np.float64),  # float64: ambang gramatur dibandingkan persis
+    ("jenis_narkotika", np.int8),
+    ("status_tangkap", np.int8),
+    ("riwayat_pidana", np.int8),
+])
+
+# Jumlah bit aktif per nilai bitmask Zat
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def to_array(cases):
+    """Array CASE_DTYPE dari iterable CompactCase atau dict input_data"""
+    rows = [case if isinstance(case, CompactCase) else CompactCase.from_input_data(case)
+            for case in cases]
+    return np.array([(c.zat, c.dsm5_count, c.durasi_bulan, c.fungsi_sosial, c.komorbid, c.peran,
+                      c.barang_bukti, c.jenis_narkotika, c.status_tangkap, c.riwayat_pidana)
+                     for c in rows], dtype=CASE_DTYPE)
+
+
+def from_array(array):
+    """CompactCase per baris array CASE_DTYPE"""
+    for row in array.tolist():
+        zat, dsm5, durasi, fungsi, komorbid, peran, bb, jenis, tangkap, riwayat = row
+        yield CompactCase(Zat(zat), dsm5, _months(durasi), FungsiSosial(fungsi), Komorbid(komorbid), Peran(peran),
+                          bb, JenisNarkotika(jenis), StatusTangkap(tangkap), RiwayatPidana(riwayat))
+
+
+def encoded_columns(array):
+    """
+    Kolom format batch.encode_cases dari array CASE_DTYPE (view, kecuali
+    num_zat), siap untuk batch.score_encoded.
+    """
+    columns = {name: array[name] for name in CASE_DTYPE.names if name != "zat"}
+    columns["num_zat"] = _POPCOUNT[array["zat"]]
+    return columns
+
+
+def score_array(array, gramatur_limits=None):
+    """batch.score_encoded untuk array CASE_DTYPE"""
+    from tat_predictor.batch import score_encoded
+    return score_encoded(encoded_columns(array), gramatur_limits)
@@ -0,0 +1,229 @@
+"""
+Tabel keputusan (decision table) hasil enumerasi seluruh ruang input.
+
+Setiap komponen skor hanya punya sedikit nilai (mis. Tes Urine 0/10/15/25,
+Barang Bukti 0/10/18/25), sehingga kombinasi sembilan komponen medis dan
+hukum membentuk ruang state yang kecil (puluhan ribu). Ruang itu
+dienumerasi sekali, hasil apply_decision_rules untuk tiap state disimpan
+dalam array, dan prediksi berikutnya cukup berupa satu indeks array.
+
+Tabel dibangun ulang otomatis bila konstanta skor, gramatur, fungsi skor
+atau versi decision rules yang aktif berubah (lihat _fingerprint).
+"""
+
+import threading
+from array import array
+from itertools import product
+
+from tat_predictor import rule_engine, scoring
+
+# Kategori breakdown yang menjadi dimensi tabel (urutan = radix indeks)
+MEDIS_COMPONENTS = ["Tes Urine", "Tingkat Kecanduan", "Durasi Penggunaan", "Fungsi Sosial", "Komorbid"]
+HUKUM_COMPONENTS = ["Keterlibatan Jaringan", "Barang Bukti", "Status Penangkapan", "Riwayat Pidana"]
+
+# Domain probe input kontinu (mengikuti batas widget di aplikasi)
+_DURASI_PROBE = range(0, 241)
+_RASIO_BB_PROBE = [k / 4 for k in range(0, 401)]  # 0-100x gramatur
+
+_NO_STATE = 0xFFFF
+
+
+def _probe_levels():
+    """
+    Nilai skor yang mungkin untuk tiap kategori breakdown, diperoleh dengan
+    memanggil fungsi skor pada domain input aplikasi. Tiap komponen hanya
+    bergantung pada input-nya sendiri, jadi cukup memvariasikan satu input.
+    """
+    levels = {k: set() for k in MEDIS_COMPONENTS + HUKUM_COMPONENTS}
+
+    medis_base = dict(zat_positif=[], dsm5_count=0, durasi_bulan=0,
+                      fungsi_sosial=scoring.FUNGSI_SOSIAL_OPTIONS[0],
+                      ada_komorbid=False, tingkat_komorbid=None)
+    medis_probes = (
+        [{"zat_positif": scoring.JENIS_NARKOTIKA[:n]} for n in range(len(scoring.JENIS_NARKOTIKA) + 1)]
+        + [{"dsm5_count": n} for n in range(len(scoring.DSM5_CRITERIA) + 1)]
+        + [{"durasi_bulan": d} for d in _DURASI_PROBE]
+        + [{"fungsi_sosial": f} for f in scoring.FUNGSI_SOSIAL_OPTIONS]
+        + [{"ada_komorbid": True, "tingkat_komorbid": t} for t in scoring.TINGKAT_KOMORBID_OPTIONS]
+    )
+    for probe in medis_probes:
+        _, breakdown = scoring.calculate_medical_score(**{**medis_base, **probe}, render=False)
+        for kategori, data in breakdown.items():
+            levels[kategori].add(data['skor'])
+
+    hukum_base = dict(peran=next(iter(scoring.ROLE_MAPPING)), barang_bukti=0.0,
+                      jenis_narkotika="Lainnya",
+                      status_tangkap=next(iter(scoring.ARREST_MAPPING)),
+                      riwayat_pidana=next(iter(scoring.HISTORY_MAPPING)))
+    limit = scoring.GRAMATUR_LIMITS.get("Lainnya", 1.0)
+    hukum_probes = (
+        [{"peran": p} for p in scoring.ROLE_MAPPING]
+        + [{"barang_bukti": r * limit} for r in _RASIO_BB_PROBE]
+        + [{"status_tangkap": s} for s in scoring.ARREST_MAPPING]
+        + [{"riwayat_pidana": r} for r in scoring.HISTORY_MAPPING]
+    )
+    for probe in hukum_probes:
+        _, breakdown = scoring.calculate_legal_score(**{**hukum_base, **probe}, render=False)
+        for kategori, data in breakdown.items():
+            levels[kategori].add(data['skor'])
+
+    return {k: sorted(v) for k, v in levels.items()}
+
+
+def _fingerprint():
+    """Salinan konstanta dan fungsi yang menentukan isi tabel"""
+    return (
+        dict(scoring.GRAMATUR_LIMITS),
+        dict(scoring.ROLE_MAPPING),
+        dict(scoring.ARREST_MAPPING),
+        dict(scoring.HISTORY_MAPPING),
+        list(scoring.FUNGSI_SOSIAL_OPTIONS),
+        list(scoring.TINGKAT_KOMORBID_OPTIONS),
+        scoring.calculate_medical_score.__code__,
+        scoring.calculate_legal_score.__code__,
+        rule_engine.active_ruleset(),
+    )
+
+
+def _is_current(fingerprint):
+    """
+    Cek murah (tanpa menyalin) apakah konstanta dan fungsi masih sama
+    dengan saat tabel dibangun; cukup cepat untuk dicek di setiap lookup.
+    """
+    return (fingerprint[8] is rule_engine.active_ruleset()
+            and fingerprint[7] is scoring.calculate_legal_score.__code__
+            and fingerprint[6] is scoring.calculate_medical_score.__code__
+            and fingerprint[0] == scoring.GRAMATUR_LIMITS
+            and fingerprint[1] == scoring.ROLE_MAPPING
+            and fingerprint[2] == scoring.ARREST_MAPPING
+            and fingerprint[3] == scoring.HISTORY_MAPPING
+            and fingerprint[4] == scoring.FUNGSI_SOSIAL_OPTIONS
+            and fingerprint[5] == scoring.TINGKAT_KOMORBID_OPTIONS)
+
+
+class DecisionTable:
+    """
+    Tabel keputusan array-backed.
+
+    Indeks state = mixed radix dari indeks level kesembilan komponen skor.
+    Untuk state ke-i, `states[i]` berisi nomor outcome (probabilities,
+    reasoning, rekomendasi, indeks aturan, kode alasan), `final_scores[i]`
+    skor komposit, dan
+    `skor_medis[i]`/`skor_hukum[i]` jumlah skor komponennya.
+    """
+
+    def __init__(self, ruleset=None):
+        self.ruleset = ruleset = ruleset or rule_engine.active_ruleset()
+        self.levels = _probe_levels()
+        components = MEDIS_COMPONENTS + HUKUM_COMPONENTS
+        level_lists = [self.levels[k] for k in components]
+
+        strides = []
+        size = 1
+        for levels in reversed(level_lists):
+            strides.insert(0, size)
+            size *= len(levels)
+
+        # Per kategori: skor -> kontribusi ke indeks state
+        offsets = [
+            (kategori, {skor: stride * i for i, skor in enumerate(levels)})
+            for kategori, levels, stride in zip(components, level_lists, strides)
+        ]
+        self._medis_offsets = offsets[:len(MEDIS_COMPONENTS)]
+        self._hukum_offsets = offsets[len(MEDIS_COMPONENTS):]
+
+        self.states = array('H', [_NO_STATE]) * size
+        self.final_scores = array('d', [0.0]) * size
+        self.skor_medis = array('H', [0]) * size
+        self.skor_hukum = array('H', [0]) * size
+        self.outcomes = []
+
+        outcome_ids = {}
+        decision_cache = {}
+        n_medis = len(MEDIS_COMPONENTS)
+        # Hanya komponen yang dibaca aturan yang membedakan hasil keputusan
+        read = [components.index(rule_engine.VARIABLES[v][1])
+                for v in ruleset.variables if rule_engine.VARIABLES[v]]
+        for index, combo in enumerate(product(*level_lists)):
+            medis, hukum = combo[:n_medis], combo[n_medis:]
+            skor_medis, skor_hukum = sum(medis), sum(hukum)
+            key = (skor_medis, skor_hukum) + tuple(combo[i] for i in read)
+            decided = decision_cache.get(key)
+            if decided is None:
+                breakdown_medis = {k: {'skor': v} for k, v in zip(MEDIS_COMPONENTS, medis)}
+                breakdown_hukum = {k: {'skor': v} for k, v in zip(HUKUM_COMPONENTS, hukum)}
+                probabilities, codes, primary, final_score = ruleset.evaluate_codes(
+                    skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+                )
+                outcome = (tuple(probabilities.items()), primary, codes)
+                if outcome not in outcome_ids:
+                    outcome_ids[outcome] = len(self.outcomes)
+                    # Teks reasoning dirender sekali per outcome
+                    self.outcomes.append((outcome[0], tuple(ruleset.render_reasoning(codes)), primary,
+                                          ruleset.rule_ids.index(codes[0]), codes))
+                decided = decision_cache[key] = (outcome_ids[outcome], final_score)
+            self.states[index], self.final_scores[index] = decided
+            self.skor_medis[index] = skor_medis
+            self.skor_hukum[index] = skor_hukum
+
+        # Kode rekomendasi utama (indeks REKOMENDASI) dan indeks aturan per
+        # outcome, untuk jalur batch
+        self.outcome_primary = array('B', [scoring.REKOMENDASI.index(o[2]) for o in self.outcomes])
+        self.outcome_rule = array('B', [o[3] for o in self.outcomes])
+
+    def __len__(self):
+        return len(self.states)
+
+    @property
+    def offsets(self):
+        """[(kategori, {skor: kontribusi indeks})] untuk kesembilan komponen"""
+        return self._medis_offsets + self._hukum_offsets
+
+    def index(self, breakdown_medis, breakdown_hukum):
+        """Indeks state untuk sepasang breakdown, atau -1 bila di luar tabel"""
+        index = 0
+        try:
+            for kategori, offset in self._medis_offsets:
+                index += offset[breakdown_medis[kategori]['skor']]
+            for kategori, offset in self._hukum_offsets:
+                index += offset[breakdown_hukum[kategori]['skor']]
+        except KeyError:
+            return -1
+        return index
+
+    def lookup(self, skor_medis, skor_hukum, breakdown_medis, breakdown_hukum, render=True):
+        """
+        Pengganti apply_decision_rules dengan hasil yang identik (termasuk
+        render=False: tuple kode alasan). State di luar tabel (mis. skor
+        total tidak sesuai breakdown) dihitung dengan decision rules biasa.
+        """
+        index = self.index(breakdown_medis, breakdown_hukum)
+        if index < 0 or self.skor_medis[index] != skor_medis or self.skor_hukum[index] != skor_hukum:
+            return scoring.apply_decision_rules(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum,
+                                                render)
+
+        probabilities, reasoning, primary, _, codes = self.outcomes[self.states[index]]
+        return (dict(probabilities), list(reasoning) if render else codes, primary,
+                self.final_scores[index])
+
+
+_table = None
+_table_fingerprint = None
+_table_lock = threading.Lock()
+
+
+def get_decision_table():
+    """Tabel keputusan aktif; dibangun ulang bila konstanta/rules berubah"""
+    global _table, _table_fingerprint
+    if _table is None or not _is_current(_table_fingerprint):
+        with _table_lock:
+            if _table is None or not _is_current(_table_fingerprint):
+                fingerprint = _fingerprint()
+                _table = DecisionTable()
+                _table_fingerprint = fingerprint
+    return _table
+
+
+def lookup_decision(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum, render=True):
+    """Setara apply_decision_rules, tetapi berupa lookup pada tabel keputusan"""
+    return get_decision_table().lookup(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum, render)
@@ -0,0 +1,46 @@
+"""
+Katalog pesan untuk teks detail breakdown.
+
+Fungsi skor dengan render=False tidak memformat teks: tiap item breakdown
+berisi `detail_code`, tuple (kode, parameter...), bukan `detail`. Teks
+baru dibentuk saat ditampilkan/diekspor lewat render_detail(), dari
+template yang sudah dikompilasi menjadi bound method str.format, dengan
+hasil identik dengan teks yang dibentuk langsung oleh fungsi skor.
+
+Kode alasan (reasoning) decision rules dirender oleh RuleSet aktif
+(lihat rule_engine.RuleSet.render_reasoning), karena teksnya berversi
+bersama file aturan.
+"""
+
+# Kode detail -> template (parameter posisional)
+DETAIL_TEMPLATES = {
+    "teks": "{}",
+    "tes_urine": "{} zat terdeteksi positif",
+    "kecanduan": "{}/11 kriteria DSM-5 - {}",
+    "durasi": "{} bulan ({})",
+    "bb_bawah": "{}g - Di bawah gramatur SEMA (< {}g)",
+    "bb_1_5x": "{}g - 1-5x gramatur SEMA ({}-{}g)",
+    "bb_5_20x": "{}g - 5-20x gramatur SEMA",
+    "bb_20x": "{}g - Lebih dari 20x gramatur SEMA (> {}g)",
+}
+
+_FORMATTERS = {code: template.format for code, template in DETAIL_TEMPLATES.items()}
+_FORMATTERS["teks"] = str  # label opsi apa adanya, tanpa format
+
+
+def render_detail(detail_code):
+    """Teks detail dari tuple (kode, parameter...)"""
+    return _FORMATTERS[detail_code[0]](*detail_code[1:])
+
+
+def render_breakdown(breakdown):
+    """
+    Salinan breakdown dengan `detail` berupa teks (item yang sudah berisi
+    `detail` dibiarkan apa adanya).
+    """
+    rendered = {}
+    for kategori, item in breakdown.items():
+        if "detail_code" in item:
+            item = {"skor": item["skor"], "max": item["max"], "detail": render_detail(item["detail_code"])}
+        rendered[kategori] = item
+    return rendered
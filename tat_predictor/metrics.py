@@ -0,0 +1,256 @@
+"""
+Timing per tahap analisis dan ekspor metrik format Prometheus.
+
+Instrumentasi diaktifkan lewat environment variable saat proses start:
+
+- TAT_METRICS=1            : aktifkan pencatatan span
+- TAT_METRICS_FILE=path    : tulis metrik (format teks Prometheus) ke file
+- TAT_METRICS_PORT=9464    : sajikan metrik di http://127.0.0.1:PORT/metrics
+
+Mengisi FILE atau PORT otomatis mengaktifkan pencatatan. Bila nonaktif,
+instrument() mengembalikan fungsi asli apa adanya dan span()/rerun_trace()
+mengembalikan context manager kosong bersama, sehingga tidak ada overhead
+di jalur skoring.
+"""
+
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+METRICS_ENV = "TAT_METRICS"
+METRICS_FILE_ENV = "TAT_METRICS_FILE"
+METRICS_PORT_ENV = "TAT_METRICS_PORT"
+
+# Batas atas bucket histogram durasi (detik)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Interval minimum antar penulisan file metrik (detik)
+FILE_WRITE_INTERVAL = 1.0
+
+_enabled = bool(os.environ.get(METRICS_ENV) or os.environ.get(METRICS_FILE_ENV)
+                or os.environ.get(METRICS_PORT_ENV))
+
+_NULL = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class _Stage:
+    __slots__ = ("count", "errors", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+
+_stages = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def record(stage, seconds, error=False):
+    """Catat satu durasi ke histogram tahap dan ke trace rerun yang aktif"""
+    with _lock:
+        data = _stages.get(stage)
+        if data is None:
+            data = _stages[stage] = _Stage()
+        data.count += 1
+        data.errors += error
+        data.total += seconds
+        data.max = max(data.max, seconds)
+        data.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.stage, time.perf_counter() - self.started, error=exc_type is not None)
+        return False
+
+
+def span(stage):
+    """Context manager timing satu tahap (kosong bila metrics nonaktif)"""
+    return _Span(stage) if _enabled else _NULL
+
+
+def instrument(func, stage=None):
+    """
+    Bungkus fungsi agar setiap panggilan tercatat sebagai span `stage`
+    (default: nama fungsi). Bila metrics nonaktif, fungsi asli dikembalikan.
+    """
+    if not _enabled:
+        return func
+    stage = stage or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _Span(stage):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextlib.contextmanager
+def _trace(stage):
+    outer = getattr(_local, "spans", None)
+    spans = _local.spans = []
+    started = time.perf_counter()
+    try:
+        yield spans
+    finally:
+        _local.spans = outer
+        elapsed = time.perf_counter() - started
+        if outer is not None:
+            # Trace bersarang (fragment di dalam rerun penuh): span-nya ikut
+            # tercatat di trace luar
+            outer.extend(spans)
+        record(stage, elapsed)
+        spans.append((stage, elapsed))
+        _maybe_write_file()
+
+
+def rerun_trace(stage="rerun"):
+    """
+    Context manager untuk satu rerun script atau fragment: span di dalamnya
+    dikumpulkan ke list (stage, detik) yang di-yield, dan total durasinya
+    dicatat sebagai `stage`. Boleh bersarang; span trace dalam ikut masuk
+    ke trace luar. Yield None bila metrics nonaktif.
+    """
+    return _trace(stage) if _enabled else _NULL
+
+
+def tracing():
+    """True bila thread ini sedang berada di dalam rerun_trace()"""
+    return getattr(_local, "spans", None) is not None
+
+
+def snapshot():
+    """{stage: dict(count, errors, total, max, mean)} untuk panel debug"""
+    with _lock:
+        return {
+            stage: {
+                "count": data.count,
+                "errors": data.errors,
+                "total": data.total,
+                "max": data.max,
+                "mean": data.total / data.count if data.count else 0.0,
+            }
+            for stage, data in sorted(_stages.items())
+        }
+
+# =============================================================================
+# EKSPOR PROMETHEUS
+# =============================================================================
+
+def render_prometheus():
+    """Semua metrik dalam format teks eksposisi Prometheus"""
+    with _lock:
+        items = [(stage, data.count, data.errors, data.total, list(data.buckets))
+                 for stage, data in sorted(_stages.items())]
+
+    lines = [
+        "# HELP tat_stage_calls_total Jumlah eksekusi per tahap analisis",
+        "# TYPE tat_stage_calls_total counter",
+    ]
+    lines += [f'tat_stage_calls_total{{stage="{stage}"}} {count}' for stage, count, *_ in items]
+    lines += [
+        "# HELP tat_stage_errors_total Jumlah eksekusi tahap yang melempar exception",
+        "# TYPE tat_stage_errors_total counter",
+    ]
+    lines += [f'tat_stage_errors_total{{stage="{stage}"}} {errors}' for stage, _, errors, *_ in items]
+    lines += [
+        "# HELP tat_stage_duration_seconds Durasi per tahap analisis",
+        "# TYPE tat_stage_duration_seconds histogram",
+    ]
+    for stage, count, _, total, buckets in items:
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            lines.append(f'tat_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'tat_stage_duration_seconds_sum{{stage="{stage}"}} {total!r}')
+        lines.append(f'tat_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+_last_write = 0.0
+
+
+def write_file(path=None):
+    """Tulis metrik ke file secara atomik (tulis ke file sementara lalu rename)"""
+    path = path or os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def _maybe_write_file():
+    global _last_write
+    if not os.environ.get(METRICS_FILE_ENV):
+        return
+    now = time.monotonic()
+    if now - _last_write >= FILE_WRITE_INTERVAL:
+        _last_write = now
+        write_file()
+
+
+_server = None
+
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """
+    Sajikan /metrics di thread daemon (sekali per proses). Port default
+    dari TAT_METRICS_PORT; tidak melakukan apa pun bila tidak diatur.
+    """
+    global _server
+    port = port or os.environ.get(METRICS_PORT_ENV)
+    if not port or _server is not None:
+        return _server
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), Handler)
+            threading.Thread(target=_server.serve_forever, name="tat-metrics", daemon=True).start()
+    return _server
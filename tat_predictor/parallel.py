@@ -0,0 +1,263 @@
+"""
+Skoring batch paralel multi-core dengan hasil di shared memory.
+
+score_batch membagi tabel kasus mentah menjadi irisan (shard) baris.
+Tiap worker di process pool menerima irisan kolom input saja
+(INPUT_COLUMNS, di-pickle), menjalankan encode_cases dan score_encoded
+pada irisan itu dan menulis hasil langsung ke satu blok output
+multiprocessing.shared_memory yang ditempelkan sebagai array NumPy.
+Proses induk hanya mengiris kolom dan menyusun DataFrame hasil; parsing
+label teks dan penghitungan zat (bagian terbesar waktu skoring batch)
+ikut terbagi ke worker.
+
+Untuk kolom yang sudah di-encode, score_encoded menyalin kolom
+integer/float ke blok input bersama sehingga yang dikirim per tugas hanya
+nama blok dan batas shard.
+
+Tabel keputusan dikirim sekali ke tiap worker saat pool dibuat, sehingga
+worker tidak membangun ulang tabel dan selalu memakai decision rules yang
+sama dengan proses induk.
+
+    with ShardedScorer(workers=8) as scorer:
+        for chunk in chunks:
+            hasil = scorer.score_batch(chunk)
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from tat_predictor.batch import INPUT_COLUMNS, _batch_output, _table_arrays, encode_cases, score_encoded
+from tat_predictor.decision_table import get_decision_table
+from tat_predictor.scoring import REKOMENDASI
+
+# Jumlah baris maksimum per shard (beberapa shard per worker agar beban rata)
+DEFAULT_SHARD_SIZE = 65_536
+
+# Kolom input encode_cases() -> dtype di shared memory. Kolom numerik tetap
+# float64 agar perbandingan ambang identik dengan score_batch.
+INPUT_DTYPES = {
+    "num_zat": np.int32,
+    "dsm5_count": np.float64,
+    "durasi_bulan": np.float64,
+    "fungsi_sosial": np.int8,
+    "komorbid": np.int8,
+    "peran": np.int8,
+    "barang_bukti": np.float64,
+    "jenis_narkotika": np.int8,
+    "status_tangkap": np.int8,
+    "riwayat_pidana": np.int8,
+}
+
+# Kolom output score_encoded() -> (dtype di shared memory, jumlah kolom per
+# baris). Skor medis/hukum diangkut sebagai int16 lalu dikembalikan ke dtype
+# hasil batch.score_encoded (RESULT_DTYPES)
+OUTPUT_DTYPES = {
+    "skor_medis": (np.int16, 1),
+    "skor_hukum": (np.int16, 1),
+    "final_score": (np.float64, 1),
+    "outcome": (np.uint16, 1),
+    "primary_code": (np.uint8, 1),
+    "rule": (np.uint8, 1),
+    "probabilities": (np.float64, len(REKOMENDASI)),
+}
+
+# dtype kolom hasil batch.score_encoded(), agar hasil paralel identik
+RESULT_DTYPES = {name: dtype for name, (dtype, _) in OUTPUT_DTYPES.items()}
+RESULT_DTYPES.update(skor_medis=np.int64, skor_hukum=np.int64)
+
+# =============================================================================
+# LAYOUT SHARED MEMORY
+# =============================================================================
+
+def _layout(dtypes, n):
+    """[(nama, dtype, shape, offset)] dan ukuran total; kolom rata 8 byte"""
+    layout, offset = [], 0
+    for name, spec in dtypes.items():
+        dtype, width = spec if isinstance(spec, tuple) else (spec, 1)
+        shape = (n, width) if width > 1 else (n,)
+        layout.append((name, np.dtype(dtype), shape, offset))
+        offset += -(-np.dtype(dtype).itemsize * math.prod(shape) // 8) * 8
+    return layout, max(offset, 1)
+
+
+def _views(shm, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, dtype, shape, offset in layout}
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+_worker_table = None
+
+
+def _init_worker(table):
+    global _worker_table
+    _worker_table = table
+
+
+def _write_shard(out_name, n, start, stop, enc, gramatur_limits):
+    """Skor kolom ter-encode shard dan tulis ke baris [start, stop) blok output"""
+    # Worker berbagi resource tracker dengan proses induk, sehingga membuka
+    # blok di sini tidak membuatnya di-unlink saat worker berhenti
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        outputs = _views(shm_out, _layout(OUTPUT_DTYPES, n)[0])
+        result = score_encoded(enc, gramatur_limits, table=_worker_table)
+        for name, column in outputs.items():
+            column[start:stop] = result[name]
+        # View harus dilepas sebelum blok ditutup
+        del outputs, result
+    finally:
+        shm_out.close()
+    return stop - start
+
+
+def _score_shard(in_name, out_name, n, start, stop, gramatur_limits):
+    """Skor baris [start, stop) blok input ter-encode; mengembalikan jumlah baris"""
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    try:
+        inputs = _views(shm_in, _layout(INPUT_DTYPES, n)[0])
+        rows = _write_shard(out_name, n, start, stop,
+                            {name: column[start:stop] for name, column in inputs.items()},
+                            gramatur_limits)
+        del inputs
+    finally:
+        shm_in.close()
+    return rows
+
+
+def _score_raw_shard(columns, out_name, n, start, stop, gramatur_limits):
+    """Encode dan skor irisan kolom mentah untuk baris [start, stop)"""
+    return _write_shard(out_name, n, start, stop, encode_cases(columns), gramatur_limits)
+
+
+def _raw_shards(cases):
+    """
+    (jumlah baris, fungsi irisan) atas kolom input yang dibaca encode_cases.
+    DataFrame diiris dengan iloc agar kolom kategori tetap berupa kode.
+    """
+    names = ["num_zat" if name == "zat_positif" and "num_zat" in cases else name
+             for name in INPUT_COLUMNS]
+    if hasattr(cases, "columns") and hasattr(cases, "index"):
+        frame = cases[names]
+        return len(frame), lambda start, stop: frame.iloc[start:stop]
+    columns = {name: cases[name] for name in names}
+    return len(columns[names[0]]), lambda start, stop: {name: column[start:stop]
+                                                        for name, column in columns.items()}
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+class ShardedScorer:
+    """
+    Process pool untuk skoring batch paralel. Buat sekali dan pakai untuk
+    banyak potongan tabel; pool dibuat ulang otomatis bila decision rules
+    aktif berubah.
+
+    Args:
+        workers: jumlah proses (default: jumlah core CPU)
+        shard_size: jumlah baris maksimum per tugas
+    """
+
+    def __init__(self, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._pool = None
+        self._table = None
+
+    def _ensure_pool(self):
+        table = _table_arrays(get_decision_table())
+        if self._pool is None or table is not self._table:
+            self.close()
+            self._table = table
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(table,))
+        return self._pool
+
+    def score_encoded(self, enc, gramatur_limits=None):
+        """
+        Seperti batch.score_encoded (dtype sama), tanpa array komponen skor:
+        dict skor_medis, skor_hukum, final_score, outcome, primary_code, rule
+        dan probabilities.
+        """
+        n = len(enc["num_zat"])
+        if self.workers == 1 or n <= self.shard_size:
+            result = score_encoded(enc, gramatur_limits)
+            return {name: result[name] for name in OUTPUT_DTYPES}
+
+        in_layout, in_size = _layout(INPUT_DTYPES, n)
+        shm_in = shared_memory.SharedMemory(create=True, size=in_size)
+        inputs = None
+        try:
+            inputs = _views(shm_in, in_layout)
+            for name, column in inputs.items():
+                column[:] = enc[name]
+            return self._map_shards(n, _score_shard, lambda start, stop: shm_in.name, gramatur_limits)
+        finally:
+            # View harus dilepas sebelum blok ditutup
+            inputs = None
+            shm_in.close()
+            shm_in.unlink()
+
+    def _map_shards(self, n, func, shard_input, gramatur_limits):
+        """
+        Jalankan func(shard_input(start, stop), nama blok output, n, start,
+        stop, gramatur_limits) per shard dan salin hasil keluar dari blok
+        output bersama.
+        """
+        pool = self._ensure_pool()
+        out_layout, out_size = _layout(OUTPUT_DTYPES, n)
+        shm_out = shared_memory.SharedMemory(create=True, size=out_size)
+        try:
+            # Minimal satu shard per worker, sisanya dibagi rata
+            shard = min(self.shard_size, -(-n // self.workers))
+            bounds = [(start, min(start + shard, n)) for start in range(0, n, shard)]
+            futures = [pool.submit(func, shard_input(start, stop), shm_out.name, n, start, stop,
+                                   gramatur_limits)
+                       for start, stop in bounds]
+            # Semua shard selesai (juga bila ada yang gagal) sebelum blok dilepas
+            wait(futures)
+            for future in futures:
+                future.result()
+
+            # Disalin keluar (dengan dtype hasil batch) sebelum blok dilepas
+            return {name: column.astype(RESULT_DTYPES[name])
+                    for name, column in _views(shm_out, out_layout).items()}
+        finally:
+            shm_out.close()
+            shm_out.unlink()
+
+    def score_batch(self, cases, gramatur_limits=None):
+        """
+        Setara batch.score_batch(cases). Irisan kolom mentah dikirim ke
+        worker, sehingga encoding dan skoring sama-sama berjalan paralel.
+        """
+        n, shard_input = _raw_shards(cases)
+        if self.workers == 1 or n <= self.shard_size:
+            result = score_encoded(encode_cases(cases), gramatur_limits)
+        else:
+            result = self._map_shards(n, _score_raw_shard, shard_input, gramatur_limits)
+        return _batch_output(cases, result)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_batch_parallel(cases, workers=None, gramatur_limits=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Skoring paralel satu tabel kasus (pool dibuat dan ditutup di sini)"""
+    with ShardedScorer(workers, shard_size) as scorer:
+        return scorer.score_batch(cases, gramatur_limits)
@@ -0,0 +1,333 @@
+"""
+Render PDF cepat tanpa layout platypus (jalur cepat untuk cetak massal).
+
+Layout laporan hampir seluruhnya tetap: judul, heading, header/latar dan
+garis tabel, serta catatan penting selalu berada di koordinat yang sama
+(dihitung dari hasil layout generate_pdf_report). Bagian statis tersebut
+dirender sekali per proses menjadi objek PDF yang sudah diserialisasi
+(katalog, halaman, font, dan content stream latar). Per laporan hanya
+teks isian (nilai ringkasan, baris breakdown/probabilitas, alasan,
+timestamp) yang diformat pada koordinat tetap, lalu xref dan trailer
+ditambahkan.
+
+reportlab tetap dipakai untuk metrik dan encoding font standar (lebar
+teks, substitusi glyph ke Symbol/ZapfDingbats), dimuat saat PDF pertama.
+
+Bila isi laporan keluar dari layout tetap (jumlah baris tabel berbeda,
+alasan terlalu banyak atau terlalu panjang sehingga perlu dibungkus,
+markup paragraf), laporan dirender lewat generate_pdf_report yang tetap
+menjadi pilihan fidelitas penuh.
+"""
+
+import functools
+import zlib
+
+from tat_predictor.reports import generate_pdf_report
+
+# =============================================================================
+# GEOMETRI (letter 612x792, margin 72, frame x=78 lebar 456)
+# =============================================================================
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+FRAME_X, FRAME_WIDTH = 78, 456
+
+_FONT_NAMES = {"Helvetica": "F1", "Helvetica-Bold": "F2", "Symbol": "F3", "ZapfDingbats": "F4"}
+
+# Tabel: (origin x, origin y, lebar kolom)
+_SUMMARY = (126, 489, (180, 180))
+_MEDIS = (108, 327, (108, 72, 216))
+_HUKUM = (108, 183, (108, 72, 216))
+_PROB_1 = (126, 93, (144, 108, 108))   # header + baris pertama di halaman 1
+_PROB_2 = (126, 660, (144, 108, 108))  # tiga baris sisanya di halaman 2
+
+# Jumlah baris isi yang didukung layout tetap
+_MEDIS_ROWS, _HUKUM_ROWS, _PROB_ROWS = 5, 4, 4
+
+# Alasan: baris pertama di y=596, turun 12 pt per baris. Catatan penting
+# (heading di 562 - 12n) harus tetap di atas margin bawah halaman 2.
+_REASON_TOP, _LEADING = 596, 12
+MAX_REASONS = 36
+
+_WHITESMOKE = ".960784 .960784 .960784"
+_HEADER_COLORS = {
+    "summary": ".501961 .501961 .501961",
+    "medis": ".678431 .847059 .901961",
+    "hukum": ".564706 .933333 .564706",
+    "prob": ".827451 .827451 .827451",
+}
+_BEIGE = ".960784 .960784 .862745"
+
+_TITLE = "LAPORAN ANALISIS TAT - BNN"
+_FOOTER_LINES = (
+    "Sistem ini adalah ALAT BANTU untuk proses asesmen.",
+    "Keputusan final tetap berada di tangan Tim Asesmen Terpadu BNN.",
+)
+
+
+def _num(value):
+    """Angka PDF ringkas (maks. 3 desimal, tanpa nol di belakang)"""
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+# =============================================================================
+# TEKS
+# =============================================================================
+
+@functools.lru_cache(maxsize=4096)
+def _encoded(text, font_name, size):
+    """
+    (lebar, operator teks) untuk satu string; glyph yang tidak ada di
+    WinAnsi dialihkan ke Symbol/ZapfDingbats seperti di reportlab.
+    """
+    from reportlab.lib.rl_accel import escapePDF, unicode2T1
+    from reportlab.pdfbase.pdfmetrics import getFont, stringWidth
+
+    font = getFont(font_name)
+    ops = []
+    for sub_font, chunk in unicode2T1(text, [font] + font.substitutionFonts):
+        ops.append(f"/{_FONT_NAMES[sub_font.fontName]} {size} Tf ({escapePDF(chunk)}) Tj")
+    return stringWidth(text, font_name, size), " ".join(ops)
+
+
+def _text(x, y, text, font_name="Helvetica", size=10):
+    return f"1 0 0 1 {_num(x)} {y} Tm {_encoded(text, font_name, size)[1]}"
+
+
+def _text_center(left, width, y, text, font_name="Helvetica", size=10):
+    text_width = _encoded(text, font_name, size)[0]
+    return _text(left + (width - text_width) / 2, y, text, font_name, size)
+
+
+def _table_row(table, row_y, cells, font_name="Helvetica"):
+    """Teks satu baris tabel, rata tengah per kolom (baseline row_y relatif)"""
+    x, y, widths = table
+    ops = []
+    left = x
+    for width, cell in zip(widths, cells):
+        ops.append(_text_center(left, width, y + row_y, cell, font_name))
+        left += width
+    return ops
+
+
+def _table_grid(table, height, header=18):
+    """Garis grid 1 pt hitam: baris isi 18 pt di bawah header setinggi `header`"""
+    x, y, widths = table
+    width = sum(widths)
+    ops = ["q 1 J 1 j 0 0 0 RG 1 w"]
+    row_lines = list(range(0, height - header + 1, 18))
+    if row_lines[-1] != height:
+        row_lines.append(height)
+    for row_y in row_lines:
+        ops.append(f"{x} {y + row_y} m {x + width} {y + row_y} l S")
+    left = x
+    for col_width in (0,) + widths:
+        left += col_width
+        ops.append(f"{left} {y} m {left} {y + height} l S")
+    ops.append("Q")
+    return ops
+
+
+def _fill(color, x, y, width, height):
+    return f"{color} rg {x} {y} {width} {height} re f"
+
+
+def _paragraph_text(text):
+    """Teks Paragraph: spasi berurutan diringkas seperti layout platypus"""
+    return " ".join(str(text).split())
+
+
+# =============================================================================
+# LATAR STATIS (DIBANGUN SEKALI PER PROSES)
+# =============================================================================
+
+def _static_page_1():
+    summary_x, summary_y, summary_widths = _SUMMARY
+    ops = [
+        _fill(_HEADER_COLORS["summary"], summary_x, summary_y + 90, sum(summary_widths), 27),
+        _fill(_BEIGE, summary_x, summary_y, sum(summary_widths), 90),
+        _fill(_HEADER_COLORS["medis"], _MEDIS[0], _MEDIS[1] + 90, sum(_MEDIS[2]), 18),
+        _fill(_HEADER_COLORS["hukum"], _HUKUM[0], _HUKUM[1] + 72, sum(_HUKUM[2]), 18),
+        _fill(_HEADER_COLORS["prob"], _PROB_1[0], _PROB_1[1] + 18, sum(_PROB_1[2]), 18),
+    ]
+    ops += _table_grid(_SUMMARY, 117, header=27)
+    ops += _table_grid(_MEDIS, 108)
+    ops += _table_grid(_HUKUM, 90)
+    ops += _table_grid(_PROB_1, 36)
+
+    ops.append(f"BT {_WHITESMOKE} rg")
+    ops += _table_row(_SUMMARY, 104, ["Parameter", "Nilai"], "Helvetica-Bold")
+    ops.append("0 g")
+    ops.append(_text_center(FRAME_X, FRAME_WIDTH, 698, _TITLE, "Helvetica-Bold", 16))
+    for y, heading in [(626, "RINGKASAN HASIL"), (455, "BREAKDOWN ASESMEN MEDIS"),
+                       (293, "BREAKDOWN ASESMEN HUKUM"), (149, "DISTRIBUSI PROBABILITAS")]:
+        ops.append(_text(FRAME_X, y, heading, "Helvetica-Bold", 14))
+    for y, label in zip((77, 59, 41, 23, 5), ["Skor Asesmen Medis", "Skor Asesmen Hukum", "Composite Score",
+                                              "Rekomendasi Utama", "Tingkat Keyakinan"]):
+        ops.append(_text_center(_SUMMARY[0], _SUMMARY[2][0], _SUMMARY[1] + y, label))
+    ops += _table_row(_MEDIS, 95, ["Kategori", "Skor", "Detail"], "Helvetica-Bold")
+    ops += _table_row(_HUKUM, 77, ["Kategori", "Skor", "Detail"], "Helvetica-Bold")
+    ops += _table_row(_PROB_1, 23, ["Rekomendasi", "Probabilitas (%)", "Status"], "Helvetica-Bold")
+    ops.append("ET")
+    return ops
+
+
+def _static_page_2():
+    ops = _table_grid(_PROB_2, 54, header=0)
+    ops.append("BT 0 g")
+    ops.append(_text(FRAME_X, 626, "ALASAN DAN PERTIMBANGAN", "Helvetica-Bold", 14))
+    ops.append("ET")
+    return ops
+
+
+def _stream(number, content, compress):
+    data = content.encode("latin-1")
+    if compress:
+        data = zlib.compress(data)
+        return (f"{number} 0 obj\n<< /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode("ascii")
+                + data + b"\nendstream\nendobj\n")
+    return (f"{number} 0 obj\n<< /Length {len(data)} >>\nstream\n".encode("ascii")
+            + data + b"\nendstream\nendobj\n")
+
+
+# Nomor objek: 1-12 statis (dibangun sekali), 13-14 content stream isian
+_OBJECT_COUNT = 14
+
+
+@functools.lru_cache(maxsize=None)
+def _skeleton(compress):
+    """
+    (byte awal PDF, offset objek 1-12) berisi seluruh objek statis:
+    katalog, halaman, resource font, info, dan content stream latar.
+    """
+    fonts = " ".join(f"/{ref} {6 + i} 0 R" for i, ref in enumerate(_FONT_NAMES.values()))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R /PageMode /UseNone >>",
+        "<< /Type /Pages /Kids [ 3 0 R 4 0 R ] /Count 2 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [ 0 0 {PAGE_WIDTH} {PAGE_HEIGHT} ] /Resources 5 0 R "
+        "/Contents [ 11 0 R 13 0 R ] >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [ 0 0 {PAGE_WIDTH} {PAGE_HEIGHT} ] /Resources 5 0 R "
+        "/Contents [ 12 0 R 14 0 R ] >>",
+        f"<< /Font << {fonts} >> /ProcSet [ /PDF /Text ] >>",
+    ]
+    for font_name, ref in _FONT_NAMES.items():
+        # Symbol/ZapfDingbats memakai encoding bawaan font (seperti reportlab)
+        encoding = " /Encoding /WinAnsiEncoding" if font_name.startswith("Helvetica") else ""
+        objects.append(f"<< /Type /Font /Subtype /Type1 /Name /{ref} /BaseFont /{font_name}{encoding} >>")
+    objects.append(f"<< /Title ({_TITLE}) /Producer (Sistem Prediksi TAT BNN) >>")
+
+    out = bytearray(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("ascii")
+    for number, ops in [(11, _static_page_1()), (12, _static_page_2())]:
+        offsets.append(len(out))
+        out += _stream(number, "\n".join(ops), compress)
+    return bytes(out), tuple(offsets)
+
+
+# =============================================================================
+# ISIAN PER LAPORAN
+# =============================================================================
+
+def _fits_layout(export_data, reasons):
+    """True bila isi laporan dapat digambar di koordinat tetap"""
+    breakdown_medis = export_data.get("breakdown_medis", {}) or {}
+    breakdown_hukum = export_data.get("breakdown_hukum", {}) or {}
+    probabilities = export_data.get("probabilities", {}) or {}
+    if (len(breakdown_medis), len(breakdown_hukum), len(probabilities)) != (_MEDIS_ROWS, _HUKUM_ROWS, _PROB_ROWS):
+        return False
+    if len(reasons) > MAX_REASONS:
+        return False
+    # Paragraph membaca markup (<b>, &amp;) dan membungkus baris panjang;
+    # kasus seperti ini diserahkan ke platypus
+    for text in reasons + [f"Dokumen ini dihasilkan oleh Sistem Prediksi TAT BNN pada "
+                           f"{export_data.get('timestamp', '-')}"]:
+        if "<" in text or "&" in text or _encoded(text, "Helvetica", 10)[0] > FRAME_WIDTH:
+            return False
+    # Sel tabel dengan baris baru menjadi sel multi-baris di platypus
+    cells = [str(export_data.get("rekomendasi_utama", "-"))]
+    for breakdown in (breakdown_medis, breakdown_hukum):
+        for kategori, data in breakdown.items():
+            cells += [str(kategori), str(data.get("detail", ""))]
+    cells += [str(rec) for rec in probabilities]
+    return not any("\n" in cell for cell in cells)
+
+
+def _breakdown_rows(breakdown):
+    return [[str(kategori), f"{data.get('skor', 0)}/{data.get('max', 0)}", str(data.get("detail", ""))]
+            for kategori, data in breakdown.items()]
+
+
+def _dynamic_pages(export_data, reasons):
+    timestamp = export_data.get("timestamp", "-")
+
+    page_1 = ["BT 0 g", _text_center(FRAME_X, FRAME_WIDTH, 662, _paragraph_text(f"Waktu Analisis: {timestamp}"))]
+    summary_values = [
+        f"{export_data.get('skor_medis', 0)}/100",
+        f"{export_data.get('skor_hukum', 0)}/100",
+        f"{float(export_data.get('final_score', 0.0)):.1f}/100",
+        str(export_data.get("rekomendasi_utama", "-")),
+        f"{float(export_data.get('confidence', 0.0)):.1f}%",
+    ]
+    left = _SUMMARY[0] + _SUMMARY[2][0]
+    for y, value in zip((77, 59, 41, 23, 5), summary_values):
+        page_1.append(_text_center(left, _SUMMARY[2][1], _SUMMARY[1] + y, value))
+
+    for table, rows in [(_MEDIS, _breakdown_rows(export_data["breakdown_medis"])),
+                        (_HUKUM, _breakdown_rows(export_data["breakdown_hukum"]))]:
+        for row_y, cells in zip(range(18 * (len(rows) - 1) + 5, 0, -18), rows):
+            page_1 += _table_row(table, row_y, cells)
+
+    rekom_utama = export_data.get("rekomendasi_utama", "")
+    prob_rows = [[str(rec), f"{float(prob):.1f}%", "PRIMARY" if rec == rekom_utama else "ALTERNATIVE"]
+                 for rec, prob in export_data["probabilities"].items()]
+    page_1 += _table_row(_PROB_1, 5, prob_rows[0])
+    page_1.append("ET")
+
+    page_2 = ["BT 0 g"]
+    for row_y, cells in zip((41, 23, 5), prob_rows[1:]):
+        page_2 += _table_row(_PROB_2, row_y, cells)
+    for i, reason in enumerate(reasons):
+        page_2.append(_text(FRAME_X, _REASON_TOP - _LEADING * i, reason))
+
+    # Catatan penting bergeser mengikuti jumlah baris alasan
+    heading_y = 562 - _LEADING * len(reasons)
+    page_2.append(_text(FRAME_X, heading_y, "CATATAN PENTING:", "Helvetica-Bold", 12))
+    for offset, line in zip((24, 36), _FOOTER_LINES):
+        page_2.append(_text(FRAME_X, heading_y - offset, line))
+    page_2.append(_text_center(FRAME_X, FRAME_WIDTH, heading_y - 48,
+                               _paragraph_text(f"Dokumen ini dihasilkan oleh Sistem Prediksi TAT BNN pada {timestamp}")))
+    page_2.append("ET")
+    return "\n".join(page_1), "\n".join(page_2)
+
+
+def generate_pdf_report_fast(export_data, page_compression=None):
+    """
+    Laporan PDF seperti generate_pdf_report, digambar langsung pada
+    koordinat tetap di atas latar statis yang sudah dirender.
+
+    page_compression=0 menulis content stream tanpa kompresi (dipakai
+    result_cache untuk menambal timestamp). Laporan yang tidak muat di
+    layout tetap dirender lewat generate_pdf_report.
+    """
+    reasons = [_paragraph_text(f"• {reason}") for reason in (export_data.get("reasoning", []) or [])]
+    if not _fits_layout(export_data, reasons):
+        return generate_pdf_report(export_data, page_compression)
+
+    compress = page_compression != 0
+    skeleton, offsets = _skeleton(compress)
+    offsets = list(offsets)
+
+    out = bytearray(skeleton)
+    for number, content in enumerate(_dynamic_pages(export_data, reasons), start=13):
+        offsets.append(len(out))
+        out += _stream(number, content, compress)
+
+    xref = len(out)
+    out += f"xref\n0 {_OBJECT_COUNT + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("ascii")
+    out += f"trailer\n<< /Size {_OBJECT_COUNT + 1} /Root 1 0 R /Info 10 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
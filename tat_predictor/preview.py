@@ -0,0 +1,109 @@
+"""
+Pratinjau skor langsung (live) untuk form input.
+
+Setiap perubahan widget menghitung ulang pratinjau, tetapi hanya bagian
+yang input-nya berubah: skor medis dan skor hukum di-memoize terpisah per
+inputnya, sehingga mengubah field hukum tidak menjalankan ulang
+calculate_medical_score dan sebaliknya. Keputusan hanya dievaluasi ulang
+bila skor total atau skor kategori breakdown yang dibaca decision rules
+aktif (mis. Fungsi Sosial, Komorbid, Barang Bukti, Riwayat Pidana)
+berubah.
+"""
+
+from tat_predictor import rule_engine
+from tat_predictor.decision_table import lookup_decision
+from tat_predictor.scoring import calculate_legal_score, calculate_medical_score
+
+_MISSING = object()
+
+
+class ScorePreview:
+    """
+    Memo satu entri (input terakhir) per tahap: medis, hukum dan keputusan.
+    Satu objek per sesi. Hasil dipakai bersama antar-rerun; jangan
+    dimodifikasi.
+
+    Args:
+        medical, legal, decide: fungsi skor dan keputusan (default fungsi
+            paket; aplikasi memberikan versi yang diinstrumentasi metrics)
+    """
+
+    def __init__(self, medical=calculate_medical_score, legal=calculate_legal_score,
+                 decide=lookup_decision):
+        self._medical = medical
+        self._legal = legal
+        self._decide = decide
+        self._memo = {"medis": (_MISSING, None), "hukum": (_MISSING, None), "keputusan": (_MISSING, None)}
+        # Jumlah evaluasi nyata per tahap (untuk pengecekan dan panel debug)
+        self.evaluations = {"medis": 0, "hukum": 0, "keputusan": 0}
+
+    def _cached(self, stage, key, compute):
+        last_key, value = self._memo[stage]
+        if key != last_key:
+            value = compute()
+            self._memo[stage] = (key, value)
+            self.evaluations[stage] += 1
+        return value
+
+    def medical(self, zat_positif, dsm5_count, durasi_bulan, fungsi_sosial, ada_komorbid, tingkat_komorbid):
+        """(skor_medis, breakdown_medis), dihitung ulang hanya bila input medis berubah"""
+        key = (tuple(zat_positif), dsm5_count, durasi_bulan, fungsi_sosial, ada_komorbid, tingkat_komorbid)
+        return self._cached("medis", key, lambda: self._medical(
+            zat_positif, dsm5_count, durasi_bulan, fungsi_sosial, ada_komorbid, tingkat_komorbid
+        ))
+
+    def legal(self, peran, barang_bukti, jenis_narkotika, status_tangkap, riwayat_pidana):
+        """(skor_hukum, breakdown_hukum), dihitung ulang hanya bila input hukum berubah"""
+        key = (peran, barang_bukti, jenis_narkotika, status_tangkap, riwayat_pidana)
+        return self._cached("hukum", key, lambda: self._legal(
+            peran, barang_bukti, jenis_narkotika, status_tangkap, riwayat_pidana
+        ))
+
+    def decision(self, skor_medis, skor_hukum, breakdown_medis, breakdown_hukum):
+        """
+        (probabilities, reasoning, primary_rec, final_score). Kunci memo
+        berisi versi aturan aktif, kedua skor dan skor kategori yang dibaca
+        aturan, sehingga perubahan detail breakdown lain tidak memicu
+        evaluasi ulang.
+        """
+        ruleset = rule_engine.active_ruleset()
+        breakdowns = {"medis": breakdown_medis, "hukum": breakdown_hukum}
+        key = [ruleset, skor_medis, skor_hukum]
+        for var in ruleset.variables:
+            source = rule_engine.VARIABLES[var]
+            if source is not None:
+                side, kategori = source
+                key.append(breakdowns[side][kategori]['skor'])
+        return self._cached("keputusan", tuple(key), lambda: self._decide(
+            skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+        ))
+
+    def update(self, input_data):
+        """
+        Pratinjau lengkap untuk satu set input form (dict input_data).
+
+        Returns:
+            dict skor_medis, skor_hukum, breakdown_medis, breakdown_hukum,
+            probabilities, reasoning, primary_rec dan final_score.
+        """
+        skor_medis, breakdown_medis = self.medical(
+            input_data['zat_positif'], input_data['dsm5_count'], input_data['durasi_bulan'],
+            input_data['fungsi_sosial'], input_data['ada_komorbid'], input_data['tingkat_komorbid']
+        )
+        skor_hukum, breakdown_hukum = self.legal(
+            input_data['peran'], input_data['barang_bukti'], input_data['jenis_narkotika'],
+            input_data['status_tangkap'], input_data['riwayat_pidana']
+        )
+        probabilities, reasoning, primary_rec, final_score = self.decision(
+            skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+        )
+        return {
+            'skor_medis': skor_medis,
+            'skor_hukum': skor_hukum,
+            'breakdown_medis': breakdown_medis,
+            'breakdown_hukum': breakdown_hukum,
+            'probabilities': probabilities,
+            'reasoning': reasoning,
+            'primary_rec': primary_rec,
+            'final_score': final_score,
+        }
@@ -0,0 +1,220 @@
+"""
+Replay arsip kasus terhadap dua versi decision rules / konstanta.
+
+Setiap `input_data` yang tersimpan diskor ulang dengan versi lama dan versi
+baru (file aturan dan GRAMATUR_LIMITS) secara berdampingan, lalu dihitung
+matriks transisi rekomendasi (lama -> baru) dan daftar kasus yang berubah.
+Skor komponen dan decision rules dihitung tervektorisasi per potongan,
+sehingga arsip jutaan kasus cukup diproses dalam hitungan detik.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from tat_predictor import rule_engine
+from tat_predictor.batch import COMPONENT_KEYS, INPUT_COLUMNS, encode_cases, score_components
+from tat_predictor.scoring import GRAMATUR_LIMITS, REKOMENDASI
+
+# Kolom daftar kasus yang berubah rekomendasi
+FLIP_COLUMNS = [
+    "row",
+    "case_id",
+    "timestamp",
+    "old_rec",
+    "new_rec",
+    "old_rule",
+    "new_rule",
+    "old_final_score",
+    "new_final_score",
+]
+
+# =============================================================================
+# VERSI ATURAN
+# =============================================================================
+
+def load_version(rules_path=None, gramatur_path=None, label=None):
+    """
+    Satu versi yang akan dibandingkan.
+
+    Args:
+        rules_path: file decision rules (default: versi aktif)
+        gramatur_path: file JSON berisi override GRAMATUR_LIMITS (opsional)
+        label: nama versi pada ringkasan (default: versi dan digest file
+            aturan, ditambah nama file dan digest gramatur bila di-override)
+
+    Returns:
+        dict berisi label, ruleset dan gramatur_limits.
+    """
+    ruleset = rule_engine.load_ruleset(rules_path) if rules_path else rule_engine.active_ruleset()
+
+    gramatur_limits = dict(GRAMATUR_LIMITS)
+    if gramatur_path:
+        with open(gramatur_path, encoding="utf-8") as fh:
+            gramatur_limits.update(json.load(fh))
+
+    if label is None:
+        label = f"{ruleset.version} ({ruleset.digest[:8]})"
+        if gramatur_path:
+            # Digest batas gabungan: versi yang hanya berbeda gramatur tetap terbedakan
+            merged = json.dumps(gramatur_limits, sort_keys=True).encode("utf-8")
+            label += (f", gramatur {os.path.basename(gramatur_path)}"
+                      f" ({hashlib.sha256(merged).hexdigest()[:8]})")
+
+    return {
+        "label": label,
+        "ruleset": ruleset,
+        "gramatur_limits": gramatur_limits,
+    }
+
+
+def _decide(enc, version):
+    """(indeks aturan, kode rekomendasi, final_score) per kasus untuk satu versi"""
+    ruleset = version["ruleset"]
+    scores = score_components(enc, version["gramatur_limits"])
+
+    values = {}
+    for var in ruleset.variables:
+        source = rule_engine.VARIABLES[var]
+        values[var] = scores[var] if source is None else scores[COMPONENT_KEYS[source[1]]]
+    rule, _ = ruleset.evaluate_arrays(values)
+
+    primary = np.asarray(ruleset.rule_primary, dtype=np.int8)[rule]
+    final_score = (scores["skor_medis"] * ruleset.weights[0]) + (scores["skor_hukum"] * ruleset.weights[1])
+    return rule, primary, final_score
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+
+def replay_cases(cases, old, new, offset=0):
+    """
+    Replay satu tabel kasus (DataFrame atau dict kolom INPUT_COLUMNS).
+
+    Args:
+        cases: tabel kasus; kolom opsional case_id dan timestamp ikut
+            disalin ke daftar kasus yang berubah
+        old, new: versi hasil load_version()
+        offset: nomor baris pertama (untuk replay per potongan)
+
+    Returns:
+        dict berisi n_cases, transition (matriks int len(REKOMENDASI) x
+        len(REKOMENDASI), baris = lama, kolom = baru) dan flipped (dict
+        kolom FLIP_COLUMNS).
+    """
+    enc = encode_cases(cases)
+    old_rule, old_primary, old_score = _decide(enc, old)
+    new_rule, new_primary, new_score = _decide(enc, new)
+
+    n_rec = len(REKOMENDASI)
+    transition = np.bincount(old_primary.astype(np.int64) * n_rec + new_primary,
+                             minlength=n_rec * n_rec).reshape(n_rec, n_rec)
+
+    idx = np.flatnonzero(old_primary != new_primary)
+    labels = np.array(REKOMENDASI, dtype=object)
+    old_ids = np.array(old["ruleset"].rule_ids, dtype=object)
+    new_ids = np.array(new["ruleset"].rule_ids, dtype=object)
+    flipped = {
+        "row": idx + offset,
+        "case_id": _optional_column(cases, "case_id", idx),
+        "timestamp": _optional_column(cases, "timestamp", idx),
+        "old_rec": labels[old_primary[idx]],
+        "new_rec": labels[new_primary[idx]],
+        "old_rule": old_ids[old_rule[idx]],
+        "new_rule": new_ids[new_rule[idx]],
+        "old_final_score": old_score[idx],
+        "new_final_score": new_score[idx],
+    }
+    return {"n_cases": len(old_primary), "transition": transition, "flipped": flipped}
+
+
+def _optional_column(cases, name, idx):
+    if name not in cases:
+        return np.full(len(idx), None, dtype=object)
+    return np.asarray(cases[name], dtype=object)[idx]
+
+
+def replay_chunks(chunks, old, new):
+    """
+    Replay arsip yang dibaca per potongan dan gabungkan hasilnya.
+
+    Args:
+        chunks: iterable tabel kasus (mis. hasil read_archive())
+        old, new: versi hasil load_version()
+
+    Returns:
+        dict seperti replay_cases() untuk seluruh arsip, ditambah label
+        versi old/new dan flipped berupa pandas DataFrame.
+    """
+    import pandas as pd
+
+    n_rec = len(REKOMENDASI)
+    transition = np.zeros((n_rec, n_rec), dtype=np.int64)
+    flipped = []
+    rows = 0
+    for chunk in chunks:
+        result = replay_cases(chunk, old, new, offset=rows)
+        transition += result["transition"]
+        flipped.append(pd.DataFrame(result["flipped"], columns=FLIP_COLUMNS))
+        rows += result["n_cases"]
+
+    return {
+        "old": old["label"],
+        "new": new["label"],
+        "n_cases": rows,
+        "transition": pd.DataFrame(transition, index=pd.Index(REKOMENDASI, name="lama"),
+                                   columns=pd.Index(REKOMENDASI, name="baru")),
+        "flipped": (pd.concat(flipped, ignore_index=True) if flipped
+                    else pd.DataFrame(columns=FLIP_COLUMNS)),
+    }
+
+# =============================================================================
+# BACA ARSIP
+# =============================================================================
+
+def read_archive(source, chunk_size=100_000):
+    """
+    Baca arsip JSONL per potongan. Tiap baris berupa export_data (dengan
+    field input_data) atau langsung record input_data.
+
+    Yields:
+        dict kolom INPUT_COLUMNS ditambah case_id dan timestamp.
+    """
+    records = []
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        records.append(json.loads(line))
+        if len(records) == chunk_size:
+            yield _to_columns(records)
+            records = []
+    if records:
+        yield _to_columns(records)
+
+
+def _to_columns(records):
+    inputs = [record.get("input_data") or record for record in records]
+    columns = {col: [data.get(col) for data in inputs] for col in INPUT_COLUMNS}
+    # case_id/timestamp berada di export_data, bukan di input_data
+    for col in ("case_id", "timestamp"):
+        columns[col] = [record.get(col) for record in records]
+    return columns
+
+
+def format_summary(result):
+    """Ringkasan teks: jumlah kasus berubah dan matriks transisi"""
+    n_flipped = len(result["flipped"])
+    share = n_flipped / result["n_cases"] * 100 if result["n_cases"] else 0.0
+    lines = [
+        f"Versi lama : {result['old']}",
+        f"Versi baru : {result['new']}",
+        f"Kasus      : {result['n_cases']:,}",
+        f"Berubah    : {n_flipped:,} ({share:.2f}%)",
+        "",
+        "Matriks transisi (baris = lama, kolom = baru):",
+        result["transition"].to_string(),
+    ]
+    return "\n".join(lines)
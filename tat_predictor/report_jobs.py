@@ -0,0 +1,228 @@
+"""
+Antrian render laporan di latar belakang dengan pembagian adil antar-sesi.
+
+Render PDF (doc.build) tidak lagi berjalan di thread script Streamlit:
+tugas dikirim ke sejumlah worker thread terbatas, dan UI cukup menampilkan
+progres sampai hasilnya siap. Antrian dipisah per sesi dan worker mengambil
+tugas secara round-robin antar-sesi, satu kasus per giliran, sehingga
+ekspor 500 kasus dari satu asesor tidak menahan unduhan satu kasus dari
+asesor lain: tugas sesi lain paling lama menunggu satu putaran.
+
+Jumlah worker diatur lewat TAT_REPORT_WORKERS (default 2).
+"""
+
+import itertools
+import os
+import threading
+from collections import OrderedDict, deque
+
+WORKERS_ENV = "TAT_REPORT_WORKERS"
+DEFAULT_WORKERS = 2
+
+# Batas total tugas yang menunggu di antrian (semua sesi)
+DEFAULT_MAX_PENDING = 5000
+
+
+class QueueFull(RuntimeError):
+    """Antrian laporan penuh; pengguna diminta mencoba lagi nanti"""
+
+
+class Job:
+    """
+    Satu permintaan render: satu laporan (submit) atau banyak laporan
+    (submit_batch). Status: "queued", "running", "done" atau "failed".
+    """
+
+    __slots__ = ("id", "session", "total", "completed", "status", "result", "error",
+                 "_results", "_finalize", "_event")
+
+    def __init__(self, job_id, session, total, finalize=None):
+        self.id = job_id
+        self.session = session
+        self.total = total
+        self.completed = 0
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self._results = [None] * total
+        self._finalize = finalize
+        self._event = threading.Event()
+
+    @property
+    def finished(self):
+        return self._event.is_set()
+
+    @property
+    def progress(self):
+        """Fraksi tugas selesai (0.0-1.0)"""
+        return self.completed / self.total if self.total else 1.0
+
+    def wait(self, timeout=None):
+        """Tunggu sampai selesai; True bila selesai sebelum timeout"""
+        return self._event.wait(timeout)
+
+
+class ReportWorkerPool:
+    """
+    Worker thread terbatas dengan antrian per sesi (round-robin).
+
+    Args:
+        workers: jumlah worker thread
+        max_pending: batas total tugas yang menunggu; submit melempar
+            QueueFull bila terlampaui
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queues = OrderedDict()  # sesi -> deque tugas (job, index, func, args)
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._threads = []
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Pengiriman tugas
+    # ------------------------------------------------------------------
+    def submit(self, session, func, *args):
+        """Satu tugas func(*args); Job.result berisi nilai kembaliannya"""
+        return self._enqueue(session, func, [args], finalize=lambda results: results[0])
+
+    def submit_batch(self, session, func, items, finalize=None):
+        """
+        Satu tugas func(item) per item, dijadwalkan satu per giliran.
+
+        Job.result berisi finalize(list hasil sesuai urutan items), atau
+        list itu sendiri bila finalize None. finalize dijalankan di worker.
+        """
+        return self._enqueue(session, func, [(item,) for item in items], finalize=finalize)
+
+    def _enqueue(self, session, func, args_list, finalize):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ReportWorkerPool sudah ditutup")
+            if self._pending + len(args_list) > self.max_pending:
+                raise QueueFull(f"Antrian laporan penuh ({self._pending} tugas menunggu)")
+
+            job = Job(next(self._ids), session, len(args_list), finalize)
+            if not args_list:
+                self._finish(job)
+                return job
+
+            queue = self._queues.get(session)
+            if queue is None:
+                queue = self._queues[session] = deque()
+            queue.extend((job, index, func, args) for index, args in enumerate(args_list))
+            self._pending += len(args_list)
+            self._start_workers()
+            self._cond.notify(len(args_list))
+        return job
+
+    def pending(self, session=None):
+        """Jumlah tugas yang menunggu (semua sesi, atau satu sesi)"""
+        with self._cond:
+            if session is None:
+                return self._pending
+            return len(self._queues.get(session, ()))
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _start_workers(self):
+        # Dipanggil dengan lock dipegang; worker dibuat saat tugas pertama
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"tat-report-{len(self._threads) + 1}",
+                                      daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        with self._cond:
+            while not self._queues and not self._closed:
+                self._cond.wait()
+            if not self._queues:
+                return None
+            # Round-robin: ambil dari sesi terdepan, lalu pindahkan ke belakang
+            session, queue = next(iter(self._queues.items()))
+            task = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            self._pending -= 1
+            return task
+
+    def _work(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            job, index, func, args = task
+            if job.status == "failed":
+                continue
+            job.status = "running"
+            try:
+                job._results[index] = func(*args)
+            except Exception as exc:
+                self._fail(job, exc)
+                continue
+
+            with self._cond:
+                if job.status == "failed":
+                    continue
+                job.completed += 1
+                last = job.completed == job.total
+            if last:
+                self._finish(job)
+
+    def _finish(self, job):
+        try:
+            results = job._results
+            job.result = job._finalize(results) if job._finalize else results
+        except Exception as exc:
+            self._fail(job, exc)
+            return
+        job._results = None
+        job.status = "done"
+        job._event.set()
+
+    def _fail(self, job, exc):
+        with self._cond:
+            if job.status == "failed":
+                return
+            job.status = "failed"
+            job.error = exc
+            # Tugas tersisa dari job yang gagal tidak perlu dijalankan
+            queue = self._queues.get(job.session)
+            if queue:
+                kept = deque(task for task in queue if task[0] is not job)
+                self._pending -= len(queue) - len(kept)
+                if kept:
+                    self._queues[job.session] = kept
+                else:
+                    del self._queues[job.session]
+        job._event.set()
+
+    def shutdown(self, wait=True):
+        """Hentikan worker setelah antrian habis"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    """Pool laporan proses yang dipakai bersama oleh semua sesi"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ReportWorkerPool(int(os.environ.get(WORKERS_ENV) or DEFAULT_WORKERS))
+    return _pool
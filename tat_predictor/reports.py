@@ -0,0 +1,332 @@
+"""
+Pembuatan laporan TXT dan PDF hasil analisis TAT.
+
+reportlab baru diimpor ketika generate_pdf_report dipanggil, sehingga
+modul ini ringan untuk diimpor oleh worker yang hanya butuh laporan TXT.
+
+generate_pdf_report adalah jalur fidelitas penuh (layout platypus); untuk
+cetak massal lihat pdf_fast.generate_pdf_report_fast.
+"""
+
+import functools
+import hashlib
+import json
+from io import BytesIO
+
+
+# =============================================================================
+# FINGERPRINT KONTEN LAPORAN
+# =============================================================================
+
+def export_digest(export_data):
+    """
+    Hash SHA-256 dari isi export_data (JSON kanonik, key terurut).
+
+    Dipakai sebagai kunci memoization laporan: isi yang sama selalu
+    menghasilkan digest yang sama, terlepas dari urutan key dict.
+    """
+    canonical = json.dumps(export_data, sort_keys=True, ensure_ascii=False,
+                           separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# FUNGSI GENERATE PDF
+# =============================================================================
+
+def _safe_add_style(styles, style_obj):
+    """
+    Mencegah KeyError pada ReportLab ketika nama style sudah ada di stylesheet.
+    - Jika sudah ada, return style yang existing.
+    - Jika belum ada, add dan return.
+    """
+    name = getattr(style_obj, "name", None)
+    if not name:
+        return style_obj
+    if name in styles.byName:
+        return styles.byName[name]
+    styles.add(style_obj)
+    return styles.byName[name]
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_styles():
+    """
+    Paragraph style dan TableStyle laporan PDF, dibangun sekali per proses.
+
+    Style hanya dibaca saat layout, sehingga aman dipakai ulang oleh setiap
+    laporan (termasuk di tiap worker render massal).
+    """
+    # reportlab hanya dimuat saat PDF benar-benar diminta
+    from reportlab.platypus import TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+    styles = getSampleStyleSheet()
+
+    # Pakai NAMA CUSTOM supaya tidak bentrok dengan bawaan ('Title', 'Heading1', dst)
+    style_center = _safe_add_style(
+        styles,
+        ParagraphStyle(name="TAT_Center", parent=styles["Normal"], alignment=TA_CENTER)
+    )
+    style_left = _safe_add_style(
+        styles,
+        ParagraphStyle(name="TAT_Left", parent=styles["Normal"], alignment=TA_LEFT)
+    )
+    style_title = _safe_add_style(
+        styles,
+        ParagraphStyle(
+            name="TAT_Title",
+            parent=styles["Title"],
+            fontSize=16,
+            alignment=TA_CENTER,
+            spaceAfter=20
+        )
+    )
+    style_h1 = _safe_add_style(
+        styles,
+        ParagraphStyle(
+            name="TAT_H1",
+            parent=styles["Heading1"],
+            fontSize=14,
+            alignment=TA_LEFT,
+            spaceAfter=12
+        )
+    )
+    style_h2 = _safe_add_style(
+        styles,
+        ParagraphStyle(
+            name="TAT_H2",
+            parent=styles["Heading2"],
+            fontSize=12,
+            alignment=TA_LEFT,
+            spaceAfter=8
+        )
+    )
+
+    summary_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    medis_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    hukum_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgreen),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    prob_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+    return {
+        "center": style_center,
+        "left": style_left,
+        "title": style_title,
+        "h1": style_h1,
+        "h2": style_h2,
+        "summary_table": summary_style,
+        "medis_table": medis_style,
+        "hukum_table": hukum_style,
+        "prob_table": prob_style,
+    }
+
+
+def _pdf_document(buffer, page_compression=None):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=72, leftMargin=72,
+        topMargin=72, bottomMargin=72,
+        pageCompression=page_compression
+    )
+
+
+def _pdf_elements(export_data):
+    """Flowables laporan PDF untuk satu kasus"""
+    from reportlab.platypus import Paragraph, Spacer, Table
+    from reportlab.lib.units import inch
+
+    styles = _pdf_styles()
+    style_center = styles["center"]
+    style_left = styles["left"]
+    style_h1 = styles["h1"]
+    style_h2 = styles["h2"]
+
+    elements = []
+
+    # Title
+    elements.append(Paragraph("LAPORAN ANALISIS TAT - BNN", styles["title"]))
+    elements.append(Paragraph(f"Waktu Analisis: {export_data.get('timestamp', '-')}", style_center))
+    elements.append(Spacer(1, 20))
+
+    # Summary Section
+    elements.append(Paragraph("RINGKASAN HASIL", style_h1))
+
+    summary_data = [
+        ["Parameter", "Nilai"],
+        ["Skor Asesmen Medis", f"{export_data.get('skor_medis', 0)}/100"],
+        ["Skor Asesmen Hukum", f"{export_data.get('skor_hukum', 0)}/100"],
+        ["Composite Score", f"{float(export_data.get('final_score', 0.0)):.1f}/100"],
+        ["Rekomendasi Utama", export_data.get("rekomendasi_utama", "-")],
+        ["Tingkat Keyakinan", f"{float(export_data.get('confidence', 0.0)):.1f}%"],
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2.5 * inch, 2.5 * inch])
+    summary_table.setStyle(styles["summary_table"])
+    elements.append(summary_table)
+    elements.append(Spacer(1, 20))
+
+    # Breakdown Medis
+    elements.append(Paragraph("BREAKDOWN ASESMEN MEDIS", style_h1))
+    medis_data = [["Kategori", "Skor", "Detail"]]
+    for kategori, data in (export_data.get("breakdown_medis", {}) or {}).items():
+        medis_data.append([
+            str(kategori),
+            f"{data.get('skor', 0)}/{data.get('max', 0)}",
+            str(data.get('detail', ''))
+        ])
+
+    medis_table = Table(medis_data, colWidths=[1.5 * inch, 1 * inch, 3 * inch])
+    medis_table.setStyle(styles["medis_table"])
+    elements.append(medis_table)
+    elements.append(Spacer(1, 20))
+
+    # Breakdown Hukum
+    elements.append(Paragraph("BREAKDOWN ASESMEN HUKUM", style_h1))
+    hukum_data = [["Kategori", "Skor", "Detail"]]
+    for kategori, data in (export_data.get("breakdown_hukum", {}) or {}).items():
+        hukum_data.append([
+            str(kategori),
+            f"{data.get('skor', 0)}/{data.get('max', 0)}",
+            str(data.get('detail', ''))
+        ])
+
+    hukum_table = Table(hukum_data, colWidths=[1.5 * inch, 1 * inch, 3 * inch])
+    hukum_table.setStyle(styles["hukum_table"])
+    elements.append(hukum_table)
+    elements.append(Spacer(1, 20))
+
+    # Probabilities
+    elements.append(Paragraph("DISTRIBUSI PROBABILITAS", style_h1))
+    prob_data = [["Rekomendasi", "Probabilitas (%)", "Status"]]
+    rekom_utama = export_data.get("rekomendasi_utama", "")
+    for rec, prob in (export_data.get("probabilities", {}) or {}).items():
+        status = "PRIMARY" if rec == rekom_utama else "ALTERNATIVE"
+        prob_data.append([str(rec), f"{float(prob):.1f}%", status])
+
+    prob_table = Table(prob_data, colWidths=[2 * inch, 1.5 * inch, 1.5 * inch])
+    prob_table.setStyle(styles["prob_table"])
+    elements.append(prob_table)
+    elements.append(Spacer(1, 20))
+
+    # Reasoning
+    elements.append(Paragraph("ALASAN DAN PERTIMBANGAN", style_h1))
+    for reason in (export_data.get("reasoning", []) or []):
+        elements.append(Paragraph(f"• {reason}", style_left))
+
+    elements.append(Spacer(1, 20))
+
+    # Footer
+    elements.append(Paragraph("CATATAN PENTING:", style_h2))
+    elements.append(Paragraph("Sistem ini adalah ALAT BANTU untuk proses asesmen.", style_left))
+    elements.append(Paragraph("Keputusan final tetap berada di tangan Tim Asesmen Terpadu BNN.", style_left))
+    elements.append(Paragraph(
+        f"Dokumen ini dihasilkan oleh Sistem Prediksi TAT BNN pada {export_data.get('timestamp', '-')}",
+        style_center
+    ))
+
+    return elements
+
+
+def generate_pdf_report(export_data, page_compression=None):
+    """
+    Generate PDF report from analysis data (fix: avoid duplicate style names)
+
+    page_compression=0 menulis content stream tanpa kompresi, sehingga teks
+    dapat ditambal langsung pada byte PDF (dipakai result_cache).
+    """
+    buffer = BytesIO()
+
+    doc = _pdf_document(buffer, page_compression)
+    doc.build(_pdf_elements(export_data))
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def generate_txt_report(export_data):
+    """Generate TXT report from analysis data"""
+    txt_content = []
+    txt_content.append("=" * 60)
+    txt_content.append("LAPORAN ANALISIS TAT - BADAN NARKOTIKA NASIONAL")
+    txt_content.append("=" * 60)
+    txt_content.append(f"Waktu Analisis: {export_data['timestamp']}")
+    txt_content.append("")
+
+    # Summary
+    txt_content.append("RINGKASAN HASIL")
+    txt_content.append("-" * 40)
+    txt_content.append(f"Skor Asesmen Medis: {export_data['skor_medis']}/100")
+    txt_content.append(f"Skor Asesmen Hukum: {export_data['skor_hukum']}/100")
+    txt_content.append(f"Composite Score: {export_data['final_score']:.1f}/100")
+    txt_content.append(f"Rekomendasi Utama: {export_data['rekomendasi_utama']}")
+    txt_content.append(f"Tingkat Keyakinan: {export_data['confidence']:.1f}%")
+    txt_content.append("")
+
+    # Breakdown Medis
+    txt_content.append("BREAKDOWN ASESMEN MEDIS")
+    txt_content.append("-" * 40)
+    for kategori, data in export_data['breakdown_medis'].items():
+        txt_content.append(f"{kategori}: {data['skor']}/{data['max']} - {data['detail']}")
+    txt_content.append("")
+
+    # Breakdown Hukum
+    txt_content.append("BREAKDOWN ASESMEN HUKUM")
+    txt_content.append("-" * 40)
+    for kategori, data in export_data['breakdown_hukum'].items():
+        txt_content.append(f"{kategori}: {data['skor']}/{data['max']} - {data['detail']}")
+    txt_content.append("")
+
+    # Probabilities
+    txt_content.append("DISTRIBUSI PROBABILITAS")
+    txt_content.append("-" * 40)
+    for rec, prob in export_data['probabilities'].items():
+        status = " (PRIMARY)" if rec == export_data['rekomendasi_utama'] else ""
+        txt_content.append(f"{rec}: {prob:.1f}%{status}")
+    txt_content.append("")
+
+    # Reasoning
+    txt_content.append("ALASAN DAN PERTIMBANGAN")
+    txt_content.append("-" * 40)
+    for reason in export_data['reasoning']:
+        txt_content.append(f"• {reason}")
+    txt_content.append("")
+
+    # Footer
+    txt_content.append("=" * 60)
+    txt_content.append("CATATAN PENTING:")
+    txt_content.append("- Sistem ini adalah ALAT BANTU untuk proses asesmen.")
+    txt_content.append("- Keputusan final tetap berada di tangan Tim Asesmen Terpadu BNN.")
+    txt_content.append("=" * 60)
+
+    return "\n".join(txt_content)
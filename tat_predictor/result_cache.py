@@ -0,0 +1,353 @@
+"""
+Cache hasil analisis dan laporan berbasis hash isi, dipakai bersama oleh
+seluruh sesi dalam satu proses.
+
+Banyak asesor memasukkan kombinasi input yang sama (mis. profil pemakai
+pertama kali). Hasil skor disimpan dengan kunci hash kanonik field input
+skoring saja (tanpa identitas seperti nama_inisial/usia, ditambah digest
+decision rules aktif), sehingga kasus dengan input skoring sama berbagi
+satu entri. Laporan TXT/PDF disimpan dengan kunci hash isi export_data
+tanpa timestamp. Laporan dirender sekali dengan timestamp placeholder;
+timestamp asli ditambal langsung ke byte laporan saat diambil, tanpa
+merender ulang. Content stream PDF yang tidak memuat timestamp disimpan
+terkompresi, dan stream sisanya dikompresi setelah ditambal, sehingga PDF
+yang disajikan tetap terkompresi.
+
+- LRU dengan batas total byte (TAT_CACHE_MAX_BYTES, default 64 MB)
+- Tier disk opsional (TAT_CACHE_DIR), dengan batas TAT_CACHE_DISK_MAX_BYTES
+- Aman dipakai dari banyak thread (sesi Streamlit) lewat satu lock
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+from tat_predictor import rule_engine
+
+CACHE_MAX_BYTES_ENV = "TAT_CACHE_MAX_BYTES"
+CACHE_DIR_ENV = "TAT_CACHE_DIR"
+CACHE_DISK_MAX_BYTES_ENV = "TAT_CACHE_DISK_MAX_BYTES"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+# Timestamp placeholder: panjang dan lebar glyph sama dengan format
+# "%Y-%m-%d %H:%M:%S", sehingga layout PDF dan offset xref tidak berubah
+TIMESTAMP_PLACEHOLDER = "9999-12-31 23:59:59"
+
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+# Jumlah kemunculan timestamp pada tiap jenis laporan (judul dan footer PDF);
+# "pdf_fast" = PDF jalur cepat (pdf_fast), di-cache terpisah dari PDF platypus
+_TIMESTAMP_COUNT = {"txt": 1, "pdf": 2, "pdf_fast": 2}
+
+# Field input_data yang dibaca fungsi skor (sama dengan batch.INPUT_COLUMNS;
+# batch tidak diimpor di sini karena menarik numpy)
+_SCORING_FIELDS = ("zat_positif", "dsm5_count", "durasi_bulan", "fungsi_sosial", "ada_komorbid",
+                   "tingkat_komorbid", "peran", "barang_bukti", "jenis_narkotika",
+                   "status_tangkap", "riwayat_pidana")
+
+# Content stream PDF tanpa filter (render dengan page_compression=0)
+_PLAIN_STREAM_RE = re.compile(rb"<<\s*/Length (\d+)\s*>>\s*stream\r?\n")
+_XREF_ENTRY_RE = re.compile(rb"(?m)^(\d{10}) (\d{5}) n")
+_STARTXREF_RE = re.compile(rb"startxref\s+\d+")
+
+_RESULT_KEYS = ["skor_medis", "skor_hukum", "breakdown_medis", "breakdown_hukum",
+                "probabilities", "reasoning", "primary_rec", "final_score"]
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                      default=str).encode("utf-8")
+
+
+def input_key(input_data, ruleset=None):
+    """Kunci hasil: hash kanonik field input skoring dan digest decision rules"""
+    ruleset = ruleset or rule_engine.active_ruleset()
+    digest = hashlib.sha256(_canonical({name: input_data.get(name) for name in _SCORING_FIELDS}))
+    digest.update(ruleset.digest.encode("ascii"))
+    return digest.hexdigest()
+
+
+def report_key(export_data):
+    """Kunci laporan: hash isi export_data tanpa timestamp"""
+    return hashlib.sha256(_canonical({**export_data, "timestamp": None})).hexdigest()
+
+
+def _compress_pdf_streams(pdf, keep=None):
+    """
+    Kompresi (FlateDecode) content stream PDF yang belum berfilter, lalu
+    geser offset tabel xref dan startxref sesuai perubahan panjang.
+
+    Args:
+        pdf: bytes PDF dengan xref klasik (keluaran reportlab/pdf_fast)
+        keep: bila diisi, stream yang memuat bytes ini dibiarkan tanpa
+            kompresi (agar masih dapat ditambal)
+    """
+    parts = []
+    shifts = []  # (offset lama, selisih panjang) per stream yang dikompresi
+    pos = 0
+    for match in _PLAIN_STREAM_RE.finditer(pdf):
+        if match.start() < pos:
+            continue  # kebetulan cocok di dalam data stream sebelumnya
+        start = match.end()
+        end = start + int(match.group(1))
+        data = pdf[start:end]
+        if keep is not None and keep in data:
+            continue
+        packed = zlib.compress(data)
+        header = b"<< /Filter /FlateDecode /Length %d >>\nstream\n" % len(packed)
+        parts += [pdf[pos:match.start()], header, packed]
+        shifts.append((match.start(), len(header) + len(packed) - (end - match.start())))
+        pos = end
+    if not shifts:
+        return pdf
+    parts.append(pdf[pos:])
+    pdf = b"".join(parts)
+
+    def moved(offset):
+        return offset + sum(delta for at, delta in shifts if at < offset)
+
+    # Entri xref berlebar tetap, sehingga posisi tabel tidak ikut bergeser
+    xref = pdf.rindex(b"\nxref") + 1
+    trailer = pdf.index(b"trailer", xref)
+    table = _XREF_ENTRY_RE.sub(lambda m: b"%010d %s n" % (moved(int(m.group(1))), m.group(2)),
+                               pdf[xref:trailer])
+    tail = _STARTXREF_RE.sub(b"startxref\n%d" % xref, pdf[trailer:], count=1)
+    return pdf[:xref] + table + tail
+
+
+class ResultCache:
+    """
+    Cache LRU dengan batas byte dan tier disk opsional.
+
+    Entri berupa (kunci, jenis): jenis "result" (dict hasil analisis tanpa
+    timestamp/input_data, disimpan sebagai JSON) atau "txt"/"pdf"/"pdf_fast" (bytes
+    laporan dengan timestamp placeholder). Nilai yang dikembalikan selalu
+    salinan baru, sehingga aman dimodifikasi pemanggil.
+
+    Args:
+        max_bytes: batas total ukuran entri di memori
+        disk_dir: direktori tier disk (None = tanpa tier disk)
+        disk_max_bytes: batas total ukuran file di tier disk
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None, disk_max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    # ------------------------------------------------------------------
+    # Tier memori
+    # ------------------------------------------------------------------
+    def _get(self, key, kind):
+        entry_key = (key, kind)
+        with self._lock:
+            data = self._entries.get(entry_key)
+            if data is not None:
+                self._entries.move_to_end(entry_key)
+                self.stats["hits"] += 1
+                return data
+
+        data = self._disk_read(key, kind)
+        with self._lock:
+            if data is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._insert(entry_key, data)
+        return data
+
+    def _put(self, key, kind, data):
+        with self._lock:
+            self._insert((key, kind), data)
+        self._disk_write(key, kind, data)
+
+    def _insert(self, entry_key, data):
+        # Dipanggil dengan lock dipegang
+        old = self._entries.pop(entry_key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(data) > self.max_bytes:
+            return
+        self._entries[entry_key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ------------------------------------------------------------------
+    # Tier disk
+    # ------------------------------------------------------------------
+    def _disk_path(self, key, kind):
+        return os.path.join(self.disk_dir, f"{key}.{kind}")
+
+    def _disk_files(self):
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _disk_read(self, key, kind):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key, kind)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            # mtime menjadi waktu akses terakhir untuk pembuangan LRU di disk
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _disk_write(self, key, kind, data):
+        if not self.disk_dir or len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key, kind)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes += len(data)
+            if self._disk_bytes <= self.disk_max_bytes:
+                return
+            # Buang file tertua sampai di bawah batas (dihitung ulang dari
+            # direktori, karena proses lain dapat berbagi tier disk yang sama)
+            files = sorted(self._disk_files(), key=lambda f: f[2])
+            self._disk_bytes = sum(size for _, size, _ in files)
+            for file_path, size, _ in files:
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    continue
+                self._disk_bytes -= size
+
+    # ------------------------------------------------------------------
+    # Hasil analisis
+    # ------------------------------------------------------------------
+    def get_result(self, input_data, timestamp):
+        """
+        Hasil analisis untuk input_data (format session_state['results'])
+        dengan timestamp dan input_data diisi, atau None bila belum ada.
+        """
+        data = self._get(input_key(input_data), "result")
+        if data is None:
+            return None
+        return {**json.loads(data), "timestamp": timestamp, "input_data": input_data}
+
+    def put_result(self, input_data, result):
+        """Simpan bagian hasil yang hanya bergantung pada input_data"""
+        # Tanpa sort_keys: urutan probabilities/breakdown ikut dipertahankan
+        data = json.dumps({k: result[k] for k in _RESULT_KEYS}, ensure_ascii=False, separators=(",", ":"))
+        self._put(input_key(input_data), "result", data.encode("utf-8"))
+
+    # ------------------------------------------------------------------
+    # Laporan
+    # ------------------------------------------------------------------
+    def cached_report(self, kind, export_data):
+        """Bytes laporan bila sudah ada di cache (tanpa render), atau None"""
+        timestamp = str(export_data.get("timestamp", ""))
+        if not _TIMESTAMP_RE.fullmatch(timestamp):
+            return None
+        template = self._get(report_key(export_data), kind)
+        if template is None:
+            return None
+        return _fill(kind, template, timestamp)
+
+    def report(self, kind, export_data, render):
+        """
+        Bytes laporan ("txt", "pdf" atau "pdf_fast") untuk export_data.
+
+        Args:
+            kind: "txt", "pdf" atau "pdf_fast"
+            export_data: isi laporan
+            render: fungsi render laporan; dipanggil dengan export_data
+                bertimestamp placeholder, dan untuk PDF dengan
+                page_compression=0 agar timestamp dapat ditambal
+
+        Template PDF disimpan dengan stream tanpa timestamp terkompresi;
+        stream bertimestamp dikompresi setelah ditambal. Bila timestamp
+        tidak berformat standar atau placeholder tidak ditemukan tepat di
+        posisi yang diharapkan, laporan dirender langsung tanpa cache.
+        """
+        timestamp = str(export_data.get("timestamp", ""))
+        if not _TIMESTAMP_RE.fullmatch(timestamp):
+            return _encode(render(export_data))
+
+        key = report_key(export_data)
+        template = self._get(key, kind)
+        if template is None:
+            template_data = {**export_data, "timestamp": TIMESTAMP_PLACEHOLDER}
+            if kind != "txt":
+                template = render(template_data, page_compression=0)
+            else:
+                template = _encode(render(template_data))
+            if template.count(TIMESTAMP_PLACEHOLDER.encode("ascii")) != _TIMESTAMP_COUNT[kind]:
+                return _encode(render(export_data))
+            if kind != "txt":
+                template = _compress_pdf_streams(template, keep=TIMESTAMP_PLACEHOLDER.encode("ascii"))
+            self._put(key, kind, template)
+
+        return _fill(kind, template, timestamp)
+
+
+def _fill(kind, template, timestamp):
+    """Tambal timestamp ke template; PDF dikompresi setelah ditambal"""
+    report = template.replace(TIMESTAMP_PLACEHOLDER.encode("ascii"), timestamp.encode("ascii"))
+    return report if kind == "txt" else _compress_pdf_streams(report)
+
+
+def _encode(report):
+    return report.encode("utf-8") if isinstance(report, str) else report
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def shared_cache():
+    """Cache proses yang dipakai bersama, dikonfigurasi dari environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(
+                    max_bytes=int(os.environ.get(CACHE_MAX_BYTES_ENV) or DEFAULT_MAX_BYTES),
+                    disk_dir=os.environ.get(CACHE_DIR_ENV) or None,
+                    disk_max_bytes=int(os.environ.get(CACHE_DISK_MAX_BYTES_ENV) or DEFAULT_DISK_MAX_BYTES),
+                )
+    return _cache
@@ -0,0 +1,435 @@
+"""
+Rule engine deklaratif untuk decision rules TAT.
+
+Aturan (ambang batas, bobot, probabilitas dan alasan) disimpan di file
+JSON berversi, default data/rules_v1.json. Saat dimuat, aturan divalidasi
+lalu dikompilasi menjadi:
+- fungsi Python berupa rantai if/elif hasil generate, untuk satu kasus;
+- evaluasi mask NumPy, untuk array (batch/replay).
+
+Versi aturan baru baru menggantikan versi aktif setelah lolos validasi
+(termasuk kasus uji di bagian "tests" file aturan). Selama proses itu,
+dan bila validasi gagal, versi sebelumnya tetap dipakai.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+
+from tat_predictor import scoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "rules_v1.json")
+
+# Env var untuk memakai file aturan lain tanpa mengubah kode
+RULES_PATH_ENV = "TAT_RULES_PATH"
+
+# Variabel yang dapat dipakai di kondisi: nama -> (breakdown, kategori)
+VARIABLES = {
+    "skor_medis": None,
+    "skor_hukum": None,
+    "tes_urine": ("medis", "Tes Urine"),
+    "tingkat_kecanduan": ("medis", "Tingkat Kecanduan"),
+    "durasi_penggunaan": ("medis", "Durasi Penggunaan"),
+    "fungsi_sosial": ("medis", "Fungsi Sosial"),
+    "komorbid": ("medis", "Komorbid"),
+    "keterlibatan_jaringan": ("hukum", "Keterlibatan Jaringan"),
+    "barang_bukti": ("hukum", "Barang Bukti"),
+    "status_penangkapan": ("hukum", "Status Penangkapan"),
+    "riwayat_pidana": ("hukum", "Riwayat Pidana"),
+}
+
+_OPERATORS = {"<", "<=", ">", ">=", "==", "!="}
+
+
+class RuleSetError(ValueError):
+    """File aturan tidak valid atau gagal divalidasi"""
+
+
+# =============================================================================
+# KOMPILASI KONDISI
+# =============================================================================
+
+def _is_number(value):
+    # json.loads menerima NaN/Infinity; keduanya tidak sah sebagai ambang/bobot
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _entries(spec, key):
+    """List objek di bawah `key` (boleh tidak ada); RuleSetError bila bentuknya salah"""
+    entries = spec.get(key, [])
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        raise RuleSetError(f"'{key}' harus berupa list objek")
+    return entries
+
+
+def _reasoning(entry, path):
+    reasoning = entry.get("reasoning", [])
+    if not isinstance(reasoning, list) or not all(isinstance(r, str) for r in reasoning):
+        raise RuleSetError(f"{path}: 'reasoning' harus berupa list teks")
+    return tuple(reasoning)
+
+
+def _operand_source(operand, path, used):
+    if _is_number(operand):
+        return repr(operand)
+    if isinstance(operand, dict) and set(operand) <= {"var", "times"} and "var" in operand:
+        var = operand["var"]
+        if var not in VARIABLES:
+            raise RuleSetError(f"{path}: variabel tidak dikenal: {var!r}")
+        used.add(var)
+        if "times" not in operand:
+            return var
+        if not _is_number(operand["times"]):
+            raise RuleSetError(f"{path}: 'times' harus berupa angka")
+        return f"({var} * {operand['times']!r})"
+    raise RuleSetError(f"{path}: operand tidak valid: {operand!r}")
+
+
+def _condition_source(cond, path, used, array_mode):
+    """Sumber ekspresi Python untuk satu kondisi (skalar atau mask NumPy)"""
+    and_op, or_op = (" & ", " | ") if array_mode else (" and ", " or ")
+
+    if isinstance(cond, dict) and len(cond) == 1 and ("any" in cond or "all" in cond):
+        key = next(iter(cond))
+        if not isinstance(cond[key], list):
+            raise RuleSetError(f"{path}.{key}: harus berupa list kondisi")
+        parts = [_condition_source(c, f"{path}.{key}[{i}]", used, array_mode)
+                 for i, c in enumerate(cond[key])]
+        if not parts:
+            return "_false" if key == "any" else "_true"
+        return "(" + (or_op if key == "any" else and_op).join(parts) + ")"
+
+    if isinstance(cond, list) and len(cond) == 3:
+        var, op, operand = cond
+        if var not in VARIABLES:
+            raise RuleSetError(f"{path}: variabel tidak dikenal: {var!r}")
+        if op not in _OPERATORS:
+            raise RuleSetError(f"{path}: operator tidak dikenal: {op!r}")
+        used.add(var)
+        return f"({var} {op} {_operand_source(operand, path, used)})"
+
+    raise RuleSetError(f"{path}: kondisi tidak valid: {cond!r}")
+
+
+def _when_source(when, path, used, array_mode):
+    if not isinstance(when, list):
+        raise RuleSetError(f"{path}: 'when' harus berupa list kondisi")
+    return _condition_source({"all": when}, path, used, array_mode)
+
+
+# =============================================================================
+# RULE SET
+# =============================================================================
+
+class RuleSet:
+    """
+    Satu versi decision rules yang sudah dikompilasi.
+
+    Atribut utama: version, digest (SHA-256 isi file), rule_ids,
+    rule_primary (indeks REKOMENDASI per aturan), weights, note_ids dan
+    messages (kode alasan -> baris teks alasan).
+
+    Kode alasan satu kasus adalah id aturan yang cocok diikuti id catatan
+    yang aktif; teksnya baru dibentuk oleh render_reasoning().
+    """
+
+    def __init__(self, spec, digest="", path=None):
+        self.spec = spec
+        self.digest = digest
+        self.path = path
+        try:
+            self._compile(spec)
+            self.validate()
+        except RuleSetError:
+            raise
+        except Exception as exc:
+            # Bentuk file yang tidak terduga tetap berupa RuleSetError, agar
+            # pemanggil (hot reload) dapat mempertahankan versi lama
+            raise RuleSetError(f"File aturan tidak valid: {exc!r}") from exc
+
+    # ------------------------------------------------------------------
+    def _compile(self, spec):
+        if not isinstance(spec, dict):
+            raise RuleSetError("File aturan harus berupa objek JSON")
+        self.version = str(spec.get("version", ""))
+        if not self.version:
+            raise RuleSetError("'version' wajib diisi")
+
+        weights = spec.get("weights", {})
+        if not isinstance(weights, dict) or set(weights) != {"skor_medis", "skor_hukum"} or not all(map(_is_number, weights.values())):
+            raise RuleSetError("'weights' harus berisi angka skor_medis dan skor_hukum")
+        self.weights = (weights["skor_medis"], weights["skor_hukum"])
+
+        rules = spec.get("rules")
+        if not isinstance(rules, list) or not rules or not all(isinstance(r, dict) for r in rules):
+            raise RuleSetError("'rules' harus berupa list objek yang tidak kosong")
+        if rules[-1].get("when"):
+            raise RuleSetError("Aturan terakhir harus tanpa kondisi (catch-all)")
+
+        used = set()
+        scalar_conds, array_conds = [], []
+        self.rule_ids, self.rule_primary, self._rule_outcomes = [], [], []
+        for i, rule in enumerate(rules):
+            path = f"rules[{i}]"
+            rule_id = rule.get("id")
+            if not isinstance(rule_id, str) or not rule_id or rule_id in self.rule_ids:
+                raise RuleSetError(f"{path}: 'id' harus unik dan tidak kosong")
+            if rule.get("recommendation") not in scoring.REKOMENDASI:
+                raise RuleSetError(f"{path}: rekomendasi tidak dikenal: {rule.get('recommendation')!r}")
+            probability = rule.get("probability")
+            if not _is_number(probability) or not 0 <= probability <= 100:
+                raise RuleSetError(f"{path}: 'probability' harus angka 0-100")
+            reasoning = _reasoning(rule, path)
+
+            scalar_conds.append(_when_source(rule.get("when", []), path, used, array_mode=False))
+            array_conds.append(_when_source(rule.get("when", []), path, used, array_mode=True))
+            self.rule_ids.append(rule_id)
+            self.rule_primary.append(scoring.REKOMENDASI.index(rule["recommendation"]))
+            self._rule_outcomes.append((
+                tuple(_distribute(rule["recommendation"], probability).items()),
+                reasoning,
+                rule["recommendation"],
+            ))
+
+        note_scalar, note_array, self._note_reasoning, self.note_ids = [], [], [], []
+        for i, note in enumerate(_entries(spec, "notes")):
+            path = f"notes[{i}]"
+            note_id = note.get("id") or path
+            if not isinstance(note_id, str) or note_id in self.rule_ids or note_id in self.note_ids:
+                raise RuleSetError(f"{path}: 'id' harus teks yang unik")
+            reasoning = _reasoning(note, path)
+            note_scalar.append(_when_source(note.get("when", []), path, used, array_mode=False))
+            note_array.append(_when_source(note.get("when", []), path, used, array_mode=True))
+            self.note_ids.append(note_id)
+            self._note_reasoning.append(reasoning)
+
+        self.messages = dict(zip(self.rule_ids, (outcome[1] for outcome in self._rule_outcomes)))
+        self.messages.update(zip(self.note_ids, self._note_reasoning))
+
+        self.variables = [v for v in VARIABLES if v in used]
+        self._decide = self._build_scalar(scalar_conds, note_scalar)
+        self._array_sources = (array_conds, note_array)
+
+    def _build_scalar(self, conds, notes):
+        """Generate rantai if/elif dari kondisi aturan lalu compile ke fungsi"""
+        lines = ["def _decide(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum):"]
+        for var in self.variables:
+            source = VARIABLES[var]
+            if source is not None:
+                lines.append(f"    {var} = breakdown_{source[0]}[{source[1]!r}]['skor']")
+        for i, cond in enumerate(conds):
+            keyword = "if" if i == 0 else "elif"
+            lines.append(f"    {keyword} {cond}:")
+            lines.append(f"        rule = {i}")
+        lines.append("    notes = 0")
+        for i, cond in enumerate(notes):
+            lines.append(f"    if {cond}:")
+            lines.append(f"        notes |= {1 << i}")
+        lines.append("    return rule, notes")
+
+        namespace = {"__builtins__": {}, "_true": True, "_false": False}
+        exec(compile("\n".join(lines), f"<rules {self.version}>", "exec"), namespace)
+        return namespace["_decide"]
+
+    # ------------------------------------------------------------------
+    def decide(self, skor_medis, skor_hukum, breakdown_medis, breakdown_hukum):
+        """(indeks aturan, bitmask catatan) untuk satu kasus"""
+        return self._decide(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+
+    def evaluate(self, skor_medis, skor_hukum, breakdown_medis, breakdown_hukum):
+        """Setara apply_decision_rules: (probabilities, reasoning, primary, final_score)"""
+        rule, notes = self._decide(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+        probabilities, reasoning, primary = self._rule_outcomes[rule]
+        reasoning = list(reasoning)
+        for i, note_reasoning in enumerate(self._note_reasoning):
+            if notes >> i & 1:
+                reasoning.extend(note_reasoning)
+        final_score = (skor_medis * self.weights[0]) + (skor_hukum * self.weights[1])
+        return dict(probabilities), reasoning, primary, final_score
+
+    def evaluate_codes(self, skor_medis, skor_hukum, breakdown_medis, breakdown_hukum):
+        """Seperti evaluate, dengan tuple kode alasan sebagai ganti teks reasoning"""
+        rule, notes = self._decide(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+        probabilities, _, primary = self._rule_outcomes[rule]
+        final_score = (skor_medis * self.weights[0]) + (skor_hukum * self.weights[1])
+        return dict(probabilities), self.reason_codes(rule, notes), primary, final_score
+
+    def reason_codes(self, rule, notes):
+        """Tuple kode alasan dari indeks aturan dan bitmask catatan"""
+        codes = (self.rule_ids[rule],)
+        if notes:
+            codes += tuple(note_id for i, note_id in enumerate(self.note_ids) if notes >> i & 1)
+        return codes
+
+    def render_reasoning(self, codes):
+        """List teks reasoning dari tuple kode alasan (sama dengan hasil evaluate)"""
+        return [line for code in codes for line in self.messages[code]]
+
+    def evaluate_arrays(self, values):
+        """
+        Evaluasi tervektorisasi.
+
+        Args:
+            values: dict nama variabel -> array NumPy (semua variabel di
+                `self.variables`)
+
+        Returns:
+            (indeks aturan per baris, bitmask catatan per baris)
+        """
+        import numpy as np
+
+        n = len(values["skor_medis"])
+        namespace = {"_true": np.ones(n, dtype=bool), "_false": np.zeros(n, dtype=bool)}
+        namespace.update({var: values[var] for var in self.variables})
+
+        conds, notes = self._array_sources
+        masks = [eval(c, {"__builtins__": {}}, namespace) for c in conds[:-1]]
+        rule = np.select(masks, list(range(len(masks))), default=len(conds) - 1).astype(np.int16)
+
+        note_mask = np.zeros(n, dtype=np.int32)
+        for i, cond in enumerate(notes):
+            note_mask |= eval(cond, {"__builtins__": {}}, namespace).astype(np.int32) << i
+        return rule, note_mask
+
+    def probability_matrix(self):
+        """Matriks probabilitas per aturan (jumlah aturan x len(REKOMENDASI))"""
+        return [[p for _, p in outcome[0]] for outcome in self._rule_outcomes]
+
+    # ------------------------------------------------------------------
+    def validate(self):
+        """
+        Jalankan kasus uji dari file aturan, lalu cocokkan evaluasi skalar
+        dengan evaluasi array pada sampel acak (bila NumPy tersedia).
+        """
+        samples = []
+        for i, test in enumerate(_entries(self.spec, "tests")):
+            missing = [v for v in self.variables if v not in test]
+            if missing or test.get("expect") not in self.rule_ids:
+                raise RuleSetError(f"tests[{i}]: variabel {missing} atau 'expect' tidak valid")
+            rule, _ = self._decide_values(test)
+            if self.rule_ids[rule] != test["expect"]:
+                raise RuleSetError(f"tests[{i}]: hasil {self.rule_ids[rule]}, seharusnya {test['expect']}")
+            samples.append(test)
+
+        rng = random.Random(0)
+        for _ in range(2000):
+            samples.append({var: rng.randint(0, 100) if var in ("skor_medis", "skor_hukum")
+                            else rng.choice((0, 5, 8, 10, 15, 18, 20, 25, 30, 40))
+                            for var in self.variables})
+
+        try:
+            import numpy as np
+        except ImportError:
+            return
+        arrays = {var: np.array([s[var] for s in samples]) for var in self.variables}
+        rules, notes = self.evaluate_arrays(arrays)
+        for i, sample in enumerate(samples):
+            if (int(rules[i]), int(notes[i])) != self._decide_values(sample):
+                raise RuleSetError(f"Evaluasi skalar dan array berbeda untuk {sample}")
+
+    def _decide_values(self, values):
+        breakdowns = {"medis": {}, "hukum": {}}
+        for var in self.variables:
+            source = VARIABLES[var]
+            if source is not None:
+                breakdowns[source[0]][source[1]] = {'skor': values[var]}
+        return self._decide(values.get("skor_medis"), values.get("skor_hukum"),
+                            breakdowns["medis"], breakdowns["hukum"])
+
+
+def _distribute(primary, probability):
+    """Probabilitas per rekomendasi: sisa dibagi rata ke alternatif"""
+    probabilities = {rec: 0 for rec in scoring.REKOMENDASI}
+    probabilities[primary] = probability
+
+    total_prob = sum(probabilities.values())
+    if total_prob > 100:
+        probabilities = {k: (v / total_prob) * 100 for k, v in probabilities.items()}
+
+    remaining = 100 - probabilities[primary]
+    other_options = [k for k in probabilities.keys() if k != primary]
+    for opt in other_options:
+        probabilities[opt] = remaining / len(other_options)
+    return probabilities
+
+
+# =============================================================================
+# MEMUAT & HOT RELOAD
+# =============================================================================
+
+def load_ruleset(path):
+    """Baca, kompilasi dan validasi file aturan. Melempar RuleSetError bila gagal."""
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        spec = json.loads(raw.decode("utf-8"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise RuleSetError(f"Gagal membaca file aturan {path}: {exc}") from exc
+    return RuleSet(spec, digest=hashlib.sha256(raw).hexdigest(), path=path)
+
+
+_active = None
+_active_mtime = None
+_failed_mtime = None
+_lock = threading.Lock()
+
+
+def _rules_path():
+    return os.environ.get(RULES_PATH_ENV) or DEFAULT_RULES_PATH
+
+
+def active_ruleset():
+    """Versi aturan yang sedang aktif (dimuat saat pertama kali diminta)"""
+    if _active is None:
+        with _lock:
+            if _active is None:
+                _swap(_rules_path())
+    return _active
+
+
+def _swap(path):
+    global _active, _active_mtime
+    mtime = os.stat(path).st_mtime_ns
+    ruleset = load_ruleset(path)  # versi lama tetap aktif bila ini gagal
+    _active, _active_mtime = ruleset, mtime
+    logger.info("Decision rules versi %s aktif (%s)", ruleset.version, path)
+    return ruleset
+
+
+def reload_ruleset(path=None):
+    """
+    Muat ulang aturan dari `path` (default: file aktif). Versi baru hanya
+    dipakai bila lolos validasi; jika tidak, RuleSetError dilempar dan
+    versi sebelumnya tetap aktif.
+    """
+    with _lock:
+        return _swap(path or (_active.path if _active else _rules_path()))
+
+
+def reload_if_changed():
+    """
+    Cek murah (os.stat) apakah file aturan aktif berubah, lalu muat ulang.
+    Kegagalan validasi hanya dicatat di log; versi lama tetap melayani.
+    """
+    global _failed_mtime
+    ruleset = active_ruleset()
+    try:
+        mtime = os.stat(ruleset.path).st_mtime_ns
+    except OSError as exc:
+        logger.warning("File aturan %s tidak dapat dibaca: %s", ruleset.path, exc)
+        return ruleset
+    if mtime in (_active_mtime, _failed_mtime):
+        return ruleset
+
+    try:
+        return reload_ruleset(ruleset.path)
+    except RuleSetError as exc:
+        _failed_mtime = mtime
+        logger.warning("Reload decision rules gagal, tetap memakai versi %s: %s", ruleset.version, exc)
+        return ruleset
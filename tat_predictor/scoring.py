@@ -0,0 +1,269 @@
+"""
+Inti perhitungan skor dan decision rules TAT BNN.
+
+Modul ini tidak bergantung pada Streamlit, sehingga dapat diimpor oleh
+aplikasi web maupun proses batch.
+"""
+
+from tat_predictor.messages import _FORMATTERS
+
+# =============================================================================
+# KONSTANTA DAN KONFIGURASI
+# =============================================================================
+
+# Gramatur berdasarkan SEMA 4/2010
+GRAMATUR_LIMITS = {
+    "Ganja/Cannabis": 5.0,
+    "Metamfetamin/Sabu": 1.0,
+    "Heroin": 1.8,
+    "Kokain": 1.8,
+    "Ekstasi/MDMA": 2.4,
+    "Morfin": 1.8,
+    "Kodein": 72.0,
+    "Lainnya": 1.0
+}
+
+# Jenis-jenis narkotika untuk tes urine
+JENIS_NARKOTIKA = [
+    "Metamfetamin (MET/Sabu)",
+    "Morfin (MOP/Heroin)",
+    "Kokain (COC)",
+    "Amfetamin (AMP)",
+    "Benzodiazepin (BZO)",
+    "THC (Ganja)",
+    "MDMA (Ekstasi)",
+    "Lainnya"
+]
+
+# Kriteria DSM-5 (11 kriteria gangguan penggunaan zat)
+DSM5_CRITERIA = [
+    "Menggunakan dalam jumlah/waktu lebih lama dari yang direncanakan",
+    "Keinginan kuat/gagal mengurangi penggunaan",
+    "Banyak waktu untuk mendapatkan/menggunakan/pulih dari efek",
+    "Craving (keinginan kuat menggunakan)",
+    "Gagal memenuhi kewajiban (kerja/sekolah/rumah)",
+    "Terus menggunakan meski ada masalah sosial/interpersonal",
+    "Mengurangi/meninggalkan aktivitas penting karena penggunaan",
+    "Menggunakan dalam situasi berbahaya",
+    "Terus menggunakan meski tahu ada masalah fisik/psikologis",
+    "Toleransi (butuh dosis lebih tinggi)",
+    "Withdrawal/Sakau (gejala putus zat)"
+]
+
+# Pilihan status fungsi sosial/okupasional (urutan = tingkat gangguan)
+FUNGSI_SOSIAL_OPTIONS = [
+    "Masih produktif (sekolah/kerja)",
+    "Mulai terganggu",
+    "Tidak berfungsi sama sekali"
+]
+
+# Tingkat keparahan komorbid
+TINGKAT_KOMORBID_OPTIONS = ["Ringan", "Berat"]
+
+# Skor keterlibatan jaringan peredaran (0-40 poin)
+ROLE_MAPPING = {
+    "Pengguna murni (untuk diri sendiri)": 0,
+    "Berbagi dengan teman (sharing)": 15,
+    "Kurir/pengedar kecil": 25,
+    "Pengedar besar/bandar": 40
+}
+
+# Skor status penangkapan (0-15 poin)
+ARREST_MAPPING = {
+    "Sukarela datang untuk asesmen": 0,
+    "Operasi targeted (penggerebekan terencana)": 8,
+    "Tertangkap tangan saat transaksi": 15
+}
+
+# Skor riwayat pidana (0-20 poin)
+HISTORY_MAPPING = {
+    "First offender (pertama kali)": 0,
+    "Pernah rehab sebelumnya (relapse)": 10,
+    "Residivis kasus narkotika": 20
+}
+
+# Jenis rekomendasi yang dihasilkan decision rules (urutan tetap)
+REKOMENDASI = [
+    "Rehabilitasi Rawat Jalan",
+    "Rehabilitasi Rawat Inap",
+    "Proses Hukum",
+    "Proses Hukum + Rehabilitasi"
+]
+
+# =============================================================================
+# FUNGSI PERHITUNGAN SKOR
+# =============================================================================
+
+def _item(skor, maks, render, code, *params):
+    """Item breakdown; teks detail hanya dibentuk bila render"""
+    if render:
+        return {'skor': skor, 'max': maks, 'detail': _FORMATTERS[code](*params)}
+    return {'skor': skor, 'max': maks, 'detail_code': (code,) + params}
+
+
+def calculate_medical_score(zat_positif, dsm5_count, durasi_bulan,
+                           fungsi_sosial, ada_komorbid, tingkat_komorbid, render=True):
+    """
+    Menghitung Skor Asesmen Medis (0-100 poin)
+
+    Komponen:
+    1. Hasil Tes Urine (0-25 poin)
+    2. Tingkat Kecanduan DSM-5 (0-30 poin)
+    3. Durasi Penggunaan (0-15 poin)
+    4. Dampak Fungsi Sosial (0-15 poin)
+    5. Kondisi Komorbid (0-15 poin)
+
+    Dengan render=False item breakdown berisi `detail_code` (kode katalog
+    pesan + parameter) sebagai ganti teks `detail`; lihat messages.
+    """
+    score = 0
+    breakdown = {}
+
+    # 1. Hasil Tes Urine (0-25 poin)
+    num_zat = len(zat_positif)
+    if num_zat == 0:
+        urine_score = 0
+    elif num_zat == 1:
+        urine_score = 10
+    elif num_zat <= 3:
+        urine_score = 15
+    else:  # Polisubstansi (≥4 zat)
+        urine_score = 25
+
+    breakdown['Tes Urine'] = _item(urine_score, 25, render, "tes_urine", num_zat)
+    score += urine_score
+
+    # 2. Tingkat Kecanduan berdasarkan DSM-5 (0-30 poin)
+    if dsm5_count <= 1:
+        addiction_score = 0
+        severity = "Tidak ada gangguan"
+    elif dsm5_count <= 3:
+        addiction_score = 10
+        severity = "Ringan (Mild)"
+    elif dsm5_count <= 5:
+        addiction_score = 20
+        severity = "Sedang (Moderate)"
+    else:  # ≥6 kriteria
+        addiction_score = 30
+        severity = "Berat (Severe)"
+
+    breakdown['Tingkat Kecanduan'] = _item(addiction_score, 30, render, "kecanduan", dsm5_count, severity)
+    score += addiction_score
+
+    # 3. Durasi Penggunaan (0-15 poin)
+    if durasi_bulan < 6:
+        duration_score = 5
+        duration_label = "< 6 bulan"
+    elif durasi_bulan <= 12:
+        duration_score = 10
+        duration_label = "6-12 bulan"
+    else:
+        duration_score = 15
+        duration_label = "> 12 bulan"
+
+    breakdown['Durasi Penggunaan'] = _item(duration_score, 15, render, "durasi", durasi_bulan, duration_label)
+    score += duration_score
+
+    # 4. Dampak Fungsi Sosial (0-15 poin)
+    if fungsi_sosial == "Masih produktif (sekolah/kerja)":
+        social_score = 0
+    elif fungsi_sosial == "Mulai terganggu":
+        social_score = 8
+    else:  # "Tidak berfungsi sama sekali"
+        social_score = 15
+
+    breakdown['Fungsi Sosial'] = _item(social_score, 15, render, "teks", fungsi_sosial)
+    score += social_score
+
+    # 5. Kondisi Komorbid (0-15 poin)
+    if not ada_komorbid:
+        comorbid_score = 0
+        comorbid_detail = "Tidak ada"
+    elif tingkat_komorbid == "Ringan":
+        comorbid_score = 8
+        comorbid_detail = "Gangguan psikologis ringan"
+    else:  # "Berat"
+        comorbid_score = 15
+        comorbid_detail = "Gangguan psikiatrik/medis serius"
+
+    breakdown['Komorbid'] = _item(comorbid_score, 15, render, "teks", comorbid_detail)
+    score += comorbid_score
+
+    return score, breakdown
+
+
+def calculate_legal_score(peran, barang_bukti, jenis_narkotika,
+                          status_tangkap, riwayat_pidana, render=True):
+    """
+    Menghitung Skor Asesmen Hukum (0-100 poin)
+
+    Komponen:
+    1. Keterlibatan Jaringan Peredaran (0-40 poin)
+    2. Barang Bukti vs Gramatur SEMA (0-25 poin)
+    3. Status Penangkapan (0-15 poin)
+    4. Riwayat Pidana (0-20 poin)
+
+    render=False: lihat calculate_medical_score.
+    """
+    score = 0
+    breakdown = {}
+
+    # 1. Keterlibatan Jaringan Peredaran (0-40 poin)
+    network_score = ROLE_MAPPING[peran]
+    breakdown['Keterlibatan Jaringan'] = _item(network_score, 40, render, "teks", peran)
+    score += network_score
+
+    # 2. Barang Bukti vs Gramatur SEMA (0-25 poin)
+    gramatur_limit = GRAMATUR_LIMITS.get(jenis_narkotika, 1.0)
+
+    if barang_bukti < gramatur_limit:
+        evidence_score = 0
+        evidence_detail = ("bb_bawah", barang_bukti, gramatur_limit)
+    elif barang_bukti <= gramatur_limit * 5:
+        evidence_score = 10
+        evidence_detail = ("bb_1_5x", barang_bukti, gramatur_limit, gramatur_limit * 5)
+    elif barang_bukti <= gramatur_limit * 20:
+        evidence_score = 18
+        evidence_detail = ("bb_5_20x", barang_bukti)
+    else:
+        evidence_score = 25
+        evidence_detail = ("bb_20x", barang_bukti, gramatur_limit * 20)
+
+    breakdown['Barang Bukti'] = _item(evidence_score, 25, render, *evidence_detail)
+    score += evidence_score
+
+    # 3. Status Penangkapan (0-15 poin)
+    arrest_score = ARREST_MAPPING[status_tangkap]
+    breakdown['Status Penangkapan'] = _item(arrest_score, 15, render, "teks", status_tangkap)
+    score += arrest_score
+
+    # 4. Riwayat Pidana (0-20 poin)
+    history_score = HISTORY_MAPPING[riwayat_pidana]
+    breakdown['Riwayat Pidana'] = _item(history_score, 20, render, "teks", riwayat_pidana)
+    score += history_score
+
+    return score, breakdown
+
+
+def apply_decision_rules(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum, render=True):
+    """
+    Menerapkan Decision Rules untuk menghasilkan probabilitas rekomendasi
+
+    Berdasarkan:
+    - SEMA 4/2010
+    - Kriteria TAT BNN
+    - Best practices rehabilitasi
+
+    Ambang batas, bobot, probabilitas dan alasan tiap aturan didefinisikan
+    di file aturan berversi (data/rules_v1.json) dan dievaluasi oleh
+    rule engine (lihat tat_predictor.rule_engine).
+
+    Dengan render=False, elemen kedua berupa tuple kode alasan (bukan list
+    teks); render dengan active_ruleset().render_reasoning(codes).
+    """
+    from tat_predictor.rule_engine import active_ruleset
+
+    ruleset = active_ruleset()
+    if render:
+        return ruleset.evaluate(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+    return ruleset.evaluate_codes(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
@@ -0,0 +1,371 @@
+"""
+Layanan HTTP skoring TAT untuk sistem lain (tanpa browser/Streamlit).
+
+Server HTTP/1.1 minimal di atas asyncio (pustaka standar saja), koneksi
+keep-alive:
+
+- POST /v1/score        : satu input_data (JSON) -> hasil analisis (JSON)
+- POST /v1/score/batch  : NDJSON, satu input_data per baris -> NDJSON hasil,
+                          satu baris per baris input dengan urutan yang sama
+- GET  /healthz         : status dan versi decision rules aktif
+
+Query `?detail=0` menghilangkan breakdown dan reasoning dari hasil.
+Body wajib memakai Content-Length (tanpa chunked request). Hasil batch
+dikirim bertahap (chunked) per blok input, sehingga body sebesar apa pun
+tidak ditampung utuh di memori, dan event loop diberi giliran di antara
+blok agar request tunggal tidak menunggu batch besar selesai.
+
+Input divalidasi langsung pada dict hasil json.loads tanpa salinan:
+tipe dan nilai pilihan dicek terhadap set konstanta scoring. Skor dihitung
+calculate_medical_score + calculate_legal_score, keputusan lewat tabel
+keputusan (setara apply_decision_rules). File decision rules dicek paling
+lama tiap RULES_CHECK_SECONDS saat ada request dan dimuat ulang bila
+berubah, seperti di aplikasi.
+
+    python -m tat_predictor serve --port 8080
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qsl
+
+from tat_predictor import metrics, rule_engine
+from tat_predictor.decision_table import lookup_decision
+from tat_predictor.scoring import (
+    ARREST_MAPPING,
+    DSM5_CRITERIA,
+    FUNGSI_SOSIAL_OPTIONS,
+    GRAMATUR_LIMITS,
+    HISTORY_MAPPING,
+    JENIS_NARKOTIKA,
+    ROLE_MAPPING,
+    TINGKAT_KOMORBID_OPTIONS,
+    calculate_legal_score,
+    calculate_medical_score,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Batas body request tunggal, header dan satu baris NDJSON (byte)
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+# Ukuran blok baca body batch; hasil satu blok dikirim sebagai satu chunk
+BATCH_READ_BYTES = 64 * 1024
+
+# Batas nilai numerik (mengikuti batas widget di aplikasi)
+MAX_DURASI_BULAN = 240
+MAX_BARANG_BUKTI = 1000.0
+
+# Selang minimum (detik) antar-cek perubahan file decision rules
+RULES_CHECK_SECONDS = 1.0
+
+_STATUS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# Nilai pilihan yang sah per field
+_CHOICES = {
+    "fungsi_sosial": frozenset(FUNGSI_SOSIAL_OPTIONS),
+    "peran": frozenset(ROLE_MAPPING),
+    "jenis_narkotika": frozenset(GRAMATUR_LIMITS),
+    "status_tangkap": frozenset(ARREST_MAPPING),
+    "riwayat_pidana": frozenset(HISTORY_MAPPING),
+}
+_ZAT = frozenset(JENIS_NARKOTIKA)
+_KOMORBID = frozenset(TINGKAT_KOMORBID_OPTIONS)
+
+_WARMUP_CASE = {
+    "zat_positif": [], "dsm5_count": 0, "durasi_bulan": 0, "fungsi_sosial": FUNGSI_SOSIAL_OPTIONS[0],
+    "ada_komorbid": False, "peran": next(iter(ROLE_MAPPING)), "barang_bukti": 0.0,
+    "jenis_narkotika": next(iter(GRAMATUR_LIMITS)), "status_tangkap": next(iter(ARREST_MAPPING)),
+    "riwayat_pidana": next(iter(HISTORY_MAPPING)),
+}
+
+_rules_checked = 0.0
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# =============================================================================
+# VALIDASI DAN SKORING
+# =============================================================================
+
+def _int_field(case, name, high):
+    value = case.get(name)
+    if type(value) is not int or not 0 <= value <= high:
+        raise ValueError(f"{name}: harus bilangan bulat 0-{high}")
+    return value
+
+
+def _number_field(case, name, high):
+    value = case.get(name)
+    # type() menolak bool; NaN dan inf gagal cek rentang
+    if type(value) not in (int, float) or not 0 <= value <= high:
+        raise ValueError(f"{name}: harus angka 0-{high:g}")
+    return value
+
+
+def validate_case(case):
+    """
+    Validasi satu input_data (dict) di tempat; ValueError berisi nama field
+    bila tidak sah. Field identitas (nama_inisial, usia, jenis_kelamin)
+    tidak dibutuhkan skoring dan tidak divalidasi.
+    """
+    if type(case) is not dict:
+        raise ValueError("input_data harus berupa objek JSON")
+
+    zat_positif = case.get("zat_positif")
+    if type(zat_positif) is not list or not all(type(zat) is str and zat in _ZAT for zat in zat_positif):
+        raise ValueError(f"zat_positif: harus list berisi {sorted(_ZAT)}")
+
+    _int_field(case, "dsm5_count", len(DSM5_CRITERIA))
+    # Durasi boleh pecahan (mis. 1.5 bulan), seperti di batch dan arsip
+    _number_field(case, "durasi_bulan", MAX_DURASI_BULAN)
+
+    if type(case.get("ada_komorbid")) is not bool:
+        raise ValueError("ada_komorbid: harus true/false")
+    if case["ada_komorbid"] and case.get("tingkat_komorbid") not in _KOMORBID:
+        raise ValueError(f"tingkat_komorbid: harus salah satu dari {sorted(_KOMORBID)}")
+
+    _number_field(case, "barang_bukti", MAX_BARANG_BUKTI)
+
+    for name, choices in _CHOICES.items():
+        value = case.get(name)
+        if type(value) is not str or value not in choices:
+            raise ValueError(f"{name}: harus salah satu dari {sorted(choices)}")
+    return case
+
+
+def score_case(case, detail=True):
+    """
+    Skor satu input_data tervalidasi.
+
+    Returns:
+        dict skor_medis, skor_hukum, final_score, primary_rec, probabilities
+        dan (bila detail) breakdown_medis, breakdown_hukum, reasoning
+    """
+    skor_medis, breakdown_medis = calculate_medical_score(
+        case["zat_positif"], case["dsm5_count"], case["durasi_bulan"],
+        case["fungsi_sosial"], case["ada_komorbid"], case.get("tingkat_komorbid"), render=detail,
+    )
+    skor_hukum, breakdown_hukum = calculate_legal_score(
+        case["peran"], case["barang_bukti"], case["jenis_narkotika"],
+        case["status_tangkap"], case["riwayat_pidana"], render=detail,
+    )
+    # Tanpa detail, teks breakdown dan reasoning tidak dibentuk sama sekali
+    probabilities, reasoning, primary_rec, final_score = lookup_decision(
+        skor_medis, skor_hukum, breakdown_medis, breakdown_hukum, detail
+    )
+    result = {
+        "skor_medis": skor_medis,
+        "skor_hukum": skor_hukum,
+        "final_score": final_score,
+        "primary_rec": primary_rec,
+        "probabilities": probabilities,
+    }
+    if detail:
+        result["breakdown_medis"] = breakdown_medis
+        result["breakdown_hukum"] = breakdown_hukum
+        result["reasoning"] = reasoning
+    return result
+
+
+def _score_line(line, detail):
+    """Satu baris NDJSON -> satu baris hasil (atau {"error": ...})"""
+    try:
+        return _encode(score_case(validate_case(json.loads(line)), detail)).encode("utf-8")
+    except ValueError as exc:
+        return _encode({"error": str(exc)}).encode("utf-8")
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _response(status, body, keep_alive, content_type=b"application/json"):
+    return b"".join([
+        b"HTTP/1.1 %d %s\r\n" % (status, _STATUS[status].encode("ascii")),
+        b"Content-Type: %s\r\nContent-Length: %d\r\n" % (content_type, len(body)),
+        b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n",
+        body,
+    ])
+
+
+def _error(status, message, keep_alive=False):
+    return _response(status, _encode({"error": message}).encode("utf-8"), keep_alive)
+
+
+def _parse_head(head):
+    """(method, path, query, content_length, keep_alive) dari blok header"""
+    lines = head[:-4].split(b"\r\n")
+    try:
+        method, target, version = lines[0].split(b" ", 2)
+    except ValueError:
+        raise _HTTPError(400, "request line tidak valid") from None
+    path, _, query = target.decode("latin-1").partition("?")
+
+    content_length = None
+    keep_alive = version == b"HTTP/1.1"
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            try:
+                content_length = int(value)
+            except ValueError:
+                raise _HTTPError(400, "Content-Length tidak valid") from None
+            if content_length < 0:
+                raise _HTTPError(400, "Content-Length tidak valid")
+        elif name == b"connection":
+            value = value.strip().lower()
+            keep_alive = value == b"keep-alive" or (keep_alive and value != b"close")
+        elif name == b"transfer-encoding":
+            raise _HTTPError(411, "body chunked tidak didukung, gunakan Content-Length")
+    return method, path, query, content_length, keep_alive
+
+
+def _detail(query):
+    return dict(parse_qsl(query)).get("detail", "1") not in ("0", "false") if query else True
+
+
+async def _score_batch(reader, writer, length, detail, keep_alive):
+    """
+    Baca body NDJSON per blok, kirim hasil tiap blok sebagai satu chunk.
+    Mengembalikan False bila koneksi harus ditutup (baris terlalu panjang).
+    """
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                 b"Transfer-Encoding: chunked\r\n"
+                 + (b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"))
+    remaining = length
+    pending = b""
+    while remaining:
+        block = await reader.read(min(BATCH_READ_BYTES, remaining))
+        if not block:
+            raise ConnectionResetError("body batch terpotong")
+        remaining -= len(block)
+        *lines, pending = (pending + block).split(b"\n")
+        if not remaining:
+            # Baris terakhir tanpa newline
+            lines.append(pending)
+
+        out = [_score_line(line, detail) for line in lines if line.strip()]
+        if remaining and len(pending) > MAX_BODY_BYTES:
+            # Status 200 sudah terkirim: laporkan sebagai baris error lalu tutup
+            out.append(_encode({"error": f"baris NDJSON melebihi {MAX_BODY_BYTES} byte"}).encode("utf-8"))
+        if out:
+            out.append(b"")
+            chunk = b"\n".join(out)
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        if remaining and len(pending) > MAX_BODY_BYTES:
+            writer.write(b"0\r\n\r\n")
+            return False
+        await writer.drain()
+        # Beri giliran ke koneksi lain di antara blok
+        await asyncio.sleep(0)
+    writer.write(b"0\r\n\r\n")
+    return True
+
+
+def _check_rules():
+    """Muat ulang decision rules bila file berubah, paling sering tiap RULES_CHECK_SECONDS"""
+    global _rules_checked
+    now = time.monotonic()
+    if now - _rules_checked >= RULES_CHECK_SECONDS:
+        _rules_checked = now
+        rule_engine.reload_if_changed()
+
+
+async def _dispatch(reader, writer, method, path, query, length, keep_alive):
+    """Jalankan satu request; mengembalikan apakah koneksi dapat dipakai ulang"""
+    _check_rules()
+    if path == "/healthz":
+        if method != b"GET":
+            raise _HTTPError(405, "gunakan GET")
+        ruleset = rule_engine.active_ruleset()
+        body = _encode({"status": "ok", "rules_version": ruleset.version,
+                        "rules_digest": ruleset.digest}).encode("utf-8")
+        writer.write(_response(200, body, keep_alive))
+        return keep_alive
+    if path not in ("/v1/score", "/v1/score/batch"):
+        raise _HTTPError(404, f"endpoint tidak dikenal: {path}")
+    if method != b"POST":
+        raise _HTTPError(405, "gunakan POST")
+    if length is None:
+        raise _HTTPError(411, "Content-Length wajib diisi")
+
+    if path == "/v1/score/batch":
+        with metrics.span("service.batch"):
+            return await _score_batch(reader, writer, length, _detail(query), keep_alive) and keep_alive
+
+    if length > MAX_BODY_BYTES:
+        raise _HTTPError(413, f"body melebihi {MAX_BODY_BYTES} byte")
+    body = await reader.readexactly(length)
+    with metrics.span("service.score"):
+        try:
+            result = score_case(validate_case(json.loads(body)), _detail(query))
+        except ValueError as exc:
+            # Body sudah terbaca: koneksi tetap dapat dipakai ulang
+            writer.write(_error(400, str(exc), keep_alive))
+            return keep_alive
+    writer.write(_response(200, _encode(result).encode("utf-8"), keep_alive))
+    return keep_alive
+
+
+async def _handle(reader, writer):
+    """Layani satu koneksi (beberapa request bila keep-alive)"""
+    try:
+        keep_alive = True
+        while keep_alive:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError:
+                writer.write(_error(431, f"header melebihi {MAX_HEADER_BYTES} byte"))
+                return
+
+            try:
+                request = _parse_head(head)
+                keep_alive = await _dispatch(reader, writer, *request)
+            except _HTTPError as exc:
+                # Body yang tidak dibaca membuat koneksi tidak dapat dipakai ulang
+                keep_alive = False
+                writer.write(_error(exc.status, str(exc)))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except Exception as exc:  # pragma: no cover - bug skoring, jangan matikan server
+        writer.write(_error(500, f"{type(exc).__name__}: {exc}"))
+    finally:
+        writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """
+    Jalankan server sampai dibatalkan. `ready` (callable, opsional)
+    dipanggil dengan objek server setelah socket terbuka.
+    """
+    # Bangun tabel keputusan sebelum menerima request pertama
+    score_case(_WARMUP_CASE)
+    server = await asyncio.start_server(_handle, host, port, limit=MAX_HEADER_BYTES)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Jalankan server di thread ini (blocking, Ctrl+C untuk berhenti)"""
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        pass
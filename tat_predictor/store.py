@@ -0,0 +1,495 @@
+"""
+Penyimpanan kasus persisten berbasis SQLite.
+
+Setiap hasil analisis (input_data, skor, probabilitas, reasoning dan
+breakdown) disimpan ke satu file database dalam mode WAL, sehingga
+pembacaan riwayat tidak terblokir oleh penulisan. Riwayat dibaca dengan
+keyset pagination (kursor timestamp + id), bukan OFFSET, sehingga setiap
+halaman tetap cepat walaupun tabel berisi jutaan kasus.
+
+Analitik kohort (distribusi rekomendasi, rata-rata skor, jumlah hit per
+aturan, histogram composite score) dibaca dari tabel rollup yang
+diperbarui trigger SQLite pada setiap INSERT kasus, dalam transaksi yang
+sama. Halaman supervisor hanya menjumlahkan baris rollup (ratusan hingga
+ribuan baris), bukan melakukan GROUP BY ulang atas jutaan kasus.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from tat_predictor import rule_engine
+
+# Lokasi database default; dapat diganti lewat env var
+DB_PATH_ENV = "TAT_DB_PATH"
+DEFAULT_DB_PATH = "tat_cases.db"
+
+# Kolom yang dapat dipakai sebagai filter riwayat (masing-masing terindeks)
+FILTER_COLUMNS = ["primary_rec", "jenis_narkotika", "peran"]
+
+# Kolom ringkas untuk daftar riwayat (tanpa blob JSON)
+HISTORY_COLUMNS = [
+    "id",
+    "timestamp",
+    "nama_inisial",
+    "jenis_narkotika",
+    "peran",
+    "skor_medis",
+    "skor_hukum",
+    "final_score",
+    "primary_rec",
+]
+
+_JSON_COLUMNS = ["input_data", "probabilities", "reasoning", "breakdown_medis", "breakdown_hukum"]
+
+# Dimensi analitik kohort; "month" = YYYY-MM dari timestamp kasus
+COHORT_DIMENSIONS = ["jenis_narkotika", "peran", "riwayat_pidana", "month"]
+
+# Lebar bin histogram composite score (0-100)
+SCORE_BIN_WIDTH = 10
+
+# Versi skema (PRAGMA user_version); 1 = kolom rule_id/riwayat_pidana + rollup
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    nama_inisial TEXT,
+    jenis_narkotika TEXT,
+    peran TEXT,
+    skor_medis INTEGER,
+    skor_hukum INTEGER,
+    final_score REAL,
+    primary_rec TEXT,
+    riwayat_pidana TEXT,
+    rule_id TEXT,
+    input_data TEXT,
+    probabilities TEXT,
+    reasoning TEXT,
+    breakdown_medis TEXT,
+    breakdown_hukum TEXT
+);
+-- Indeks (filter, timestamp): rowid ikut tersimpan di setiap indeks,
+-- sehingga urutan (timestamp, id) untuk keyset pagination langsung
+-- terpenuhi oleh indeks tanpa sort.
+CREATE INDEX IF NOT EXISTS idx_cases_timestamp ON cases (timestamp);
+CREATE INDEX IF NOT EXISTS idx_cases_primary_rec ON cases (primary_rec, timestamp);
+CREATE INDEX IF NOT EXISTS idx_cases_jenis_narkotika ON cases (jenis_narkotika, timestamp);
+CREATE INDEX IF NOT EXISTS idx_cases_peran ON cases (peran, timestamp);
+
+-- Rollup kohort per dimensi (marginal): satu baris per nilai dimensi x bulan
+-- x rekomendasi x aturan. Kunci diawali dimensi, sehingga ringkasan satu
+-- dimensi hanya membaca rentang indeks miliknya. Nilai NULL disimpan
+-- sebagai '' karena kolom PRIMARY KEY.
+CREATE TABLE IF NOT EXISTS cohort_rollup (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    month TEXT NOT NULL,
+    primary_rec TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sum_medis REAL NOT NULL,
+    sum_hukum REAL NOT NULL,
+    sum_final REAL NOT NULL,
+    PRIMARY KEY (dimension, value, month, primary_rec, rule_id)
+) WITHOUT ROWID;
+-- Histogram composite score per bulan (bin SCORE_BIN_WIDTH)
+CREATE TABLE IF NOT EXISTS score_rollup (
+    month TEXT NOT NULL,
+    score_bin INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (month, score_bin)
+) WITHOUT ROWID;
+"""
+
+# Ekspresi rollup dari satu baris kasus ({t} = "NEW." di trigger, "" di rebuild)
+_MONTH = "substr({t}timestamp, 1, 7)"
+_DIMENSION_VALUES = {
+    "jenis_narkotika": "IFNULL({t}jenis_narkotika, '')",
+    "peran": "IFNULL({t}peran, '')",
+    "riwayat_pidana": "IFNULL({t}riwayat_pidana, '')",
+    "month": _MONTH,
+}
+_MEASURES = ("IFNULL({t}primary_rec, '')", "IFNULL({t}rule_id, '')")
+_SCORE_BIN = f"MIN(MAX(CAST(IFNULL({{t}}final_score, 0) / {SCORE_BIN_WIDTH} AS INTEGER), 0), {100 // SCORE_BIN_WIDTH - 1})"
+
+
+def _trigger_sql():
+    rows = ",\n        ".join(
+        f"('{dimension}', {value.format(t='NEW.')}, {_MONTH.format(t='NEW.')}, "
+        f"{_MEASURES[0].format(t='NEW.')}, {_MEASURES[1].format(t='NEW.')}, 1, "
+        "IFNULL(NEW.skor_medis, 0), IFNULL(NEW.skor_hukum, 0), IFNULL(NEW.final_score, 0))"
+        for dimension, value in _DIMENSION_VALUES.items()
+    )
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_cases_rollup AFTER INSERT ON cases BEGIN
+    INSERT INTO cohort_rollup VALUES
+        {rows}
+    ON CONFLICT (dimension, value, month, primary_rec, rule_id) DO UPDATE SET
+        n = n + excluded.n,
+        sum_medis = sum_medis + excluded.sum_medis,
+        sum_hukum = sum_hukum + excluded.sum_hukum,
+        sum_final = sum_final + excluded.sum_final;
+    INSERT INTO score_rollup VALUES ({_MONTH.format(t='NEW.')}, {_SCORE_BIN.format(t='NEW.')}, 1)
+    ON CONFLICT (month, score_bin) DO UPDATE SET n = n + excluded.n;
+END;
+"""
+
+
+def _rebuild_sql():
+    selects = " UNION ALL ".join(
+        f"SELECT '{dimension}', {value.format(t='')}, {_MONTH.format(t='')}, "
+        f"{_MEASURES[0].format(t='')}, {_MEASURES[1].format(t='')}, COUNT(*), "
+        "TOTAL(skor_medis), TOTAL(skor_hukum), TOTAL(final_score) FROM cases GROUP BY 2, 3, 4, 5"
+        for dimension, value in _DIMENSION_VALUES.items()
+    )
+    return [
+        "DELETE FROM cohort_rollup",
+        "DELETE FROM score_rollup",
+        f"INSERT INTO cohort_rollup {selects}",
+        f"INSERT INTO score_rollup SELECT {_MONTH.format(t='')}, {_SCORE_BIN.format(t='')}, COUNT(*)"
+        " FROM cases GROUP BY 1, 2",
+    ]
+
+
+# Trigger dibuat setelah migrasi kolom (database lama belum punya rule_id)
+_ROLLUP_TRIGGER = _trigger_sql()
+_REBUILD_ROLLUPS = _rebuild_sql()
+
+_INSERT = (
+    "INSERT INTO cases (timestamp, nama_inisial, jenis_narkotika, peran, skor_medis, skor_hukum,"
+    " final_score, primary_rec, riwayat_pidana, rule_id, input_data, probabilities, reasoning,"
+    " breakdown_medis, breakdown_hukum)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _rule_id(record, ruleset=None):
+    """
+    Id cabang aturan yang menghasilkan rekomendasi kasus (dievaluasi ulang
+    dengan decision rules aktif), atau None bila breakdown tidak lengkap.
+    """
+    if record.get("rule_id"):
+        return record["rule_id"]
+    ruleset = ruleset or rule_engine.active_ruleset()
+    try:
+        rule, _ = ruleset.decide(record["skor_medis"], record["skor_hukum"],
+                                 record["breakdown_medis"], record["breakdown_hukum"])
+    except (KeyError, TypeError):
+        return None
+    return ruleset.rule_ids[rule]
+
+
+def _row(record, ruleset=None):
+    """
+    Baris INSERT dari hasil analisis: dict session_state['results']
+    (primary_rec) maupun export_data (rekomendasi_utama).
+    """
+    input_data = record.get("input_data") or {}
+    return (
+        record["timestamp"],
+        input_data.get("nama_inisial"),
+        input_data.get("jenis_narkotika"),
+        input_data.get("peran"),
+        record.get("skor_medis"),
+        record.get("skor_hukum"),
+        record.get("final_score"),
+        record.get("primary_rec") or record.get("rekomendasi_utama"),
+        input_data.get("riwayat_pidana"),
+        _rule_id(record, ruleset),
+        _dumps(input_data),
+        _dumps(record.get("probabilities", {})),
+        _dumps(record.get("reasoning", [])),
+        _dumps(record.get("breakdown_medis", {})),
+        _dumps(record.get("breakdown_hukum", {})),
+    )
+
+
+class CaseStore:
+    """
+    Store kasus SQLite yang aman dipakai dari beberapa thread (mis. sesi
+    Streamlit). Tiap thread memakai koneksi sendiri; penulisan
+    diserialisasi dengan lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get(DB_PATH_ENV) or DEFAULT_DB_PATH
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        # WAL bersifat persisten di file database; cukup diset sekali
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._write_lock:
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+            conn.executescript(_ROLLUP_TRIGGER)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Dengan WAL, NORMAL tetap aman dari korupsi dan jauh lebih cepat
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn):
+        """
+        Tambah kolom rule_id/riwayat_pidana dan isi rollup untuk database
+        lama, dalam satu transaksi (aman bila beberapa proses membuka
+        database yang sama bersamaan).
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(cases)")}
+                for column in ("riwayat_pidana", "rule_id"):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE cases ADD COLUMN {column} TEXT")
+                self._backfill(conn)
+                self._rebuild(conn)
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _backfill(conn, batch_size=10_000):
+        """Isi rule_id dan riwayat_pidana kasus lama dari blob JSON-nya"""
+        ruleset = rule_engine.active_ruleset()
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, skor_medis, skor_hukum, input_data, breakdown_medis, breakdown_hukum"
+                " FROM cases WHERE id > ? AND rule_id IS NULL ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            updates = []
+            for case_id, skor_medis, skor_hukum, input_data, breakdown_medis, breakdown_hukum in rows:
+                record = {"skor_medis": skor_medis, "skor_hukum": skor_hukum,
+                          "breakdown_medis": json.loads(breakdown_medis or "{}"),
+                          "breakdown_hukum": json.loads(breakdown_hukum or "{}")}
+                riwayat_pidana = json.loads(input_data or "{}").get("riwayat_pidana")
+                updates.append((riwayat_pidana, _rule_id(record, ruleset), case_id))
+            conn.executemany("UPDATE cases SET riwayat_pidana = ?, rule_id = ? WHERE id = ?", updates)
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _rebuild(conn):
+        # Dipanggil di dalam transaksi
+        for statement in _REBUILD_ROLLUPS:
+            conn.execute(statement)
+
+    # ------------------------------------------------------------------
+    # Penulisan
+    # ------------------------------------------------------------------
+    def add(self, record):
+        """Simpan satu hasil analisis; mengembalikan id kasus"""
+        with self._write_lock:
+            return self._conn().execute(_INSERT, _row(record)).lastrowid
+
+    def add_many(self, records, batch_size=10_000):
+        """
+        Simpan banyak hasil sekaligus (mis. impor arsip) dengan executemany,
+        satu transaksi per `batch_size` kasus. Mengembalikan jumlah kasus.
+        """
+        conn = self._conn()
+        ruleset = rule_engine.active_ruleset()
+        count = 0
+        batch = []
+        with self._write_lock:
+            for record in records:
+                batch.append(_row(record, ruleset))
+                if len(batch) == batch_size:
+                    count += self._insert_batch(conn, batch)
+                    batch = []
+            if batch:
+                count += self._insert_batch(conn, batch)
+        return count
+
+    @staticmethod
+    def _insert_batch(conn, rows):
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Pembacaan
+    # ------------------------------------------------------------------
+    def count(self, **filters):
+        where, params = self._where(filters)
+        sql = "SELECT COUNT(*) FROM cases" + (" WHERE " + " AND ".join(where) if where else "")
+        return self._conn().execute(sql, params).fetchone()[0]
+
+    @staticmethod
+    def _where(filters):
+        where, params = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Filter tidak dikenal: {column!r}")
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        return where, params
+
+    def history(self, limit=50, before=None, **filters):
+        """
+        Satu halaman riwayat, terbaru lebih dulu.
+
+        Args:
+            limit: jumlah kasus per halaman
+            before: kursor (timestamp, id) dari halaman sebelumnya; None
+                untuk halaman pertama
+            **filters: primary_rec / jenis_narkotika / peran (opsional)
+
+        Returns:
+            (list dict HISTORY_COLUMNS, kursor halaman berikutnya atau None)
+        """
+        where, params = self._where(filters)
+        if before is not None:
+            # Bentuk OR eksplisit agar SQLite memakai range scan pada indeks
+            where.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([before[0], before[0], before[1]])
+
+        sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM cases"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._conn().execute(sql, params).fetchall()
+        page = [dict(zip(HISTORY_COLUMNS, row)) for row in rows[:limit]]
+        cursor = (page[-1]["timestamp"], page[-1]["id"]) if len(rows) > limit else None
+        return page, cursor
+
+    def get(self, case_id):
+        """Hasil lengkap satu kasus dalam format session_state['results'], atau None"""
+        columns = ["timestamp", "skor_medis", "skor_hukum", "final_score", "primary_rec"] + _JSON_COLUMNS
+        row = self._conn().execute(
+            f"SELECT {', '.join(columns)} FROM cases WHERE id = ?", (case_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        result = dict(zip(columns, row))
+        for column in _JSON_COLUMNS:
+            result[column] = json.loads(result[column])
+        return result
+
+    # ------------------------------------------------------------------
+    # Analitik kohort (dari tabel rollup)
+    # ------------------------------------------------------------------
+    def cohort(self, by, month=None):
+        """
+        Ringkasan kohort per nilai dimensi `by`, dibaca dari rollup.
+
+        Args:
+            by: salah satu COHORT_DIMENSIONS
+            month: batasi ke satu bulan ("YYYY-MM"), None = semua bulan
+
+        Returns:
+            list dict per nilai `by` (terurut): value, n, mean_medis,
+            mean_hukum, mean_final, rekomendasi {primary_rec: n} dan
+            rules {rule_id: n}
+        """
+        if by not in COHORT_DIMENSIONS:
+            raise ValueError(f"Dimensi kohort tidak dikenal: {by!r}")
+        sql = ("SELECT value, primary_rec, rule_id, SUM(n), SUM(sum_medis), SUM(sum_hukum), SUM(sum_final)"
+               " FROM cohort_rollup WHERE dimension = ?")
+        params = [by]
+        if month is not None:
+            sql += " AND month = ?"
+            params.append(month)
+        rows = self._conn().execute(sql + " GROUP BY 1, 2, 3 ORDER BY 1", params).fetchall()
+
+        groups = {}
+        for value, primary_rec, rule_id, n, sum_medis, sum_hukum, sum_final in rows:
+            group = groups.get(value)
+            if group is None:
+                group = groups[value] = {"value": value, "n": 0, "mean_medis": 0.0, "mean_hukum": 0.0,
+                                         "mean_final": 0.0, "rekomendasi": {}, "rules": {}}
+            group["n"] += n
+            # Dijumlahkan dulu, dibagi n setelah semua baris terbaca
+            group["mean_medis"] += sum_medis
+            group["mean_hukum"] += sum_hukum
+            group["mean_final"] += sum_final
+            group["rekomendasi"][primary_rec] = group["rekomendasi"].get(primary_rec, 0) + n
+            group["rules"][rule_id] = group["rules"].get(rule_id, 0) + n
+
+        for group in groups.values():
+            for key in ("mean_medis", "mean_hukum", "mean_final"):
+                group[key] /= group["n"]
+        return list(groups.values())
+
+    def score_histogram(self, month=None):
+        """
+        Histogram composite score dari rollup: list (awal bin, jumlah) untuk
+        setiap bin SCORE_BIN_WIDTH di 0-100, termasuk bin kosong.
+        """
+        sql = "SELECT score_bin, SUM(n) FROM score_rollup"
+        params = []
+        if month is not None:
+            sql += " WHERE month = ?"
+            params.append(month)
+        counts = dict(self._conn().execute(sql + " GROUP BY score_bin", params).fetchall())
+        return [(b * SCORE_BIN_WIDTH, counts.get(b, 0)) for b in range(100 // SCORE_BIN_WIDTH)]
+
+    def cohort_values(self, dimension):
+        """Nilai yang tersedia untuk satu dimensi kohort (untuk filter UI)"""
+        if dimension not in COHORT_DIMENSIONS:
+            raise ValueError(f"Dimensi kohort tidak dikenal: {dimension!r}")
+        return [row[0] for row in self._conn().execute(
+            "SELECT DISTINCT value FROM cohort_rollup WHERE dimension = ? ORDER BY 1", (dimension,)
+        )]
+
+    def rebuild_rollups(self):
+        """Bangun ulang tabel rollup dari seluruh kasus (pemeliharaan)"""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN")
+            try:
+                self._rebuild(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def records(self, after_id=0, batch_size=10_000):
+        """
+        Yield hasil lengkap semua kasus dengan id > after_id, urut id
+        (format get() ditambah case_id dan rule_id), dibaca per batch.
+        """
+        columns = ["id", "timestamp", "skor_medis", "skor_hukum", "final_score", "primary_rec",
+                   "rule_id"] + _JSON_COLUMNS
+        sql = f"SELECT {', '.join(columns)} FROM cases WHERE id > ? ORDER BY id LIMIT ?"
+        while True:
+            rows = self._conn().execute(sql, (after_id, batch_size)).fetchall()
+            for row in rows:
+                result = dict(zip(columns, row))
+                result["case_id"] = result.pop("id")
+                for column in _JSON_COLUMNS:
+                    result[column] = json.loads(result[column])
+                yield result
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1][0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,151 @@
+"""
+Estimasi ketidakpastian rekomendasi dengan simulasi Monte Carlo.
+
+Probabilitas decision rules adalah konstanta per aturan, sehingga tidak
+menunjukkan seberapa stabil rekomendasi satu kasus. Modul ini mengganggu
+(perturb) input yang nilainya tidak pasti:
+- barang_bukti : galat timbang (relatif + resolusi timbangan);
+- dsm5_count   : kriteria DSM-5 borderline yang bisa salah dinilai;
+- durasi_bulan : durasi penggunaan yang hanya berupa perkiraan;
+lalu menskor seluruh sampel sekaligus lewat jalur tervektorisasi
+(batch.score_encoded) dan melaporkan frekuensi empiris tiap rekomendasi
+beserta interval kepercayaan 95% (Wilson).
+
+Hasil deterministik: seed dan jumlah sampel yang sama selalu memberi hasil
+yang sama (numpy.random.Generator PCG64).
+
+    hasil = simulate(input_data, samples=100_000, seed=0)
+    print(format_summary(hasil))
+"""
+
+import math
+
+import numpy as np
+
+from tat_predictor.batch import INPUT_COLUMNS, encode_cases, score_encoded
+from tat_predictor.scoring import DSM5_CRITERIA, REKOMENDASI
+
+DEFAULT_SAMPLES = 100_000
+DEFAULT_SEED = 0
+
+# Model ketidakpastian default (dapat di-override per parameter lewat `model`)
+DEFAULT_MODEL = {
+    "bb_rel_sd": 0.05,     # simpangan baku galat timbang, relatif terhadap berat
+    "bb_abs_sd": 0.05,     # simpangan baku galat timbang absolut (gram)
+    "dsm5_flip": 0.10,     # peluang satu kriteria DSM-5 dinilai sebaliknya
+    "durasi_rel_sd": 0.25, # simpangan baku perkiraan durasi, relatif
+    "durasi_min_sd": 1.0,  # simpangan baku minimum perkiraan durasi (bulan)
+}
+
+# Kuantil normal untuk interval 95%
+_Z95 = 1.959963984540054
+
+
+def _resolve_model(model):
+    if not model:
+        return DEFAULT_MODEL
+    unknown = set(model) - set(DEFAULT_MODEL)
+    if unknown:
+        raise ValueError(f"Parameter model tidak dikenal: {', '.join(sorted(unknown))}")
+    resolved = {**DEFAULT_MODEL, **model}
+    if any(v < 0 for v in resolved.values()) or resolved["dsm5_flip"] > 1:
+        raise ValueError("Parameter model harus >= 0 (dsm5_flip 0-1)")
+    return resolved
+
+
+def wilson_interval(count, n, z=_Z95):
+    """Interval Wilson untuk proporsi count/n (array atau skalar)"""
+    p = count / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    # Pada count 0 atau n galat pembulatan bisa membuat interval tidak memuat p
+    return np.clip(center - half, 0.0, p), np.clip(center + half, p, 1.0)
+
+
+def perturb(enc, samples, rng, model=None):
+    """
+    Kolom encode_cases() satu kasus diulang `samples` kali, dengan
+    barang_bukti, dsm5_count dan durasi_bulan diganggu sesuai `model`.
+    Kolom lain hanya berupa view broadcast (tanpa salinan).
+    """
+    model = _resolve_model(model)
+    columns = {name: np.broadcast_to(column[:1], (samples,)) for name, column in enc.items()}
+
+    # Galat timbang: normal dengan varians relatif + absolut, berat >= 0
+    bb = float(enc["barang_bukti"][0])
+    bb_sd = math.hypot(model["bb_rel_sd"] * bb, model["bb_abs_sd"])
+    columns["barang_bukti"] = np.maximum(bb + bb_sd * rng.standard_normal(samples), 0.0)
+
+    # Kriteria terpenuhi bisa gugur dan kriteria lain bisa terpenuhi
+    n_criteria = len(DSM5_CRITERIA)
+    dsm5 = int(np.clip(enc["dsm5_count"][0], 0, n_criteria))
+    flip = model["dsm5_flip"]
+    columns["dsm5_count"] = (dsm5 - rng.binomial(dsm5, flip, samples)
+                             + rng.binomial(n_criteria - dsm5, flip, samples)).astype(np.float64)
+
+    # Galat perkiraan durasi dalam bulan penuh; durasi pecahan tetap pecahan
+    # (membulatkan durasi itu sendiri menggeser kasus tanpa gangguan)
+    durasi = float(enc["durasi_bulan"][0])
+    durasi_sd = max(model["durasi_rel_sd"] * durasi, model["durasi_min_sd"])
+    columns["durasi_bulan"] = np.maximum(durasi + np.rint(durasi_sd * rng.standard_normal(samples)), 0.0)
+    return columns
+
+
+def simulate(input_data, samples=DEFAULT_SAMPLES, seed=DEFAULT_SEED, model=None, gramatur_limits=None):
+    """
+    Simulasi Monte Carlo rekomendasi untuk satu kasus.
+
+    Args:
+        input_data: dict input kasus (seperti export_data["input_data"])
+        samples: jumlah sampel
+        seed: seed generator acak (hasil deterministik per seed)
+        model: override sebagian DEFAULT_MODEL
+        gramatur_limits: override GRAMATUR_LIMITS (opsional)
+
+    Returns:
+        dict berisi samples, seed, model, baseline (rekomendasi tanpa
+        gangguan), frequencies dan intervals (per rekomendasi, urutan
+        REKOMENDASI), stability (frekuensi rekomendasi baseline) dan
+        final_score (mean, p05, p50, p95).
+    """
+    if samples < 1:
+        raise ValueError("Jumlah sampel minimal 1")
+    model = _resolve_model(model)
+    enc = encode_cases({col: [input_data.get(col)] for col in INPUT_COLUMNS})
+    baseline = REKOMENDASI[int(score_encoded(enc, gramatur_limits)["primary_code"][0])]
+
+    rng = np.random.default_rng(seed)
+    result = score_encoded(perturb(enc, samples, rng, model), gramatur_limits)
+
+    counts = np.bincount(result["primary_code"], minlength=len(REKOMENDASI))
+    low, high = wilson_interval(counts, samples)
+    frequencies = dict(zip(REKOMENDASI, (counts / samples).tolist()))
+    p05, p50, p95 = np.percentile(result["final_score"], [5, 50, 95]).tolist()
+    return {
+        "samples": samples,
+        "seed": seed,
+        "model": model,
+        "baseline": baseline,
+        "frequencies": frequencies,
+        "intervals": dict(zip(REKOMENDASI, zip(low.tolist(), high.tolist()))),
+        "stability": frequencies[baseline],
+        "final_score": {"mean": float(result["final_score"].mean()), "p05": p05, "p50": p50, "p95": p95},
+    }
+
+
+def format_summary(result):
+    """Ringkasan teks: frekuensi rekomendasi dengan interval 95%"""
+    score = result["final_score"]
+    lines = [
+        f"Sampel     : {result['samples']:,} (seed {result['seed']})",
+        f"Baseline   : {result['baseline']} (stabil pada {result['stability'] * 100:.2f}% sampel)",
+        f"Skor akhir : rata-rata {score['mean']:.1f}, p05-p95 {score['p05']:.1f}-{score['p95']:.1f}",
+        "",
+        f"{'Rekomendasi':<30}{'Frekuensi':>10}{'Interval 95%':>20}",
+    ]
+    for rec in REKOMENDASI:
+        low, high = result["intervals"][rec]
+        lines.append(f"{rec:<30}{result['frequencies'][rec] * 100:>9.2f}%"
+                     f"{f'{low * 100:.2f}-{high * 100:.2f}%':>20}")
+    return "\n".join(lines)
@@ -0,0 +1,123 @@
+"""
+Fixture bersama: kasus acak dan kasus batas, beserta hasil skor skalar
+(calculate_medical_score, calculate_legal_score, apply_decision_rules)
+sebagai acuan kesetaraan jalur batch/tabel/compact/paralel.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tat_predictor import scoring  # noqa: E402
+
+
+def _base_case(rng):
+    ada_komorbid = rng.random() < 0.4
+    return {
+        "zat_positif": rng.sample(scoring.JENIS_NARKOTIKA, rng.randint(0, len(scoring.JENIS_NARKOTIKA))),
+        "dsm5_count": rng.randint(0, len(scoring.DSM5_CRITERIA)),
+        "durasi_bulan": rng.randint(0, 240),
+        "fungsi_sosial": rng.choice(scoring.FUNGSI_SOSIAL_OPTIONS),
+        "ada_komorbid": ada_komorbid,
+        "tingkat_komorbid": rng.choice(scoring.TINGKAT_KOMORBID_OPTIONS) if ada_komorbid else None,
+        "peran": rng.choice(list(scoring.ROLE_MAPPING)),
+        "barang_bukti": round(rng.uniform(0, 100), 2),
+        "jenis_narkotika": rng.choice(list(scoring.GRAMATUR_LIMITS)),
+        "status_tangkap": rng.choice(list(scoring.ARREST_MAPPING)),
+        "riwayat_pidana": rng.choice(list(scoring.HISTORY_MAPPING)),
+    }
+
+
+def random_cases(n, seed=0):
+    rng = random.Random(seed)
+    return [_base_case(rng) for _ in range(n)]
+
+
+def boundary_cases(seed=1):
+    """Kasus tepat di (dan di sekitar) setiap ambang skor komponen"""
+    rng = random.Random(seed)
+    cases = []
+    for n_zat in range(len(scoring.JENIS_NARKOTIKA) + 1):
+        cases.append({**_base_case(rng), "zat_positif": scoring.JENIS_NARKOTIKA[:n_zat]})
+    for dsm5 in range(len(scoring.DSM5_CRITERIA) + 1):
+        cases.append({**_base_case(rng), "dsm5_count": dsm5})
+    for durasi in (0, 5, 5.5, 6, 11, 12, 12.5, 13, 240):
+        cases.append({**_base_case(rng), "durasi_bulan": durasi})
+    for jenis, limit in scoring.GRAMATUR_LIMITS.items():
+        for ratio in (0, 0.999, 1, 1.001, 5, 5.001, 20, 20.001, 100):
+            cases.append({**_base_case(rng), "jenis_narkotika": jenis, "barang_bukti": limit * ratio})
+    for fungsi in scoring.FUNGSI_SOSIAL_OPTIONS:
+        cases.append({**_base_case(rng), "fungsi_sosial": fungsi})
+    for ada, tingkat in [(False, None), (False, "Berat")] + [(True, t) for t in scoring.TINGKAT_KOMORBID_OPTIONS]:
+        cases.append({**_base_case(rng), "ada_komorbid": ada, "tingkat_komorbid": tingkat})
+    for field, mapping in (("peran", scoring.ROLE_MAPPING), ("status_tangkap", scoring.ARREST_MAPPING),
+                           ("riwayat_pidana", scoring.HISTORY_MAPPING)):
+        for label in mapping:
+            cases.append({**_base_case(rng), field: label})
+    return cases
+
+
+def score_scalar(case):
+    """Hasil jalur skalar satu kasus, format ScorePreview.update()"""
+    skor_medis, breakdown_medis = scoring.calculate_medical_score(
+        case["zat_positif"], case["dsm5_count"], case["durasi_bulan"],
+        case["fungsi_sosial"], case["ada_komorbid"], case["tingkat_komorbid"],
+    )
+    skor_hukum, breakdown_hukum = scoring.calculate_legal_score(
+        case["peran"], case["barang_bukti"], case["jenis_narkotika"],
+        case["status_tangkap"], case["riwayat_pidana"],
+    )
+    probabilities, reasoning, primary_rec, final_score = scoring.apply_decision_rules(
+        skor_medis, skor_hukum, breakdown_medis, breakdown_hukum
+    )
+    return {
+        'skor_medis': skor_medis,
+        'skor_hukum': skor_hukum,
+        'breakdown_medis': breakdown_medis,
+        'breakdown_hukum': breakdown_hukum,
+        'probabilities': probabilities,
+        'reasoning': reasoning,
+        'primary_rec': primary_rec,
+        'final_score': final_score,
+    }
+
+
+def case_records(n, seed=0, months=("2025-11", "2025-12", "2026-01")):
+    """export_data hasil skor n kasus acak; timestamp sengaja banyak yang sama"""
+    rng = random.Random(seed)
+    records = []
+    for i, case in enumerate(random_cases(n, seed)):
+        timestamp = f"{rng.choice(months)}-{rng.randint(1, 3):02d} 10:00:00"
+        record = {"timestamp": timestamp, "input_data": {**case, "nama_inisial": f"K{i}"}}
+        record.update(score_scalar(case))
+        records.append(record)
+    return records
+
+
+@pytest.fixture(scope="session")
+def cases():
+    """Kasus batas diikuti 2000 kasus acak (seed tetap)"""
+    return boundary_cases() + random_cases(2000)
+
+
+def export_data(case, timestamp="2025-12-01 09:00:00", **identity):
+    """export_data seperti yang dibuat tab Hasil Analisis"""
+    result = score_scalar(case)
+    identity = {"nama_inisial": "A.B.", "usia": 30, "jenis_kelamin": "Laki-laki", **identity}
+    return {
+        "timestamp": timestamp,
+        "input_data": {**case, **identity},
+        "skor_medis": result["skor_medis"],
+        "skor_hukum": result["skor_hukum"],
+        "final_score": result["final_score"],
+        "rekomendasi_utama": result["primary_rec"],
+        "confidence": result["probabilities"][result["primary_rec"]],
+        "breakdown_medis": result["breakdown_medis"],
+        "breakdown_hukum": result["breakdown_hukum"],
+        "probabilities": result["probabilities"],
+        "reasoning": result["reasoning"],
+    }
@@ -0,0 +1,122 @@
+"""Arsip kolumnar: round trip tanpa kehilangan nilai, replay dari arsip, kohort setara CaseStore"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import case_records, score_scalar
+from tat_predictor.batch import score_batch
+from tat_predictor.replay import load_version, read_archive, replay_chunks
+from tat_predictor.store import COHORT_DIMENSIONS, CaseStore
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.compute as pc  # noqa: E402
+
+from tat_predictor import archive  # noqa: E402
+
+
+@pytest.fixture
+def records():
+    records = case_records(200, seed=3)
+    for i, record in enumerate(records):
+        record["case_id"] = i + 1
+        if i % 3 == 0:
+            record["input_data"]["durasi_bulan"] += 0.5
+    for record in records:
+        record.update(score_scalar(record["input_data"]))
+    return records
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CaseStore(str(tmp_path / "cases.db"))
+    store.add_many(case_records(300), batch_size=64)
+    yield store
+    store.close()
+
+
+def test_round_trip_keeps_fractional_duration(records, tmp_path):
+    path = str(tmp_path / "arsip")
+    with archive.ArchiveWriter(path, batch_size=64) as writer:
+        assert writer.append_many(records) == len(records)
+
+    table = archive.read_table(path, ["case_id", "durasi_bulan", "barang_bukti", "skor_medis"])
+    rows = {row["case_id"]: row for row in table.to_pylist()}
+    for record in records:
+        row = rows[record["case_id"]]
+        assert row["durasi_bulan"] == record["input_data"]["durasi_bulan"]
+        assert row["barang_bukti"] == record["input_data"]["barang_bukti"]
+        assert row["skor_medis"] == record["skor_medis"]
+
+    # Skor ulang dari arsip sama dengan skor yang diarsipkan
+    frame = pd.concat(archive.read_cases(path, chunk_size=50), ignore_index=True)
+    rescored = score_batch(frame)
+    expected = {record["case_id"]: record for record in records}
+    for case_id, skor_medis, primary_rec in zip(frame["case_id"], rescored["skor_medis"], rescored["primary_rec"]):
+        assert skor_medis == expected[case_id]["skor_medis"]
+        assert primary_rec == expected[case_id]["primary_rec"]
+
+    version = load_version()
+    assert replay_chunks(archive.read_cases(path, chunk_size=50), version, version)["flipped"].empty
+
+
+def test_jsonl_read_archive_keeps_fractional_duration(records, tmp_path):
+    path = tmp_path / "export.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    with open(path, encoding="utf-8") as source:
+        chunks = list(read_archive(source, chunk_size=64))
+    durasi = [value for chunk in chunks for value in chunk["durasi_bulan"]]
+    assert durasi == [record["input_data"]["durasi_bulan"] for record in records]
+
+
+def test_legacy_int16_duration_parts_are_cast(records, tmp_path):
+    path = str(tmp_path / "arsip")
+    with archive.ArchiveWriter(path) as writer:
+        writer.append_many(records[:10])
+
+    # Part dari versi lama dengan durasi_bulan int16
+    legacy = pa.schema([pa.field("durasi_bulan", pa.int16()) if field.name == "durasi_bulan" else field
+                        for field in archive.schema()])
+    rows = [archive._row(record) for record in records[10:20]]
+    for row in rows:
+        row["durasi_bulan"] = int(row["durasi_bulan"])
+    table = pa.Table.from_pylist(rows, schema=legacy)
+    for month in {row["timestamp"][:7] for row in rows}:
+        part = tmp_path / "arsip" / f"month={month}" / "part-00000000000000000000-0.arrow"
+        month_table = table.filter(pc.starts_with(table["timestamp"], month))
+        with pa.OSFile(str(part), "wb") as sink, pa.ipc.new_file(sink, legacy) as writer:
+            writer.write_table(month_table)
+
+    result = archive.read_table(path, ["case_id", "durasi_bulan"])
+    assert result.schema.field("durasi_bulan").type == pa.float64()
+    assert result.num_rows == 20
+    assert len(pd.concat(archive.read_cases(path, chunk_size=7))) == 20
+
+
+def test_append_store_is_incremental(store, tmp_path):
+    ids = [record["case_id"] for record in store.records(batch_size=32)]
+    assert ids == sorted(ids) and len(ids) == 300
+    assert [r["case_id"] for r in store.records(after_id=ids[99], batch_size=32)] == ids[100:]
+
+    path = str(tmp_path / "arsip")
+    assert archive.append_store(store, path, batch_size=100) == 300
+    assert archive.append_store(store, path) == 0
+    assert archive.last_case_id(path) == ids[-1]
+
+
+@pytest.mark.parametrize("by", COHORT_DIMENSIONS)
+def test_cohort_matches_store(store, tmp_path, by):
+    path = str(tmp_path / "arsip")
+    archive.append_store(store, path, batch_size=100)
+
+    for month in (None, "2025-11"):
+        expected = store.cohort(by, month=month)
+        result = archive.cohort(path, by, months=None if month is None else [month])
+        assert [g["value"] for g in result] == [g["value"] for g in expected]
+        for got, want in zip(result, expected):
+            assert got["n"] == want["n"]
+            assert got["rekomendasi"] == want["rekomendasi"]
+            assert got["rules"] == want["rules"]
+            for key in ("mean_medis", "mean_hukum", "mean_final"):
+                assert got[key] == pytest.approx(want[key])
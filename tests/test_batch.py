@@ -0,0 +1,44 @@
+"""Jalur batch setara dengan fungsi skor skalar"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import score_scalar
+from tat_predictor import scoring
+from tat_predictor.batch import COMPONENT_KEYS, PROB_COLUMNS, encode_cases, score_batch, score_components
+
+
+def test_score_batch_matches_scalar(cases):
+    result = score_batch(pd.DataFrame(cases))
+    for i, case in enumerate(cases):
+        expected = score_scalar(case)
+        row = result.iloc[i]
+        assert row["skor_medis"] == expected["skor_medis"], case
+        assert row["skor_hukum"] == expected["skor_hukum"], case
+        assert row["final_score"] == expected["final_score"], case
+        assert row["primary_rec"] == expected["primary_rec"], case
+        assert [row[col] for col in PROB_COLUMNS] == [expected["probabilities"][rec]
+                                                     for rec in scoring.REKOMENDASI]
+
+
+def test_score_batch_dict_input(cases):
+    columns = {key: [case[key] for case in cases] for key in cases[0]}
+    frame = score_batch(pd.DataFrame(cases))
+    result = score_batch(columns)
+    assert np.array_equal(result["final_score"], frame["final_score"].to_numpy())
+    assert list(result["primary_rec"]) == list(frame["primary_rec"].astype(str))
+
+
+def test_score_components_match_breakdown(cases):
+    components = score_components(encode_cases(pd.DataFrame(cases)))
+    for i, case in enumerate(cases):
+        expected = score_scalar(case)
+        breakdown = {**expected["breakdown_medis"], **expected["breakdown_hukum"]}
+        for kategori, key in COMPONENT_KEYS.items():
+            assert components[key][i] == breakdown[kategori]["skor"], (kategori, case)
+
+
+def test_unknown_strict_label_raises(cases):
+    with pytest.raises(KeyError, match="peran"):
+        score_batch(pd.DataFrame([{**cases[0], "peran": "Tidak dikenal"}]))
@@ -0,0 +1,53 @@
+"""Render PDF massal: urutan kasus terjaga pada ZIP dan PDF gabungan"""
+
+import io
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+from conftest import export_data
+from tat_predictor.bulk import default_pdf_name, render_pdf_merged, render_pdf_zip
+
+
+@pytest.fixture(scope="module")
+def records(cases):
+    return [{**export_data(case, timestamp=f"2025-12-{i % 28 + 1:02d} 09:{i // 60 % 60:02d}:{i % 60:02d}"),
+             "case_id": i + 1}
+            for i, case in enumerate(cases[:23])]
+
+
+def _texts(pdf_bytes):
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf_bytes)).pages]
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_zip_in_input_order(records, fast):
+    buffer = io.BytesIO()
+    # chunksize 3: tugas terakhir tidak penuh, dan lebih banyak tugas daripada slot in-flight
+    assert render_pdf_zip(iter(records), buffer, workers=2, chunksize=3, fast=fast) == len(records)
+
+    with zipfile.ZipFile(buffer) as zf:
+        names = zf.namelist()
+        assert names == [default_pdf_name(i, r) for i, r in enumerate(records)]
+        for name, record in zip(names, records):
+            pdf = zf.read(name)
+            assert pdf.startswith(b"%PDF")
+            assert record["timestamp"] in _texts(pdf)[0]
+
+
+def test_merged_pages_in_order(records, tmp_path):
+    output = tmp_path / "gabungan.pdf"
+    assert render_pdf_merged(iter(records), str(output), workers=2, chunksize=2) == len(records)
+
+    # Halaman gabungan = halaman PDF per kasus, berurutan
+    buffer = io.BytesIO()
+    render_pdf_zip(records, buffer, workers=1)
+    with zipfile.ZipFile(buffer) as zf:
+        expected = [text for name in zf.namelist() for text in _texts(zf.read(name))]
+    assert _texts(output.read_bytes()) == expected
+
+
+def test_empty_input(tmp_path):
+    assert render_pdf_zip([], io.BytesIO(), workers=2) == 0
+    assert render_pdf_merged([], str(tmp_path / "kosong.pdf"), workers=2) == 0
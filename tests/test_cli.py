@@ -0,0 +1,49 @@
+"""Mode headless `score`: CSV per potongan setara dengan skoring skalar"""
+
+import pandas as pd
+import pytest
+
+from conftest import score_scalar
+from tat_predictor.batch import OUTPUT_COLUMNS, ZAT_SEPARATOR
+from tat_predictor.cli import main
+
+
+def _write_csv(cases, path):
+    frame = pd.DataFrame(cases)
+    frame.insert(0, "case_id", range(1, len(cases) + 1))
+    frame["zat_positif"] = [ZAT_SEPARATOR.join(zat) for zat in frame["zat_positif"]]
+    frame["ada_komorbid"] = frame["ada_komorbid"].map({True: "ya", False: "tidak"})
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_score_csv_matches_scalar(cases, tmp_path):
+    source = _write_csv(cases, tmp_path / "kasus.csv")
+    output = tmp_path / "hasil.csv"
+    # Potongan kecil: header hanya ditulis sekali, baris tetap berurutan
+    assert main(["score", source, "-o", str(output), "--chunk-size", "300",
+                 "--keep", "case_id", "-q"]) == 0
+
+    result = pd.read_csv(output)
+    assert list(result.columns) == ["case_id"] + OUTPUT_COLUMNS
+    assert list(result["case_id"]) == list(range(1, len(cases) + 1))
+    for case, row in zip(cases, result.itertuples(index=False)):
+        expected = score_scalar(case)
+        assert (row.skor_medis, row.skor_hukum, row.primary_rec) == (
+            expected["skor_medis"], expected["skor_hukum"], expected["primary_rec"]), case
+        assert row.final_score == pytest.approx(expected["final_score"])
+
+
+def test_score_csv_parallel_output_identical(cases, tmp_path):
+    source = _write_csv(cases, tmp_path / "kasus.csv")
+    serial, parallel = tmp_path / "serial.csv", tmp_path / "paralel.csv"
+    main(["score", source, "-o", str(serial), "--chunk-size", "500", "-q"])
+    main(["score", source, "-o", str(parallel), "--chunk-size", "500", "-j", "2", "-q"])
+    assert parallel.read_bytes() == serial.read_bytes()
+
+
+def test_score_csv_missing_column(cases, tmp_path):
+    path = tmp_path / "kasus.csv"
+    pd.DataFrame(cases).drop(columns=["peran"]).to_csv(path, index=False)
+    with pytest.raises(SystemExit, match="peran"):
+        main(["score", str(path), "-o", str(tmp_path / "hasil.csv"), "-q"])
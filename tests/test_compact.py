@@ -0,0 +1,74 @@
+"""Kasus ringkas (compact) setara dengan fungsi skor skalar"""
+
+import pandas as pd
+import pytest
+
+from conftest import score_scalar
+from tat_predictor import scoring
+from tat_predictor.batch import score_batch
+from tat_predictor.compact import CASE_DTYPE, CompactCase, Peran, Zat, from_array, score_array, to_array
+
+
+def test_score_matches_scalar(cases):
+    for case in cases:
+        assert CompactCase.from_input_data(case).score().to_dict() == score_scalar(case), case
+
+
+def test_round_trip(cases):
+    for case in cases:
+        compact = CompactCase.from_input_data(case)
+        data = compact.to_input_data()
+        assert sorted(data.pop("zat_positif")) == sorted(case["zat_positif"])
+        for key, value in data.items():
+            if key == "tingkat_komorbid" and not case["ada_komorbid"]:
+                assert value is None
+            else:
+                assert value == case[key], key
+    assert list(from_array(to_array(cases))) == [CompactCase.from_input_data(c) for c in cases]
+
+
+def test_compact_layout_and_keys(cases):
+    assert CASE_DTYPE.itemsize == 24
+    # Frozen + slots: dapat dipakai sebagai kunci dict, sama untuk input yang sama
+    seen = {CompactCase.from_input_data(case): case for case in cases}
+    assert CompactCase.from_input_data(dict(cases[0])) in seen
+    for label in scoring.ROLE_MAPPING:
+        assert Peran.from_label(label).label == label
+    assert sorted(Zat.from_labels(scoring.JENIS_NARKOTIKA[:3]).labels) == sorted(scoring.JENIS_NARKOTIKA[:3])
+
+
+def test_score_array_matches_batch(cases):
+    result = score_array(to_array(cases))
+    expected = score_batch(pd.DataFrame(cases))
+    assert (result["final_score"] == expected["final_score"].to_numpy()).all()
+    assert (result["skor_medis"] == expected["skor_medis"].to_numpy()).all()
+    assert (result["primary_code"] == expected["primary_rec"].cat.codes.to_numpy()).all()
+
+
+def test_fractional_duration_is_not_truncated(cases):
+    case = {**cases[0], "durasi_bulan": 12.5}
+    compact = CompactCase.from_input_data(case)
+    assert compact.score().to_dict() == score_scalar(case)
+    assert score_array(to_array([case]))["skor_medis"][0] == score_scalar(case)["skor_medis"]
+    assert CASE_DTYPE["durasi_bulan"].kind == "f"
+
+
+def test_fractional_dsm5_rejected(cases):
+    with pytest.raises(ValueError, match="dsm5_count"):
+        CompactCase.from_input_data({**cases[0], "dsm5_count": 3.5})
+
+
+def test_unknown_label_raises(cases):
+    with pytest.raises(KeyError, match="peran"):
+        CompactCase.from_input_data({**cases[0], "peran": "Tidak dikenal"})
+    with pytest.raises(KeyError, match="zat_positif"):
+        CompactCase.from_input_data({**cases[0], "zat_positif": ["Tidak dikenal"]})
+
+
+def test_runtime_constant_change(cases, monkeypatch):
+    # Nilai konstanta dibaca saat skoring, bukan disalin saat impor
+    compact = [CompactCase.from_input_data(c) for c in cases[:300]]
+    monkeypatch.setitem(scoring.GRAMATUR_LIMITS, "Heroin", 0.5)
+    monkeypatch.setitem(scoring.ROLE_MAPPING, "Pengguna murni (untuk diri sendiri)", 15)
+    for case, item in zip(cases, compact):
+        assert item.score().to_dict() == score_scalar(case), case
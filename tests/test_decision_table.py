@@ -0,0 +1,21 @@
+"""Tabel keputusan (lookup O(1)) setara dengan apply_decision_rules"""
+
+from conftest import score_scalar
+from tat_predictor import scoring
+from tat_predictor.decision_table import lookup_decision
+
+
+def test_lookup_decision_matches_apply_decision_rules(cases):
+    for case in cases:
+        expected = score_scalar(case)
+        args = (expected["skor_medis"], expected["skor_hukum"],
+                expected["breakdown_medis"], expected["breakdown_hukum"])
+        assert lookup_decision(*args) == scoring.apply_decision_rules(*args)
+
+
+def test_lookup_decision_outside_table_falls_back(cases):
+    expected = score_scalar(cases[0])
+    # Skor total yang tidak sesuai breakdown dihitung dengan decision rules biasa
+    args = (expected["skor_medis"] + 1, expected["skor_hukum"],
+            expected["breakdown_medis"], expected["breakdown_hukum"])
+    assert lookup_decision(*args) == scoring.apply_decision_rules(*args)
@@ -0,0 +1,44 @@
+"""Kode detail/alasan (render=False) dirender menjadi teks yang sama dengan render=True"""
+
+from conftest import score_scalar
+from tat_predictor import scoring
+from tat_predictor.decision_table import lookup_decision
+from tat_predictor.messages import DETAIL_TEMPLATES, render_breakdown
+from tat_predictor.rule_engine import active_ruleset
+
+
+def test_coded_results_render_identically(cases):
+    ruleset = active_ruleset()
+    for case in cases[:500]:
+        expected = score_scalar(case)
+        skor_medis, breakdown_medis = scoring.calculate_medical_score(
+            case["zat_positif"], case["dsm5_count"], case["durasi_bulan"],
+            case["fungsi_sosial"], case["ada_komorbid"], case["tingkat_komorbid"], render=False,
+        )
+        skor_hukum, breakdown_hukum = scoring.calculate_legal_score(
+            case["peran"], case["barang_bukti"], case["jenis_narkotika"],
+            case["status_tangkap"], case["riwayat_pidana"], render=False,
+        )
+        assert all("detail" not in item and item["detail_code"][0] in DETAIL_TEMPLATES
+                   for item in [*breakdown_medis.values(), *breakdown_hukum.values()])
+
+        args = (skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+        probabilities, codes, primary_rec, final_score = scoring.apply_decision_rules(*args, render=False)
+        assert lookup_decision(*args, render=False) == (probabilities, codes, primary_rec, final_score)
+
+        assert render_breakdown(breakdown_medis) == expected["breakdown_medis"]
+        assert render_breakdown(breakdown_hukum) == expected["breakdown_hukum"]
+        assert ruleset.render_reasoning(codes) == expected["reasoning"]
+        assert (probabilities, primary_rec, final_score) == (
+            expected["probabilities"], expected["primary_rec"], expected["final_score"])
+
+
+def test_reason_codes_render_to_reasoning(cases):
+    ruleset = active_ruleset()
+    for case in cases[:500]:
+        expected = score_scalar(case)
+        args = (expected["skor_medis"], expected["skor_hukum"],
+                expected["breakdown_medis"], expected["breakdown_hukum"])
+        _, codes, _, _ = ruleset.evaluate_codes(*args)
+        assert codes[0] in ruleset.messages and all(code in ruleset.note_ids for code in codes[1:])
+        assert ruleset.render_reasoning(codes) == ruleset.evaluate(*args)[1]
@@ -0,0 +1,106 @@
+"""Span timing per tahap, trace rerun (termasuk bersarang) dan ekspor Prometheus"""
+
+import socket
+import urllib.request
+
+import pytest
+
+from tat_predictor import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Metrics aktif dengan registry kosong, dipulihkan setelah tes"""
+    monkeypatch.setattr(metrics, "_enabled", True)
+    monkeypatch.setattr(metrics, "_stages", {})
+    monkeypatch.delenv(metrics.METRICS_FILE_ENV, raising=False)
+
+
+def test_disabled_is_passthrough(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", False)
+
+    def func():
+        return 1
+
+    assert metrics.instrument(func) is func
+    assert metrics.span("x") is metrics.rerun_trace() is metrics._NULL
+    with metrics.rerun_trace() as spans:
+        assert spans is None
+
+
+def test_span_and_instrument(enabled):
+    with metrics.span("a"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.span("a"):
+            raise ValueError
+
+    calls = metrics.instrument(lambda x: x * 2, "b")
+    assert calls(3) == 6
+
+    snapshot = metrics.snapshot()
+    assert snapshot["a"]["count"] == 2 and snapshot["a"]["errors"] == 1
+    assert snapshot["b"]["count"] == 1 and snapshot["b"]["errors"] == 0
+    assert snapshot["a"]["max"] >= snapshot["a"]["mean"] >= 0
+
+
+def test_rerun_trace_collects_spans(enabled):
+    assert not metrics.tracing()
+    with metrics.rerun_trace() as spans:
+        assert metrics.tracing()
+        metrics.record("skor", 0.002)
+        metrics.record("grafik", 0.003)
+    assert not metrics.tracing()
+    assert [stage for stage, _ in spans] == ["skor", "grafik", "rerun"]
+    assert metrics.snapshot()["rerun"]["count"] == 1
+
+
+def test_nested_trace_reaches_outer(enabled):
+    with metrics.rerun_trace() as outer:
+        metrics.record("awal", 0.001)
+        with metrics.rerun_trace("rerun.input_form") as inner:
+            metrics.record("skor", 0.002)
+        assert metrics.tracing()
+        metrics.record("akhir", 0.001)
+
+    assert [stage for stage, _ in inner] == ["skor", "rerun.input_form"]
+    assert [stage for stage, _ in outer] == ["awal", "skor", "rerun.input_form", "akhir", "rerun"]
+    snapshot = metrics.snapshot()
+    assert snapshot["rerun.input_form"]["count"] == snapshot["rerun"]["count"] == 1
+
+
+def test_render_prometheus(enabled):
+    for seconds in (0.00005, 0.003, 0.003, 10.0):
+        metrics.record("skor", seconds)
+    text = metrics.render_prometheus()
+    assert 'tat_stage_calls_total{stage="skor"} 4' in text
+    assert 'tat_stage_duration_seconds_bucket{stage="skor",le="0.0001"} 1' in text
+    assert 'tat_stage_duration_seconds_bucket{stage="skor",le="0.005"} 3' in text
+    assert 'tat_stage_duration_seconds_bucket{stage="skor",le="5.0"} 3' in text
+    assert 'tat_stage_duration_seconds_bucket{stage="skor",le="+Inf"} 4' in text
+    assert 'tat_stage_duration_seconds_count{stage="skor"} 4' in text
+
+
+def test_write_file(enabled, tmp_path):
+    metrics.record("skor", 0.001)
+    path = tmp_path / "metrics.prom"
+    metrics.write_file(str(path))
+    assert path.read_text(encoding="utf-8") == metrics.render_prometheus()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_http_endpoint(enabled, monkeypatch):
+    monkeypatch.setattr(metrics, "_server", None)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    metrics.record("skor", 0.001)
+    server = metrics.start_http_server(port)
+    try:
+        assert metrics.start_http_server(port) is server
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.read().decode("utf-8") == metrics.render_prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,67 @@
+"""Skoring paralel (shared memory) identik dengan batch.score_batch"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tat_predictor.batch import ZAT_SEPARATOR, encode_cases, score_batch, score_encoded
+from tat_predictor.parallel import OUTPUT_DTYPES, ShardedScorer, score_batch_parallel
+
+
+def test_parallel_frame_equals_batch(cases):
+    frame = pd.DataFrame(cases)
+    expected = score_batch(frame)
+    # shard kecil: banyak shard per worker, termasuk shard terakhir yang tidak penuh
+    assert score_batch_parallel(frame, workers=2, shard_size=97).equals(expected)
+    assert score_batch_parallel(frame, workers=1).equals(expected)
+
+
+def test_raw_columns_encoded_in_workers(cases):
+    # dict list (tanpa pandas) dan zat_positif sebagai teks seperti di CSV
+    columns = {name: [case[name] for case in cases] for name in cases[0]}
+    columns["zat_positif"] = [ZAT_SEPARATOR.join(zat) for zat in columns["zat_positif"]]
+    expected = score_batch(columns)
+    result = score_batch_parallel(columns, workers=2, shard_size=113)
+    assert set(result) == set(expected)
+    for name, column in expected.items():
+        assert np.array_equal(result[name], column), name
+
+    counted = pd.DataFrame(cases).drop(columns="zat_positif")
+    counted["num_zat"] = [len(case["zat_positif"]) for case in cases]
+    assert score_batch_parallel(counted, workers=2, shard_size=113).equals(score_batch(counted))
+
+    # Kolom kategori (seperti dari arsip kolumnar) tetap berupa kode di worker
+    labels = ["fungsi_sosial", "peran", "jenis_narkotika", "status_tangkap", "riwayat_pidana"]
+    categorical = counted.astype({name: "category" for name in labels})
+    assert score_batch_parallel(categorical, workers=2, shard_size=113).equals(score_batch(counted))
+
+
+def test_worker_error_propagates(cases):
+    frame = pd.DataFrame(cases)
+    frame.loc[len(frame) - 1, "peran"] = "Tidak Dikenal"
+    before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    with pytest.raises(KeyError, match="peran"):
+        score_batch_parallel(frame, workers=2, shard_size=256)
+    after = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    assert after <= before
+
+
+def test_score_encoded_columns(cases):
+    enc = encode_cases(pd.DataFrame(cases))
+    expected = score_encoded(enc)
+    with ShardedScorer(workers=2, shard_size=128) as scorer:
+        for _ in range(2):  # pool dipakai ulang
+            result = scorer.score_encoded(enc)
+            assert set(result) == set(OUTPUT_DTYPES)
+            for name, column in result.items():
+                assert column.dtype == expected[name].dtype, name
+                assert (column == expected[name]).all(), name
+
+
+def test_shared_memory_released(cases):
+    before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    score_batch_parallel(pd.DataFrame(cases), workers=2, shard_size=256)
+    after = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    assert after <= before
@@ -0,0 +1,50 @@
+"""PDF jalur cepat: teks sama dengan layout platypus, fallback untuk isi di luar layout"""
+
+import io
+from collections import Counter
+
+from pypdf import PdfReader
+
+from conftest import export_data
+from tat_predictor import pdf_fast
+from tat_predictor.pdf_fast import MAX_REASONS, generate_pdf_report_fast
+from tat_predictor.reports import generate_pdf_report
+
+
+def _glyphs(pdf):
+    """Karakter per halaman tanpa spasi (urutan ekstraksi berbeda antar-renderer)"""
+    pages = PdfReader(io.BytesIO(pdf), strict=True).pages
+    return [Counter("".join(page.extract_text().split())) for page in pages]
+
+
+def test_same_text_as_platypus(cases):
+    for case in cases[::20]:
+        data = export_data(case)
+        assert _glyphs(generate_pdf_report_fast(data)) == _glyphs(generate_pdf_report(data)), case
+
+
+def test_uncompressed_output(cases):
+    data = export_data(cases[0])
+    raw = generate_pdf_report_fast(data, page_compression=0)
+    assert raw.count(data["timestamp"].encode("ascii")) == 2
+    assert _glyphs(raw) == _glyphs(generate_pdf_report_fast(data))
+
+
+def test_outside_layout_falls_back(cases, monkeypatch):
+    calls = []
+
+    def fallback(export_data, page_compression=None):
+        calls.append(len(export_data["reasoning"]))
+        return generate_pdf_report(export_data, page_compression)
+
+    monkeypatch.setattr(pdf_fast, "generate_pdf_report", fallback)
+    data = export_data(cases[0])
+    generate_pdf_report_fast(data)
+    assert calls == []
+
+    too_many = {**data, "reasoning": [f"alasan {i}" for i in range(MAX_REASONS + 1)]}
+    markup = {**data, "reasoning": ["<b>tebal</b> & lainnya"]}
+    long_line = {**data, "reasoning": ["kata " * 200]}
+    for variant in (too_many, markup, long_line):
+        assert generate_pdf_report_fast(variant).startswith(b"%PDF")
+    assert calls == [MAX_REASONS + 1, 1, 1]
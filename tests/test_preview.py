@@ -0,0 +1,54 @@
+"""Pratinjau skor langsung: hasil setara skalar, evaluasi ulang hanya sisi yang berubah"""
+
+from conftest import score_scalar
+from tat_predictor import scoring
+from tat_predictor.preview import ScorePreview
+
+LEGAL_FIELDS = ("peran", "barang_bukti", "jenis_narkotika", "status_tangkap", "riwayat_pidana")
+
+
+def test_update_matches_scalar(cases):
+    preview = ScorePreview()
+    # Kasus berurutan: memo satu entri selalu diganti input berikutnya
+    for case in cases[:500]:
+        assert preview.update(case) == score_scalar(case), case
+
+
+def test_only_changed_side_is_recomputed(cases):
+    preview = ScorePreview()
+    case = dict(cases[0])
+    preview.update(case)
+    preview.update(case)
+    assert preview.evaluations == {"medis": 1, "hukum": 1, "keputusan": 1}
+
+    other = next(label for label in scoring.HISTORY_MAPPING if label != case["riwayat_pidana"])
+    case["riwayat_pidana"] = other
+    assert preview.update(case) == score_scalar(case)
+    assert preview.evaluations["medis"] == 1 and preview.evaluations["hukum"] == 2
+
+    case["durasi_bulan"] = case["durasi_bulan"] + 1
+    assert preview.update(case) == score_scalar(case)
+    assert preview.evaluations["medis"] == 2 and preview.evaluations["hukum"] == 2
+
+
+def test_decision_skipped_when_rule_inputs_unchanged(cases):
+    preview = ScorePreview()
+    case = dict(cases[0], zat_positif=scoring.JENIS_NARKOTIKA[:2])
+    preview.update(case)
+    # Zat lain dengan jumlah sama: skor dan breakdown yang dibaca aturan tidak berubah
+    case["zat_positif"] = scoring.JENIS_NARKOTIKA[2:4]
+    assert preview.update(case) == score_scalar(case)
+    assert preview.evaluations == {"medis": 2, "hukum": 1, "keputusan": 1}
+
+
+def test_injected_functions_are_used(cases):
+    calls = []
+
+    def medical(*args):
+        calls.append("medis")
+        return scoring.calculate_medical_score(*args)
+
+    preview = ScorePreview(medical=medical)
+    preview.update(cases[0])
+    preview.update({**cases[0], **{field: cases[1][field] for field in LEGAL_FIELDS}})
+    assert calls == ["medis"]
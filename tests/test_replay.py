@@ -0,0 +1,101 @@
+"""Jumlah kasus berubah dan matriks transisi replay dibandingkan skoring skalar"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import random_cases
+from tat_predictor import rule_engine, scoring
+from tat_predictor.replay import load_version, replay_chunks
+
+
+@pytest.fixture(scope="module")
+def archive_cases():
+    cases = random_cases(3000, seed=7)
+    for i, case in enumerate(cases):
+        case["case_id"] = i + 1
+    return cases
+
+
+def _scalar(case, ruleset):
+    skor_medis, breakdown_medis = scoring.calculate_medical_score(
+        case["zat_positif"], case["dsm5_count"], case["durasi_bulan"],
+        case["fungsi_sosial"], case["ada_komorbid"], case["tingkat_komorbid"],
+    )
+    skor_hukum, breakdown_hukum = scoring.calculate_legal_score(
+        case["peran"], case["barang_bukti"], case["jenis_narkotika"],
+        case["status_tangkap"], case["riwayat_pidana"],
+    )
+    _, _, primary, final_score = ruleset.evaluate(skor_medis, skor_hukum, breakdown_medis, breakdown_hukum)
+    return primary, final_score
+
+
+def _replay(cases, old, new, chunk_size=700):
+    frame = pd.DataFrame(cases)
+    chunks = [frame.iloc[i:i + chunk_size].reset_index(drop=True)
+              for i in range(0, len(frame), chunk_size)]
+    return replay_chunks(chunks, old, new)
+
+
+def _assert_matches(result, old_results, new_results):
+    expected = pd.DataFrame(0, index=scoring.REKOMENDASI, columns=scoring.REKOMENDASI)
+    rows = []
+    for i, ((old_rec, _), (new_rec, new_score)) in enumerate(zip(old_results, new_results)):
+        expected.loc[old_rec, new_rec] += 1
+        if old_rec != new_rec:
+            rows.append((i, i + 1, old_rec, new_rec, new_score))
+
+    assert result["n_cases"] == len(old_results)
+    assert (result["transition"].to_numpy() == expected.to_numpy()).all()
+    flipped = result["flipped"]
+    assert len(flipped) == len(rows)
+    assert list(zip(flipped["row"], flipped["case_id"], flipped["old_rec"], flipped["new_rec"])) == [
+        row[:4] for row in rows]
+    assert list(flipped["new_final_score"]) == pytest.approx([row[4] for row in rows])
+
+
+def test_same_version_has_no_flips(archive_cases):
+    version = load_version()
+    result = _replay(archive_cases, version, version)
+    assert result["flipped"].empty
+    assert result["transition"].to_numpy().trace() == len(archive_cases)
+
+
+def test_gramatur_override_flips(archive_cases, tmp_path, monkeypatch):
+    path = tmp_path / "gramatur_ketat.json"
+    path.write_text(json.dumps({"Metamfetamin/Sabu": 0.2, "Ganja/Cannabis": 1.0}), encoding="utf-8")
+    old, new = load_version(), load_version(gramatur_path=str(path))
+    assert "gramatur_ketat.json" in new["label"]
+    assert new["label"] != old["label"]
+
+    ruleset = rule_engine.active_ruleset()
+    old_results = [_scalar(case, ruleset) for case in archive_cases]
+    monkeypatch.setitem(scoring.GRAMATUR_LIMITS, "Metamfetamin/Sabu", 0.2)
+    monkeypatch.setitem(scoring.GRAMATUR_LIMITS, "Ganja/Cannabis", 1.0)
+    new_results = [_scalar(case, ruleset) for case in archive_cases]
+
+    result = _replay(archive_cases, old, new)
+    assert len(result["flipped"]) > 0
+    _assert_matches(result, old_results, new_results)
+
+
+def test_modified_rules_flips(archive_cases, tmp_path):
+    with open(rule_engine.DEFAULT_RULES_PATH, encoding="utf-8") as fh:
+        spec = json.load(fh)
+    spec["version"] = "uji-replay"
+    spec["tests"] = []
+    # Batas rawat jalan diperketat: sebagian kasus pindah ke aturan berikutnya
+    spec["rules"][0]["when"][0] = ["skor_medis", ">=", 30]
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+
+    old, new = load_version(), load_version(rules_path=str(path))
+    assert new["label"].startswith("uji-replay")
+
+    old_results = [_scalar(case, old["ruleset"]) for case in archive_cases]
+    new_results = [_scalar(case, new["ruleset"]) for case in archive_cases]
+
+    result = _replay(archive_cases, old, new)
+    assert len(result["flipped"]) > 0
+    _assert_matches(result, old_results, new_results)
@@ -0,0 +1,95 @@
+"""Antrian laporan latar belakang: hasil berurutan, giliran adil antar-sesi, kegagalan"""
+
+import threading
+
+import pytest
+
+from tat_predictor.report_jobs import QueueFull, ReportWorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = ReportWorkerPool(workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def _blocked(pool):
+    """Tahan satu-satunya worker sampai event di-set"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    pool.submit("blok", block)
+    assert started.wait(5)
+    return release
+
+
+def test_submit_and_batch_results(pool):
+    job = pool.submit("a", pow, 2, 10)
+    assert job.wait(5) and job.status == "done" and job.result == 1024
+
+    batch = pool.submit_batch("a", lambda x: x * x, range(20), finalize=sum)
+    assert batch.wait(5) and batch.result == sum(x * x for x in range(20))
+    assert batch.progress == 1.0 and batch.completed == 20
+
+    plain = pool.submit_batch("a", str, [3, 1, 2])
+    assert plain.wait(5) and plain.result == ["3", "1", "2"]
+
+    empty = pool.submit_batch("a", str, [])
+    assert empty.finished and empty.result == []
+
+
+def test_round_robin_between_sessions(pool):
+    release = _blocked(pool)
+    order = []
+    big = pool.submit_batch("besar", order.append, [f"besar-{i}" for i in range(10)])
+    small = pool.submit("kecil", order.append, "kecil")
+    assert pool.pending() == 11 and pool.pending("kecil") == 1
+
+    release.set()
+    assert big.wait(5) and small.wait(5)
+    # Tugas sesi lain menunggu paling lama satu giliran sesi besar
+    assert order.index("kecil") <= 1
+    assert [x for x in order if x != "kecil"] == [f"besar-{i}" for i in range(10)]
+
+
+def test_failure_drops_remaining_tasks(pool):
+    release = _blocked(pool)
+    done = []
+
+    def render(i):
+        if i == 2:
+            raise ValueError("rusak")
+        done.append(i)
+
+    job = pool.submit_batch("a", render, range(10))
+    release.set()
+    assert job.wait(5)
+    assert job.status == "failed" and isinstance(job.error, ValueError)
+    assert done == [0, 1] and pool.pending() == 0
+
+    finalize_failed = pool.submit_batch("a", str, [1], finalize=lambda results: 1 / 0)
+    assert finalize_failed.wait(5) and finalize_failed.status == "failed"
+
+
+def test_queue_full():
+    small = ReportWorkerPool(workers=1, max_pending=3)
+    release = _blocked(small)
+    try:
+        small.submit_batch("a", str, range(3))
+        with pytest.raises(QueueFull):
+            small.submit("b", str, 1)
+    finally:
+        release.set()
+        small.shutdown()
+
+
+def test_submit_after_shutdown():
+    pool = ReportWorkerPool(workers=1)
+    pool.shutdown()
+    with pytest.raises(RuntimeError):
+        pool.submit("a", str, 1)
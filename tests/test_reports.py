@@ -0,0 +1,42 @@
+"""Digest isi laporan (kunci memoization) dan render laporan TXT/PDF"""
+
+from conftest import export_data
+from tat_predictor.reports import export_digest, generate_pdf_report, generate_txt_report
+
+
+def test_export_digest_ignores_key_order(cases):
+    data = export_data(cases[0])
+    reordered = dict(reversed(list(data.items())))
+    reordered["input_data"] = dict(reversed(list(data["input_data"].items())))
+    assert export_digest(reordered) == export_digest(data)
+
+
+def test_export_digest_changes_with_content(cases):
+    data = export_data(cases[0])
+    digests = {
+        export_digest(data),
+        export_digest({**data, "timestamp": "2025-12-01 09:00:01"}),
+        export_digest({**data, "final_score": data["final_score"] + 0.1}),
+        export_digest(export_data(cases[0], nama_inisial="C.D.")),
+    }
+    assert len(digests) == 4
+
+
+def test_txt_report_content(cases):
+    data = export_data(cases[0])
+    report = generate_txt_report(data)
+    assert f"Waktu Analisis: {data['timestamp']}" in report
+    assert f"Skor Asesmen Medis: {data['skor_medis']}/100" in report
+    assert f"Rekomendasi Utama: {data['rekomendasi_utama']}" in report
+    for kategori in data["breakdown_medis"]:
+        assert kategori in report
+
+
+def test_pdf_report(cases):
+    data = export_data(cases[0])
+    pdf = generate_pdf_report(data)
+    assert pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+    # Tanpa kompresi, teks laporan terbaca langsung di content stream
+    raw = generate_pdf_report(data, page_compression=0)
+    assert raw.count(data["timestamp"].encode("ascii")) == 2
+    assert len(raw) > len(pdf)
@@ -0,0 +1,110 @@
+"""Cache hasil dan laporan: kunci input skoring, tambal timestamp, PDF terkompresi"""
+
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from conftest import export_data, score_scalar
+from tat_predictor import rule_engine
+from tat_predictor.pdf_fast import generate_pdf_report_fast
+from tat_predictor.reports import generate_pdf_report, generate_txt_report
+from tat_predictor.result_cache import TIMESTAMP_PLACEHOLDER, ResultCache, input_key
+
+OTHER_TIMESTAMP = "2026-01-02 03:04:05"
+RENDERERS = {"txt": generate_txt_report, "pdf": generate_pdf_report, "pdf_fast": generate_pdf_report_fast}
+
+
+def _counting(render):
+    calls = []
+
+    def wrapper(*args, **kwargs):
+        calls.append(args[0]["timestamp"])
+        return render(*args, **kwargs)
+    return wrapper, calls
+
+
+def _texts(pdf):
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf), strict=True).pages]
+
+
+def test_input_key_ignores_identity(cases):
+    case = cases[0]
+    a = {**case, "nama_inisial": "A.B.", "usia": 30, "jenis_kelamin": "Laki-laki"}
+    b = {**case, "nama_inisial": "C.D.", "usia": 51, "jenis_kelamin": "Perempuan"}
+    assert input_key(a) == input_key(b) == input_key(case)
+    assert input_key({**case, "dsm5_count": case["dsm5_count"] + 1}) != input_key(case)
+
+
+def test_input_key_includes_ruleset(cases, tmp_path):
+    with open(rule_engine.DEFAULT_RULES_PATH, encoding="utf-8") as fh:
+        text = fh.read()
+    path = tmp_path / "rules.json"
+    path.write_text(text.replace('"probability": 85', '"probability": 84', 1), encoding="utf-8")
+    assert input_key(cases[0], rule_engine.load_ruleset(str(path))) != input_key(cases[0])
+
+
+def test_result_shared_across_identities(cases):
+    cache = ResultCache()
+    first = {**cases[0], "nama_inisial": "A.B."}
+    second = {**cases[0], "nama_inisial": "C.D."}
+    cache.put_result(first, score_scalar(cases[0]))
+
+    result = cache.get_result(second, OTHER_TIMESTAMP)
+    assert result["input_data"] is second and result["timestamp"] == OTHER_TIMESTAMP
+    assert {k: v for k, v in result.items() if k not in ("input_data", "timestamp")} == score_scalar(cases[0])
+    assert cache.get_result({**second, "peran": "x"}, OTHER_TIMESTAMP) is None
+
+
+@pytest.mark.parametrize("kind", sorted(RENDERERS))
+def test_report_patched_once_rendered(cases, kind):
+    cache = ResultCache()
+    render, calls = _counting(RENDERERS[kind])
+    data = export_data(cases[0])
+    first = cache.report(kind, data, render)
+    second = cache.report(kind, {**data, "timestamp": OTHER_TIMESTAMP}, render)
+    assert calls == [TIMESTAMP_PLACEHOLDER]
+    assert cache.cached_report(kind, data) == first
+
+    direct = RENDERERS[kind]({**data, "timestamp": OTHER_TIMESTAMP})
+    if kind == "txt":
+        assert second == direct.encode("utf-8")
+    else:
+        assert _texts(second) == _texts(direct)
+        assert TIMESTAMP_PLACEHOLDER.encode("ascii") not in second
+
+
+@pytest.mark.parametrize("kind", ["pdf", "pdf_fast"])
+def test_cached_pdf_is_compressed(cases, kind):
+    cache = ResultCache()
+    data = export_data(cases[0])
+    cache.report(kind, data, RENDERERS[kind])
+    served = cache.report(kind, {**data, "timestamp": OTHER_TIMESTAMP}, RENDERERS[kind])
+    direct = RENDERERS[kind]({**data, "timestamp": OTHER_TIMESTAMP})
+    uncompressed = RENDERERS[kind](data, page_compression=0)
+    assert len(served) <= len(direct) * 1.05
+    assert len(served) < len(uncompressed) * 0.7
+
+
+def test_nonstandard_timestamp_bypasses_cache(cases):
+    cache = ResultCache()
+    render, calls = _counting(generate_txt_report)
+    data = {**export_data(cases[0]), "timestamp": "kemarin"}
+    assert cache.report("txt", data, render) == generate_txt_report(data).encode("utf-8")
+    assert calls == ["kemarin"] and len(cache) == 0
+    assert cache.cached_report("txt", data) is None
+
+
+def test_lru_eviction_and_disk_tier(cases, tmp_path):
+    cache = ResultCache(max_bytes=6000, disk_dir=str(tmp_path))
+    reports = [export_data(case) for case in cases[:5]]
+    for data in reports:
+        cache.report("txt", data, generate_txt_report)
+    assert cache.nbytes <= 6000 and cache.stats["evictions"] > 0
+
+    # Proses baru dengan tier disk yang sama tidak perlu merender ulang
+    fresh = ResultCache(disk_dir=str(tmp_path))
+    render, calls = _counting(generate_txt_report)
+    for data in reports:
+        assert fresh.report("txt", data, render) == generate_txt_report(data).encode("utf-8")
+    assert calls == [] and fresh.stats["disk_hits"] == len(reports)
@@ -0,0 +1,99 @@
+"""Validasi file aturan dan hot reload yang mempertahankan versi lama"""
+
+import copy
+import json
+import os
+
+import pytest
+
+from tat_predictor import rule_engine
+from tat_predictor.rule_engine import RuleSetError, load_ruleset
+
+
+@pytest.fixture(scope="module")
+def spec():
+    with open(rule_engine.DEFAULT_RULES_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@pytest.fixture
+def restore_active(monkeypatch):
+    """Status aturan aktif dipulihkan setelah tes hot reload"""
+    for name in ("_active", "_active_mtime", "_failed_mtime"):
+        monkeypatch.setattr(rule_engine, name, getattr(rule_engine, name))
+
+
+def _write(path, data):
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def _mutated(spec, mutate):
+    data = copy.deepcopy(spec)
+    mutate(data)
+    return data
+
+
+MALFORMED = {
+    "not_object": lambda s: s.clear() or s.update(x=1),
+    "rules_not_objects": lambda s: s.update(rules=["oops"]),
+    "rules_empty": lambda s: s.update(rules=[]),
+    "catch_all_missing": lambda s: s["rules"].pop(),
+    "duplicate_id": lambda s: s["rules"][1].update(id=s["rules"][0]["id"]),
+    "reasoning_string": lambda s: s["rules"][0].update(reasoning="teks"),
+    "note_reasoning_string": lambda s: s["notes"][0].update(reasoning="teks"),
+    "notes_not_objects": lambda s: s.update(notes=[1]),
+    "tests_not_objects": lambda s: s.update(tests=["x"]),
+    "weights_not_object": lambda s: s.update(weights=[1, 2]),
+    "weights_nan": lambda s: s["weights"].update(skor_medis=float("nan")),
+    "operand_nan": lambda s: s["rules"][0].update(when=[["skor_medis", "<", float("nan")]]),
+    "times_infinity": lambda s: s["rules"][0].update(
+        when=[["skor_medis", "<", {"var": "skor_hukum", "times": float("inf")}]]),
+    "any_not_list": lambda s: s["rules"][0].update(when=[{"any": 5}]),
+    "unknown_variable": lambda s: s["rules"][0].update(when=[["tidak_ada", "<", 1]]),
+    "unknown_operator": lambda s: s["rules"][0].update(when=[["skor_medis", "=~", 1]]),
+    "probability_range": lambda s: s["rules"][0].update(probability=120),
+    "failing_test_case": lambda s: s["tests"][0].update(expect=s["rules"][-1]["id"]),
+}
+
+
+def test_default_rules_load(spec):
+    ruleset = load_ruleset(rule_engine.DEFAULT_RULES_PATH)
+    assert ruleset.rule_ids == [rule["id"] for rule in spec["rules"]]
+
+
+@pytest.mark.parametrize("name", sorted(MALFORMED))
+def test_malformed_rules_raise_ruleset_error(spec, tmp_path, name):
+    path = _write(tmp_path / "rules.json", _mutated(spec, MALFORMED[name]))
+    with pytest.raises(RuleSetError):
+        load_ruleset(path)
+
+
+def test_invalid_json_raises_ruleset_error(tmp_path):
+    with pytest.raises(RuleSetError):
+        load_ruleset(_write(tmp_path / "rules.json", "{"))
+
+
+def test_reload_keeps_previous_version(spec, tmp_path, restore_active):
+    path = tmp_path / "rules.json"
+    active = rule_engine.reload_ruleset(_write(path, spec))
+
+    _write(path, _mutated(spec, MALFORMED["rules_not_objects"]))
+    os.utime(path, ns=(1, 1))  # mtime pasti berbeda dari versi aktif
+    assert rule_engine.reload_if_changed() is active
+    # Versi gagal diingat: tidak dicoba ulang di setiap rerun
+    assert rule_engine._failed_mtime == 1
+    assert rule_engine.reload_if_changed() is active
+
+    with pytest.raises(RuleSetError):
+        rule_engine.reload_ruleset(str(path))
+    assert rule_engine.active_ruleset() is active
+
+
+def test_reload_activates_valid_version(spec, tmp_path, restore_active):
+    path = tmp_path / "rules.json"
+    rule_engine.reload_ruleset(_write(path, spec))
+    _write(path, _mutated(spec, lambda s: s.update(version="2.0.0")))
+    os.utime(path, ns=(2, 2))
+    assert rule_engine.reload_if_changed().version == "2.0.0"
+
@@ -0,0 +1,142 @@
+"""Layanan HTTP: validasi input, skor setara skalar, batch berurutan, reload aturan"""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import score_scalar
+from tat_predictor import rule_engine, service
+from tat_predictor.service import score_case, validate_case
+
+SCORE_KEYS = ("skor_medis", "skor_hukum", "final_score", "primary_rec", "probabilities")
+
+
+@pytest.fixture
+def restore_active(monkeypatch):
+    """Status aturan aktif dipulihkan setelah tes reload"""
+    for name in ("_active", "_active_mtime", "_failed_mtime"):
+        monkeypatch.setattr(rule_engine, name, getattr(rule_engine, name))
+
+
+@pytest.fixture
+def server():
+    """Server di thread terpisah pada port bebas; mengembalikan port"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    def ready(srv):
+        state["port"] = srv.sockets[0].getsockname()[1]
+        started.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        state["task"] = loop.create_task(service.serve(port=0, ready=ready))
+        try:
+            loop.run_until_complete(state["task"])
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield state["port"]
+    loop.call_soon_threadsafe(state["task"].cancel)
+    thread.join(10)
+    loop.close()
+
+
+def _post(port, path, body):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("POST", path, body=body)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def _get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="module")
+def valid_cases(cases):
+    """Kasus dalam batas widget aplikasi (beberapa kasus batas melebihi MAX_BARANG_BUKTI)"""
+    return [case for case in cases if case["barang_bukti"] <= service.MAX_BARANG_BUKTI]
+
+
+def _expected(case):
+    result = score_scalar(case)
+    return {key: result[key] for key in SCORE_KEYS}
+
+
+def test_validate_accepts_fractional_duration(cases):
+    case = {**cases[0], "durasi_bulan": 12.5}
+    assert validate_case(case) is case
+    assert validate_case({**cases[0], "durasi_bulan": 0}) is not None
+
+
+@pytest.mark.parametrize("value", [-1, -0.5, 240.5, float("nan"), float("inf"), True, "12", None])
+def test_validate_rejects_bad_duration(cases, value):
+    with pytest.raises(ValueError, match="durasi_bulan"):
+        validate_case({**cases[0], "durasi_bulan": value})
+
+
+def test_validate_rejects_fractional_dsm5_count(cases):
+    with pytest.raises(ValueError, match="dsm5_count"):
+        validate_case({**cases[0], "dsm5_count": 1.5})
+
+
+def test_score_case_matches_scalar(valid_cases, cases):
+    for case in valid_cases[:300] + [{**cases[0], "durasi_bulan": 6.5}, {**cases[1], "durasi_bulan": 11.75}]:
+        result = score_case(validate_case(case))
+        assert {key: result[key] for key in SCORE_KEYS} == _expected(case), case
+        assert "reasoning" not in score_case(case, detail=False)
+
+
+def test_score_endpoint(server, cases):
+    case = {**cases[0], "durasi_bulan": 7.5}
+    status, body = _post(server, "/v1/score", json.dumps(case))
+    assert status == 200
+    result = json.loads(body)
+    assert {key: result[key] for key in SCORE_KEYS} == json.loads(json.dumps(_expected(case)))
+
+    status, body = _post(server, "/v1/score", json.dumps({**case, "durasi_bulan": -1}))
+    assert status == 400 and "durasi_bulan" in json.loads(body)["error"]
+
+
+def test_batch_endpoint_keeps_order(server, valid_cases):
+    lines = [json.dumps(case) for case in valid_cases[:200]]
+    lines.insert(50, json.dumps({**valid_cases[0], "peran": "x"}))
+    status, body = _post(server, "/v1/score/batch?detail=0", "\n".join(lines))
+    assert status == 200
+    results = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert len(results) == 201
+    assert "peran" in results.pop(50)["error"]
+    for case, result in zip(valid_cases[:200], results):
+        assert {key: result[key] for key in SCORE_KEYS} == json.loads(json.dumps(_expected(case)))
+
+
+def test_changed_rules_are_reloaded(server, tmp_path, monkeypatch, restore_active):
+    with open(rule_engine.DEFAULT_RULES_PATH, encoding="utf-8") as fh:
+        spec = json.load(fh)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    rule_engine.reload_ruleset(str(path))
+    assert _get(server, "/healthz")[1]["rules_version"] == spec["version"]
+
+    path.write_text(json.dumps({**spec, "version": "2.0.0"}), encoding="utf-8")
+    os.utime(path, ns=(3, 3))
+    monkeypatch.setattr(service, "_rules_checked", 0.0)
+    assert _get(server, "/healthz")[1]["rules_version"] == "2.0.0"
@@ -0,0 +1,82 @@
+"""Riwayat kasus CaseStore (keyset pagination) dan rollup kohort inkremental"""
+
+import pytest
+
+from conftest import case_records
+from tat_predictor.store import COHORT_DIMENSIONS, CaseStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CaseStore(str(tmp_path / "cases.db"))
+    store.add_many(case_records(300), batch_size=64)
+    yield store
+    store.close()
+
+
+def _pages(store, limit, **filters):
+    rows, cursor = [], None
+    while True:
+        page, cursor = store.history(limit=limit, before=cursor, **filters)
+        rows.extend(page)
+        if cursor is None:
+            return rows
+
+
+def test_history_keyset_pagination(store):
+    everything = _pages(store, limit=1000)
+    assert len(everything) == store.count() == 300
+    expected = sorted(everything, key=lambda r: (r["timestamp"], r["id"]), reverse=True)
+    assert everything == expected
+
+    for limit in (1, 17, 300):
+        assert _pages(store, limit) == expected
+
+    peran = expected[0]["peran"]
+    filtered = [r for r in expected if r["peran"] == peran]
+    assert _pages(store, 7, peran=peran) == filtered
+    assert store.count(peran=peran) == len(filtered)
+
+
+
+def _expected_cohort(records, by, month=None):
+    groups = {}
+    for record in records:
+        if month is not None and record["timestamp"][:7] != month:
+            continue
+        value = record["timestamp"][:7] if by == "month" else record["input_data"][by]
+        group = groups.setdefault(value, {"n": 0, "medis": 0, "hukum": 0, "final": 0.0, "rekomendasi": {}})
+        group["n"] += 1
+        group["medis"] += record["skor_medis"]
+        group["hukum"] += record["skor_hukum"]
+        group["final"] += record["final_score"]
+        group["rekomendasi"][record["primary_rec"]] = group["rekomendasi"].get(record["primary_rec"], 0) + 1
+    return groups
+
+
+def _assert_cohort(result, expected):
+    assert [g["value"] for g in result] == sorted(expected)
+    for group in result:
+        want = expected[group["value"]]
+        assert group["n"] == want["n"]
+        assert group["mean_medis"] == pytest.approx(want["medis"] / want["n"])
+        assert group["mean_hukum"] == pytest.approx(want["hukum"] / want["n"])
+        assert group["mean_final"] == pytest.approx(want["final"] / want["n"])
+        assert group["rekomendasi"] == want["rekomendasi"]
+        assert sum(group["rules"].values()) == want["n"]
+
+
+@pytest.mark.parametrize("by", COHORT_DIMENSIONS)
+def test_cohort_rollup_matches_cases(store, by):
+    records = case_records(300)
+    _assert_cohort(store.cohort(by), _expected_cohort(records, by))
+    _assert_cohort(store.cohort(by, month="2025-12"), _expected_cohort(records, by, "2025-12"))
+
+
+def test_rebuild_rollups_is_idempotent(store):
+    before = {by: store.cohort(by) for by in COHORT_DIMENSIONS}
+    histogram = store.score_histogram()
+    store.rebuild_rollups()
+    assert {by: store.cohort(by) for by in COHORT_DIMENSIONS} == before
+    assert store.score_histogram() == histogram
+    assert sum(n for _, n in histogram) == 300
@@ -0,0 +1,76 @@
+"""Simulasi Monte Carlo: deterministik per seed, frekuensi dan interval Wilson konsisten"""
+
+import json
+
+import pytest
+
+from conftest import export_data, score_scalar
+from tat_predictor.cli import main
+from tat_predictor.scoring import REKOMENDASI
+from tat_predictor.uncertainty import DEFAULT_MODEL, format_summary, simulate, wilson_interval
+
+# Model tanpa gangguan: semua sampel sama dengan kasus aslinya
+NO_NOISE = {name: 0.0 for name in DEFAULT_MODEL}
+
+
+def test_deterministic_per_seed(cases):
+    first = simulate(cases[0], samples=5000, seed=7)
+    assert simulate(cases[0], samples=5000, seed=7) == first
+    assert first["samples"] == 5000 and first["seed"] == 7 and first["model"] == DEFAULT_MODEL
+
+
+def test_frequencies_and_intervals(cases):
+    for case in cases[:40]:
+        result = simulate(case, samples=2000, seed=1)
+        assert list(result["frequencies"]) == REKOMENDASI
+        assert sum(result["frequencies"].values()) == pytest.approx(1.0)
+        assert result["baseline"] == score_scalar(case)["primary_rec"]
+        assert result["stability"] == result["frequencies"][result["baseline"]]
+        for rec, (low, high) in result["intervals"].items():
+            assert 0.0 <= low <= result["frequencies"][rec] <= high <= 1.0
+        score = result["final_score"]
+        assert score["p05"] <= score["p50"] <= score["p95"]
+
+
+def test_no_noise_matches_scalar(cases):
+    for case in cases[:100]:
+        expected = score_scalar(case)
+        result = simulate(case, samples=200, model=NO_NOISE)
+        assert result["stability"] == 1.0
+        assert result["baseline"] == expected["primary_rec"]
+        assert result["final_score"]["mean"] == pytest.approx(expected["final_score"])
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(0, 100)
+    assert low == pytest.approx(0.0) and 0.0 < high < 0.05
+    low, high = wilson_interval(50, 100)
+    assert low == pytest.approx(1 - high)
+
+
+def test_invalid_arguments(cases):
+    with pytest.raises(ValueError, match="sampel"):
+        simulate(cases[0], samples=0)
+    with pytest.raises(ValueError, match="tidak dikenal"):
+        simulate(cases[0], model={"galat": 0.1})
+    with pytest.raises(ValueError):
+        simulate(cases[0], model={"dsm5_flip": 1.5})
+
+
+def test_format_summary(cases):
+    result = simulate(cases[0], samples=1000)
+    text = format_summary(result)
+    assert result["baseline"] in text
+    assert all(rec in text for rec in REKOMENDASI)
+
+
+def test_cli_uncertainty(cases, tmp_path, capsys):
+    path = tmp_path / "kasus.json"
+    # export_data lengkap diterima, yang dipakai hanya input_data-nya
+    path.write_text(json.dumps(export_data(cases[0])), encoding="utf-8")
+    assert main(["uncertainty", str(path), "--samples", "3000", "--seed", "5", "--json", "-q"]) == 0
+    assert json.loads(capsys.readouterr().out) == json.loads(json.dumps(simulate(cases[0], 3000, 5)))
+
+    path.write_text(json.dumps({**cases[0], "peran": "x"}), encoding="utf-8")
+    with pytest.raises(SystemExit, match="peran"):
+        main(["uncertainty", str(path), "-q"])